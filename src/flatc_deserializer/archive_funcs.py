@@ -0,0 +1,211 @@
+"""
+    Модуль, включающий в себя функции для потокового чтения бинарных файлов из zip/tar-архивов и
+    записи результатов в архивы без распаковки архива на диск целиком.
+"""
+import os
+import shutil
+import tarfile
+import tempfile
+import zipfile
+from collections.abc import Callable, Iterator
+from contextlib import ExitStack
+from typing import IO
+
+ARCHIVE_EXTENSIONS = (".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz")
+TAR_COMPRESSIONS = {".gz": "gz", ".tgz": "gz", ".bz2": "bz2", ".tbz2": "bz2", ".xz": "xz",
+                    ".txz": "xz"}
+SCRATCH_ROOTS = ("/dev/shm",)
+COPY_BUFFER_SIZE = 1048576
+
+
+def is_archive_path(path: str) -> bool:
+    """
+    Проверка, является ли путь путём к поддерживаемому архиву (по расширению).
+    :param path: Путь к файлу.
+    :return: True, если путь указывает на zip- или tar-архив.
+    """
+    return path.lower().endswith(ARCHIVE_EXTENSIONS)
+
+
+def make_scratch_path() -> str:
+    """
+    Создание временной директории для распаковываемых файлов, по возможности в tmpfs (/dev/shm),
+    чтобы промежуточные файлы не записывались на диск.
+    :return: Путь к созданной директории.
+    """
+    for scratch_root in SCRATCH_ROOTS:
+        if os.path.isdir(scratch_root) and os.access(scratch_root, os.W_OK):
+            return tempfile.mkdtemp(prefix="flatc_deserializer_", dir=scratch_root)
+    return tempfile.mkdtemp(prefix="flatc_deserializer_")
+
+
+def get_member_path(member_name: str) -> str:
+    """
+    Получение безопасного относительного пути файла архива.
+    :param member_name: Имя файла внутри архива.
+    :return: Относительный путь или пустая строка, если путь абсолютный или выходит за пределы
+    архива.
+    """
+    member_path = os.path.normpath(member_name.replace("\\", "/"))
+    if os.path.isabs(member_path) or os.path.splitdrive(member_path)[0] != "" or \
+            member_path == os.pardir or member_path.startswith(os.pardir + os.sep):
+        return ""
+    return member_path
+
+
+def iter_archive_members(archive_path: str) -> Iterator[tuple[str, int, IO[bytes]]]:
+    """
+    Последовательное чтение файлов архива. Tar-архивы читаются потоково, без перемотки.
+    Файловый объект действителен только до перехода к следующему файлу.
+    :param archive_path: Путь к архиву.
+    :return: Итератор кортежей (имя файла в архиве, размер файла, файловый объект).
+    """
+    if archive_path.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as archive:
+            for member_info in archive.infolist():
+                if member_info.is_dir():
+                    continue
+                with archive.open(member_info) as member_file:
+                    yield member_info.filename, member_info.file_size, member_file
+        return
+    with tarfile.open(archive_path, "r|*") as archive:
+        for member_info in archive:
+            if member_info.isfile():
+                yield member_info.name, member_info.size, archive.extractfile(member_info)
+
+
+def list_archive_members(archive_path: str) -> list[tuple[str, int]]:
+    """
+    Получение списка файлов архива без их распаковки.
+    :param archive_path: Путь к архиву.
+    :return: Список кортежей (относительный путь файла, размер файла).
+    """
+    members = []
+    if archive_path.lower().endswith(".zip"):
+        with zipfile.ZipFile(archive_path) as archive:
+            for member_info in archive.infolist():
+                if not member_info.is_dir():
+                    members.append((get_member_path(member_info.filename), member_info.file_size))
+    else:
+        with tarfile.open(archive_path, "r|*") as archive:
+            for member_info in archive:
+                if member_info.isfile():
+                    members.append((get_member_path(member_info.name), member_info.size))
+    return [member for member in members if member[0] != ""]
+
+
+def extract_archive_members(archive_path: str, scratch_path: str,
+                            accept: Callable[[str], bool]) -> Iterator[str]:
+    """
+    Потоковая распаковка выбранных файлов архива во временную директорию по одному: следующий
+    файл распаковывается только при запросе следующего элемента итератора, поэтому
+    вызывающий код может удалять обработанные файлы и ограничивать объём временной директории.
+    :param archive_path: Путь к архиву.
+    :param scratch_path: Путь к временной директории.
+    :param accept: Функция, получающая относительный путь файла и возвращающая True, если файл
+    нужно распаковать.
+    :return: Итератор путей к распакованным файлам.
+    """
+    for member_name, _, member_file in iter_archive_members(archive_path):
+        member_path = get_member_path(member_name)
+        if member_path == "" or not accept(member_path):
+            continue
+        scratch_file_path = os.path.join(scratch_path, member_path)
+        os.makedirs(os.path.dirname(scratch_file_path), exist_ok=True)
+        with open(scratch_file_path, "wb") as scratch_file:
+            shutil.copyfileobj(member_file, scratch_file, COPY_BUFFER_SIZE)
+        yield scratch_file_path
+
+
+class ArchiveWriter:
+    """
+    Запись файлов в zip- или tar-архив (сжатие tar-архива определяется по расширению).
+    """
+
+    def __init__(self, archive_path: str):
+        """
+        Создание архива.
+        :param archive_path: Путь к архиву.
+        """
+        self.is_zip = archive_path.lower().endswith(".zip")
+        self.exit_stack = ExitStack()
+        if self.is_zip:
+            self.archive = self.exit_stack.enter_context(
+                zipfile.ZipFile(archive_path, "w", zipfile.ZIP_DEFLATED))
+        else:
+            compression = TAR_COMPRESSIONS.get(os.path.splitext(archive_path)[1].lower(), "")
+            self.archive = self.exit_stack.enter_context(
+                tarfile.open(archive_path, "w:" + compression))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def add(self, file_path: str, member_path: str):
+        """
+        Добавление файла в архив.
+        :param file_path: Путь к добавляемому файлу.
+        :param member_path: Относительный путь файла внутри архива.
+        """
+        member_name = member_path.replace(os.sep, "/")
+        if self.is_zip:
+            self.archive.write(file_path, member_name)
+        else:
+            self.archive.add(file_path, member_name)
+
+    def close(self):
+        """
+        Завершение записи архива.
+        """
+        self.exit_stack.close()
+
+
+class ArchiveReader:
+    """
+    Чтение отдельных файлов архива. Zip-архив открывается один раз, и файлы читаются по
+    оглавлению без обхода архива. Tar-архив не имеет оглавления, поэтому каждый файл ищется
+    одним потоковым проходом (для чтения многих файлов используется extract_archive_members).
+    """
+
+    def __init__(self, archive_path: str):
+        """
+        Открытие архива.
+        :param archive_path: Путь к архиву.
+        """
+        self.archive_path = archive_path
+        self.exit_stack = ExitStack()
+        self.zip_archive = None
+        self.zip_members = None
+        if archive_path.lower().endswith(".zip"):
+            self.zip_archive = self.exit_stack.enter_context(zipfile.ZipFile(archive_path))
+            self.zip_members = {get_member_path(member_info.filename): member_info
+                                for member_info in self.zip_archive.infolist()
+                                if not member_info.is_dir()}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def read(self, member_path: str) -> bytes | None:
+        """
+        Чтение файла архива целиком.
+        :param member_path: Относительный путь файла.
+        :return: Содержимое файла или None, если файла в архиве нет.
+        """
+        if self.zip_members is not None:
+            member_info = self.zip_members.get(os.path.normpath(member_path))
+            return None if member_info is None else self.zip_archive.read(member_info)
+        for member_name, _, member_file in iter_archive_members(self.archive_path):
+            if get_member_path(member_name) == os.path.normpath(member_path):
+                return member_file.read()
+        return None
+
+    def close(self):
+        """
+        Закрытие архива.
+        """
+        self.exit_stack.close()
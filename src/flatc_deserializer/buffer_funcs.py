@@ -0,0 +1,448 @@
+"""
+    Модуль, включающий в себя функции для десериализации бинарных файлов Flatbuffers напрямую из
+    буфера (без вызова компилятора схемы), в том числе с представлением векторов в виде массивов
+    NumPy поверх исходного буфера.
+"""
+# pylint: disable=too-many-return-statements, too-many-branches
+import os
+import mmap
+import struct
+from importlib import import_module
+from logging import warning
+
+from i18n import t
+
+from encoding_funcs import write_output, get_schema_layout, OUTPUT_FORMAT_JSON
+from log_funcs import file_logger, get_message
+from schema_funcs import parse_schema
+
+UOFFSET = struct.Struct("<I")
+SOFFSET = struct.Struct("<i")
+VOFFSET = struct.Struct("<H")
+SCALAR_STRUCTS = {scalar_format: struct.Struct("<" + scalar_format) for scalar_format in
+                  "?bBhHiIqQfd"}
+MAX_DEPTH = 64
+
+
+def import_numpy():
+    """
+    Импорт модуля NumPy, необходимого для представления векторов в виде массивов.
+    :return: Модуль NumPy.
+    """
+    try:
+        return import_module("numpy")
+    except ModuleNotFoundError as exc:
+        raise ModuleNotFoundError(t("buffer_funcs.numpy_not_found")) from exc
+
+
+def open_buffer(binary_path: str) -> mmap.mmap | bytes:
+    """
+    Открытие бинарного файла в виде буфера только для чтения, отображённого в память.
+    :param binary_path: Путь к бинарному файлу.
+    :return: Буфер с содержимым файла.
+    """
+    with open(binary_path, "rb") as file:
+        if os.fstat(file.fileno()).st_size == 0:
+            return b""
+        return mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def parse_projection(field_paths: list[str]) -> dict | None:
+    """
+    Построение дерева выбранных полей по списку путей через точку. Элементы векторов обозначаются
+    сегментом "*" или "[*]" (weapons.*.name, weapons[*].name), который также можно опустить
+    (weapons.name).
+    :param field_paths: Список путей к полям.
+    :return: Дерево выбранных полей (None в листе означает все вложенные поля) или None, если
+    список пуст.
+    """
+    if field_paths is None or len(field_paths) < 1:
+        return None
+    projection = {}
+    for field_path in field_paths:
+        parts = [part for part in field_path.replace("[*]", ".*").replace("[]", ".*").split(".")
+                 if part != ""]
+        node = projection
+        for j, part in enumerate(parts):
+            if j == len(parts) - 1:
+                node[part] = None
+            elif part not in node:
+                node[part] = {}
+            elif node[part] is None:
+                break
+            node = node[part]
+    return projection
+
+
+def get_sub_projection(projection: dict | None, field_name: str) -> dict | None:
+    """
+    Получение поддерева выбранных полей для поля.
+    :param projection: Дерево выбранных полей.
+    :param field_name: Имя поля.
+    :return: Поддерево выбранных полей или None, если выбраны все вложенные поля.
+    """
+    return projection.get(field_name) if projection is not None else None
+
+
+def get_element_projection(projection: dict | None) -> dict | None:
+    """
+    Получение поддерева выбранных полей для элементов вектора или массива (с учётом сегмента "*").
+    :param projection: Дерево выбранных полей вектора.
+    :return: Поддерево выбранных полей элементов.
+    """
+    if projection is not None and "*" in projection:
+        return projection["*"]
+    return projection
+
+
+def get_field_position(buffer, table_position: int, slot: int) -> int:
+    """
+    Получение позиции значения поля таблицы в буфере по его номеру в vtable.
+    :param buffer: Буфер.
+    :param table_position: Позиция таблицы в буфере.
+    :param slot: Номер поля в vtable.
+    :return: Позиция значения поля или 0, если поле отсутствует.
+    """
+    vtable_position = table_position - SOFFSET.unpack_from(buffer, table_position)[0]
+    field_voffset = 4 + 2 * slot
+    if field_voffset >= VOFFSET.unpack_from(buffer, vtable_position)[0]:
+        return 0
+    field_offset = VOFFSET.unpack_from(buffer, vtable_position + field_voffset)[0]
+    return table_position + field_offset if field_offset != 0 else 0
+
+
+def get_enum_name(context: dict, field_type: dict, value: int) -> str | int:
+    """
+    Получение имени значения перечисления (как в выводе компилятора схемы).
+    :param context: Контекст десериализации.
+    :param field_type: Словарь описания типа перечисления или типа объединения.
+    :param value: Числовое значение.
+    :return: Имя значения или само значение, если оно не объявлено.
+    """
+    return context["types"][field_type["name"]]["values"].get(value, value)
+
+
+def read_string(buffer, position: int) -> str:
+    """
+    Чтение строки по позиции смещения на неё.
+    :param buffer: Буфер.
+    :param position: Позиция смещения на строку.
+    :return: Строка.
+    """
+    position += UOFFSET.unpack_from(buffer, position)[0]
+    length = UOFFSET.unpack_from(buffer, position)[0]
+    return bytes(buffer[position + 4:position + 4 + length]).decode("utf-8", errors="replace")
+
+
+def decode_struct(context: dict, position: int, name: str, projection: dict | None = None) -> dict:
+    """
+    Десериализация структуры в словарь.
+    :param context: Контекст десериализации.
+    :param position: Позиция структуры в буфере.
+    :param name: Полное имя структуры.
+    :param projection: Дерево выбранных полей. Если None, десериализуются все поля.
+    :return: Словарь полей структуры.
+    """
+    return {field["name"]: decode_inline(context, position + field["offset"], field["type"],
+                                         get_sub_projection(projection, field["name"]))
+            for field in context["types"][name]["fields"]
+            if projection is None or field["name"] in projection}
+
+
+def decode_inline(context: dict, position: int, field_type: dict,
+                  projection: dict | None = None):
+    """
+    Десериализация значения, хранящегося непосредственно в структуре или таблице (скаляр,
+    перечисление, структура, массив фиксированной длины).
+    :param context: Контекст десериализации.
+    :param position: Позиция значения в буфере.
+    :param field_type: Словарь описания типа.
+    :param projection: Дерево выбранных полей структуры. Если None, десериализуются все поля.
+    :return: Значение.
+    """
+    kind = field_type["kind"]
+    if kind == "scalar":
+        return SCALAR_STRUCTS[field_type["format"]].unpack_from(context["buffer"], position)[0]
+    if kind == "enum":
+        return get_enum_name(context, field_type, SCALAR_STRUCTS[field_type["format"]].unpack_from(
+            context["buffer"], position)[0])
+    if kind == "union_type":
+        return get_enum_name(context, field_type, context["buffer"][position])
+    if kind == "struct":
+        return decode_struct(context, position, field_type["name"], projection)
+    element_type = field_type["element"]
+    element_size = get_element_size(context, element_type)
+    projection = get_element_projection(projection)
+    return [decode_inline(context, position + i * element_size, element_type, projection)
+            for i in range(field_type["length"])]
+
+
+def get_element_size(context: dict, field_type: dict) -> int:
+    """
+    Получение размера элемента вектора или массива фиксированной длины.
+    :param context: Контекст десериализации.
+    :param field_type: Словарь описания типа элемента.
+    :return: Размер элемента в байтах.
+    """
+    if field_type["kind"] in ("scalar", "enum"):
+        return SCALAR_STRUCTS[field_type["format"]].size
+    if field_type["kind"] == "union_type":
+        return 1
+    if field_type["kind"] == "struct":
+        return context["types"][field_type["name"]]["size"]
+    if field_type["kind"] == "array":
+        return get_element_size(context, field_type["element"]) * field_type["length"]
+    return UOFFSET.size
+
+
+def get_numpy_dtype(context: dict, field_type: dict):
+    """
+    Получение типа данных NumPy для скаляра, перечисления, структуры или массива фиксированной
+    длины (структуры представляются структурированными типами с явными смещениями полей).
+    :param context: Контекст десериализации.
+    :param field_type: Словарь описания типа.
+    :return: Тип данных NumPy.
+    """
+    numpy = context["numpy"]
+    kind = field_type["kind"]
+    if kind in ("scalar", "enum"):
+        return numpy.dtype("<" + field_type["format"])
+    if kind == "union_type":
+        return numpy.dtype("u1")
+    if kind == "array":
+        return numpy.dtype((get_numpy_dtype(context, field_type["element"]),
+                            (field_type["length"],)))
+    dtypes = context["dtypes"]
+    if field_type["name"] not in dtypes:
+        struct_type = context["types"][field_type["name"]]
+        dtypes[field_type["name"]] = numpy.dtype({
+            "names": [field["name"] for field in struct_type["fields"]],
+            "formats": [get_numpy_dtype(context, field["type"]) for field in struct_type["fields"]],
+            "offsets": [field["offset"] for field in struct_type["fields"]],
+            "itemsize": struct_type["size"]})
+    return dtypes[field_type["name"]]
+
+
+def decode_vector(context: dict, position: int, field_type: dict, union_types=None,
+                  projection: dict | None = None):
+    """
+    Десериализация вектора по позиции смещения на него.
+    :param context: Контекст десериализации.
+    :param position: Позиция смещения на вектор.
+    :param field_type: Словарь описания типа вектора.
+    :param union_types: Список числовых типов элементов для вектора объединений.
+    :param projection: Дерево выбранных полей элементов. Если None, десериализуются все поля.
+    :return: Список элементов или массив NumPy (для векторов скаляров и структур в режиме массивов).
+    """
+    buffer = context["buffer"]
+    position += UOFFSET.unpack_from(buffer, position)[0]
+    length = UOFFSET.unpack_from(buffer, position)[0]
+    position += UOFFSET.size
+    element_type = field_type["element"]
+    kind = element_type["kind"]
+    projection = get_element_projection(projection)
+    if kind in ("scalar", "enum", "struct", "union_type"):
+        if context["numpy"] is not None:
+            array = context["numpy"].frombuffer(buffer, get_numpy_dtype(context, element_type),
+                                                length, position)
+            return array[list(projection)] if kind == "struct" and projection is not None \
+                else array
+        if kind == "scalar":
+            return list(struct.unpack_from(f"<{length}{element_type['format']}", buffer,
+                                           position))
+        element_size = get_element_size(context, element_type)
+        return [decode_inline(context, position + i * element_size, element_type, projection)
+                for i in range(length)]
+    if kind == "string":
+        return [read_string(buffer, position + i * UOFFSET.size) for i in range(length)]
+    if kind == "table":
+        return [decode_table(context, position + i * UOFFSET.size, element_type["name"],
+                             projection) for i in range(length)]
+    if union_types is None or len(union_types) != length:
+        raise ValueError(t("buffer_funcs.union_types_mismatch") % element_type["name"])
+    union = context["types"][element_type["name"]]
+    return [decode_table(context, position + i * UOFFSET.size, union["types"][union_types[i]],
+                         projection)
+            if union["types"].get(union_types[i]) is not None else None for i in range(length)]
+
+
+def decode_table(context: dict, position: int, name: str, projection: dict | None = None) -> dict:
+    """
+    Десериализация таблицы в словарь по позиции смещения на неё. Отсутствующие в буфере и
+    устаревшие поля не выводятся (как в выводе компилятора схемы). Невыбранные поля пропускаются
+    без чтения их содержимого. Вложенность таблиц глубже MAX_DEPTH (например, при зацикленных
+    смещениях в повреждённом файле) считается ошибкой декодирования.
+    :param context: Контекст десериализации.
+    :param position: Позиция смещения на таблицу.
+    :param name: Полное имя таблицы.
+    :param projection: Дерево выбранных полей. Если None, десериализуются все поля.
+    :return: Словарь полей таблицы.
+    """
+    if context["depth"] >= MAX_DEPTH:
+        raise ValueError(t("buffer_funcs.max_depth") % MAX_DEPTH)
+    context["depth"] += 1
+    buffer = context["buffer"]
+    position += UOFFSET.unpack_from(buffer, position)[0]
+    result = {}
+    union_types = {}
+    for field in context["types"][name]["fields"]:
+        if field["deprecated"]:
+            continue
+        field_name = field["name"]
+        field_type = field["type"]
+        kind = field_type["kind"]
+        element_kind = field_type["element"]["kind"] if kind == "vector" else kind
+        is_selected = projection is None or field_name in projection
+        if not is_selected and (element_kind != "union_type" or field_name[:-5] not in projection):
+            continue
+        field_position = get_field_position(buffer, position, field["slot"])
+        if field_position == 0:
+            continue
+        if element_kind == "union_type":
+            if kind == "vector":
+                union_position = field_position + UOFFSET.unpack_from(buffer, field_position)[0]
+                union_types[field_name] = list(buffer[
+                    union_position + 4:union_position + 4 +
+                    UOFFSET.unpack_from(buffer, union_position)[0]])
+            else:
+                union_types[field_name] = buffer[field_position]
+            if not is_selected:
+                continue
+        sub_projection = get_sub_projection(projection, field_name)
+        if kind == "string":
+            result[field_name] = read_string(buffer, field_position)
+        elif kind == "table":
+            result[field_name] = decode_table(context, field_position, field_type["name"],
+                                              sub_projection)
+        elif kind == "vector":
+            result[field_name] = decode_vector(context, field_position, field_type,
+                                               union_types.get(field_name + "_type"),
+                                               sub_projection)
+        elif kind == "union":
+            union_type = context["types"][field_type["name"]]["types"].get(
+                union_types.get(field_name + "_type", 0))
+            if union_type is not None:
+                result[field_name] = decode_table(context, field_position, union_type,
+                                                  sub_projection)
+        else:
+            result[field_name] = decode_inline(context, field_position, field_type,
+                                               sub_projection)
+    context["depth"] -= 1
+    return result
+
+
+def decode_binary(schema_path: str, binary_path: str, return_arrays: bool = False,
+                  field_paths: list[str] | None = None) -> dict:
+    """
+    Десериализация бинарного файла по схеме Flatbuffers без вызова компилятора схемы с выбросом
+    исключения при ошибке.
+    :param schema_path: Путь к файлу схемы.
+    :param binary_path: Путь к бинарному файлу.
+    :param return_arrays: Если True, векторы скаляров и структур возвращаются в виде массивов NumPy
+    (структуры - со структурированным типом данных), ссылающихся на исходный буфер без копирования.
+    Иначе - в виде списков.
+    :param field_paths: Список путей к выбранным полям (см. parse_projection). Если пустой,
+    десериализуются все поля.
+    :return: Десериализованный бинарный файл в виде словаря.
+    """
+    buffer = open_buffer(binary_path)
+    try:
+        return decode_buffer(schema_path, buffer, return_arrays, field_paths)
+    finally:
+        if not return_arrays and isinstance(buffer, mmap.mmap):
+            buffer.close()
+
+
+def decode_buffer(schema_path: str, buffer, return_arrays: bool = False,
+                  field_paths: list[str] | None = None) -> dict:
+    """
+    Десериализация содержимого бинарного файла, уже прочитанного в память, по схеме Flatbuffers
+    без вызова компилятора схемы с выбросом исключения при ошибке.
+    :param schema_path: Путь к файлу схемы.
+    :param buffer: Буфер с содержимым бинарного файла (bytes, bytearray или mmap).
+    :param return_arrays: Если True, векторы скаляров и структур возвращаются в виде массивов NumPy,
+    ссылающихся на буфер без копирования. Иначе - в виде списков.
+    :param field_paths: Список путей к выбранным полям (см. parse_projection). Если пустой,
+    десериализуются все поля.
+    :return: Десериализованный бинарный файл в виде словаря.
+    """
+    schema = parse_schema(os.path.abspath(schema_path))
+    if schema["root_type"] is None:
+        raise ValueError(t("buffer_funcs.no_root_type") % schema_path)
+    context = {"buffer": buffer, "types": schema["types"],
+               "numpy": import_numpy() if return_arrays else None, "dtypes": {}, "depth": 0}
+    return decode_table(context, 0, schema["root_type"], parse_projection(field_paths))
+
+
+def deserialize_buffer(schema_path: str, binary_path: str, return_arrays: bool = False,
+                       field_paths: list[str] | None = None) -> dict:
+    """
+    Десериализация бинарного файла по схеме Flatbuffers без вызова компилятора схемы.
+    :param schema_path: Путь к файлу схемы.
+    :param binary_path: Путь к бинарному файлу.
+    :param return_arrays: Если True, векторы скаляров и структур возвращаются в виде массивов NumPy
+    (структуры - со структурированным типом данных), ссылающихся на исходный буфер без копирования.
+    Иначе - в виде списков.
+    :param field_paths: Список путей к выбранным полям (см. parse_projection). Если пустой,
+    десериализуются все поля.
+    :return: Десериализованный бинарный файл в виде словаря.
+    """
+    if not os.path.isfile(schema_path) or not os.path.isfile(binary_path):
+        return {}
+    try:
+        return decode_binary(schema_path, binary_path, return_arrays, field_paths)
+    except (struct.error, IndexError, KeyError, ValueError) as exc:
+        warning(get_message("buffer_funcs.decode_error"), binary_path)
+        warning("%s", exc)
+        return {}
+
+
+def deserialize_arrays(schema_path: str, binary_path: str,
+                       field_paths: list[str] | None = None) -> dict:
+    """
+    Десериализация бинарного файла с представлением векторов скаляров и структур в виде массивов
+    NumPy поверх отображённого в память файла (без разбора JSON и копирования данных).
+    :param schema_path: Путь к файлу схемы.
+    :param binary_path: Путь к бинарному файлу.
+    :param field_paths: Список путей к выбранным полям (см. parse_projection).
+    :return: Десериализованный бинарный файл в виде словаря.
+    """
+    return deserialize_buffer(schema_path, binary_path, True, field_paths)
+
+
+def deserialize_to_json(schema_path: str, binary_path: str, output_path: str = "",
+                        field_paths: list[str] | None = None,
+                        output_format: str = OUTPUT_FORMAT_JSON) -> str:
+    """
+    Десериализация бинарного файла без вызова компилятора схемы и запись результата в JSON-файл
+    или файл другого формата (пути вывода задаются так же, как в flatc_funcs.deserialize).
+    :param schema_path: Путь к файлу схемы.
+    :param binary_path: Путь к бинарному файлу.
+    :param output_path: Путь к директории или файлу вывода.
+    :param field_paths: Список путей к выбранным полям (см. parse_projection). Если пустой,
+    записываются все поля.
+    :param output_format: Формат файла вывода (json, msgpack или cbor).
+    :return: Путь к файлу вывода или пустая строка при ошибке.
+    """
+    if not os.path.isfile(schema_path) or not os.path.isfile(binary_path):
+        return ""
+    binary_path = os.path.abspath(binary_path)
+    binary_name = os.path.splitext(os.path.basename(binary_path))[0]
+    output_path = os.path.abspath(output_path) if output_path != "" else \
+        os.path.dirname(binary_path)
+    if os.path.splitext(output_path)[1].lower() == ".json":
+        json_path = output_path
+    elif os.path.isfile(output_path):
+        return ""
+    else:
+        json_path = os.path.join(output_path, binary_name + ".json")
+    try:
+        result = decode_binary(schema_path, binary_path, False, field_paths)
+    except (struct.error, IndexError, KeyError, ValueError) as exc:
+        warning(get_message("flatc_funcs.json_error"), binary_path)
+        warning("%s", exc)
+        return ""
+    os.makedirs(os.path.dirname(json_path), exist_ok=True)
+    json_path = write_output(result, json_path, output_format, get_schema_layout(schema_path))
+    file_logger.info(get_message("flatc_funcs.json_ok"), binary_path, json_path)
+    return json_path
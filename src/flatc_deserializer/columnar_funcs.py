@@ -0,0 +1,434 @@
+"""
+    Модуль, включающий в себя функции для экспорта множества бинарных файлов одной схемы в
+    колоночную таблицу: каждое скалярное поле дописывается в типизированный массив, вложенные
+    таблицы и структуры разворачиваются в колонки с составными именами, а векторы и строки
+    хранятся как смещения и значения (раскладка, совместимая с Arrow).
+"""
+# pylint: disable=too-many-arguments, too-many-branches
+import errno
+import json
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterator
+from logging import info, warning
+from shutil import rmtree
+
+from i18n import t
+from tqdm import tqdm
+
+from archive_funcs import is_archive_path, make_scratch_path
+from buffer_funcs import import_numpy, open_buffer, get_field_position, parse_projection, \
+    get_sub_projection, get_element_projection, UOFFSET, SCALAR_STRUCTS, MAX_DEPTH
+from general_funcs import DeserializeOptions, SourceBinaries, get_directory_path, \
+    get_schema_paths, get_binary_tuples, verify_and_quarantine
+from log_funcs import get_message
+from schema_funcs import parse_schema, parse_number
+from source_funcs import get_input_source, is_remote_path
+
+COLUMN_FORMAT_NPZ = "npz"
+COLUMN_FORMAT_NPY = "npy"
+COLUMN_FORMATS = (COLUMN_FORMAT_NPZ, COLUMN_FORMAT_NPY)
+FILE_INDEX_COLUMN = "file_index"
+FILES_COLUMN = "files"
+OFFSETS_SUFFIX = ".offsets"
+DATA_SUFFIX = ".data"
+ITEM_SUFFIX = ".item"
+COLUMNS_MANIFEST = "columns.json"
+# Типы array для форматов скаляров (bool хранится как ubyte и приводится к bool при записи).
+ARRAY_TYPECODES = {"?": "B", "b": "b", "B": "B", "h": "h", "H": "H", "i": "i", "I": "I",
+                   "q": "q", "Q": "Q", "f": "f", "d": "d"}
+NATIVE_LITTLE_ENDIAN = sys.byteorder == "little"
+
+
+class ColumnTable:
+    """
+    Колоночная таблица, в которую дописываются бинарные файлы одной схемы. Каждый файл - одна
+    строка корневого уровня (колонка file_index - номер файла в колонке files). Поля вложенных
+    таблиц и структур - колонки с именами через точку. Вектор хранится как колонка
+    <путь>.offsets (int64, строк уровня + 1) и колонки элементов <путь>.item...; строка - как
+    <путь>.offsets (смещения в байтах) и <путь>.data (UTF-8). Массивы фиксированной длины -
+    двумерные колонки. Поля объединений не экспортируются (экспортируется только <поле>_type),
+    рекурсивные (не через вектор) вложенные таблицы пропускаются.
+    """
+
+    def __init__(self, schema_path: str, field_paths: list[str] | None = None):
+        """
+        Создание таблицы.
+        :param schema_path: Путь к файлу схемы.
+        :param field_paths: Список путей к выбранным полям (см. buffer_funcs.parse_projection).
+        Если пустой, экспортируются все поля.
+        """
+        schema = parse_schema(os.path.abspath(schema_path))
+        if schema["root_type"] is None:
+            raise ValueError(t("buffer_funcs.no_root_type") % schema_path)
+        self.types = schema["types"]
+        self.root_type = schema["root_type"]
+        self.projection = parse_projection(field_paths)
+        self.columns = {FILE_INDEX_COLUMN: array("I")}
+        self.bool_columns = set()
+        self.shapes = {}
+        self.files = []
+        self.buffer = b""
+        self.depth = 0
+
+    def get_column(self, path: str, scalar_format: str) -> array:
+        """
+        Получение колонки скаляров (создаётся при первом обращении).
+        :param path: Имя колонки.
+        :param scalar_format: Формат скаляра (как в schema_funcs.SCALAR_FORMATS).
+        :return: Массив колонки.
+        """
+        column = self.columns.get(path)
+        if column is None:
+            column = self.columns[path] = array(ARRAY_TYPECODES[scalar_format])
+            if scalar_format == "?":
+                self.bool_columns.add(path)
+        return column
+
+    def get_offsets(self, path: str) -> array:
+        """
+        Получение колонки смещений вектора или строки (создаётся с начальным нулём).
+        :param path: Путь вектора или строки.
+        :return: Массив смещений.
+        """
+        column = self.columns.get(path + OFFSETS_SUFFIX)
+        if column is None:
+            column = self.columns[path + OFFSETS_SUFFIX] = array("q", [0])
+        return column
+
+    def get_default_value(self, field: dict) -> int | float:
+        """
+        Получение значения по умолчанию скалярного поля таблицы.
+        :param field: Словарь поля.
+        :return: Значение по умолчанию.
+        """
+        default = field["default"]
+        if default is None:
+            return 0
+        if field["type"]["kind"] == "enum":
+            for value, value_name in self.types[field["type"]["name"]]["values"].items():
+                if value_name == default:
+                    return value
+        return parse_number(default)
+
+    def append_file(self, binary_path: str, file_name: str = "") -> bool:
+        """
+        Добавление бинарного файла в таблицу. Если файл не удалось декодировать, все колонки
+        возвращаются к состоянию до него.
+        :param binary_path: Путь к бинарному файлу.
+        :param file_name: Имя файла для колонки files (по умолчанию - путь к файлу).
+        :return: True, если файл добавлен.
+        """
+        lengths = {path: len(column) for path, column in self.columns.items()}
+        self.buffer = open_buffer(binary_path)
+        self.depth = 0
+        try:
+            self.append_table(0, self.root_type, "", self.projection, {self.root_type})
+        except (struct.error, IndexError, KeyError, ValueError, UnicodeDecodeError) as exc:
+            for path, column in list(self.columns.items()):
+                if path in lengths:
+                    del column[lengths[path]:]
+                else:
+                    del self.columns[path]
+            warning(get_message("columnar_funcs.file_error"), binary_path, exc)
+            return False
+        finally:
+            if not isinstance(self.buffer, bytes):
+                self.buffer.close()
+            self.buffer = b""
+        self.columns[FILE_INDEX_COLUMN].append(len(self.files))
+        self.files.append(file_name if file_name != "" else binary_path)
+        return True
+
+    def append_table(self, position: int | None, name: str, prefix: str,
+                     projection: dict | None, ancestors: set[str]):
+        """
+        Добавление полей таблицы в колонки текущего уровня.
+        :param position: Позиция смещения на таблицу или None, если таблица отсутствует (все поля
+        получают значения по умолчанию, векторы и строки - пустые).
+        :param name: Полное имя таблицы.
+        :param prefix: Префикс имён колонок.
+        :param projection: Дерево выбранных полей. Если None, экспортируются все поля.
+        :param ancestors: Множество имён таблиц, в которые вложена текущая (без векторов).
+        """
+        buffer = self.buffer
+        if position is not None:
+            if self.depth >= MAX_DEPTH:
+                raise ValueError(t("buffer_funcs.max_depth") % MAX_DEPTH)
+            position += UOFFSET.unpack_from(buffer, position)[0]
+        self.depth += 1
+        for field in self.types[name]["fields"]:
+            field_type = field["type"]
+            kind = field_type["kind"]
+            if field["deprecated"] or kind == "union" or \
+                    (projection is not None and field["name"] not in projection):
+                continue
+            if kind == "table" and field_type["name"] in ancestors:
+                continue
+            path = prefix + field["name"]
+            field_position = None
+            if position is not None:
+                field_position = get_field_position(buffer, position, field["slot"]) or None
+            sub_projection = get_sub_projection(projection, field["name"])
+            if kind in ("scalar", "enum", "union_type"):
+                scalar_format = "B" if kind == "union_type" else field_type["format"]
+                self.get_column(path, scalar_format).append(
+                    SCALAR_STRUCTS[scalar_format].unpack_from(buffer, field_position)[0]
+                    if field_position is not None else self.get_default_value(field))
+            elif kind == "string":
+                self.append_string(field_position, path)
+            elif kind == "table":
+                self.append_table(field_position, field_type["name"], path + ".", sub_projection,
+                                  ancestors | {field_type["name"]})
+            elif kind == "vector":
+                self.append_vector(field_position, field_type["element"], path, sub_projection)
+            else:
+                self.append_inline(field_position, field_type, path, sub_projection, ())
+        self.depth -= 1
+
+    def append_inline(self, position: int | None, field_type: dict, path: str,
+                      projection: dict | None, shape: tuple):
+        """
+        Добавление значения, хранящегося непосредственно в структуре или таблице.
+        :param position: Позиция значения или None, если значение отсутствует (нули).
+        :param field_type: Словарь описания типа.
+        :param path: Имя колонки.
+        :param projection: Дерево выбранных полей структуры.
+        :param shape: Размерность массивов фиксированной длины, содержащих значение.
+        """
+        kind = field_type["kind"]
+        if kind in ("scalar", "enum", "union_type"):
+            scalar_format = "B" if kind == "union_type" else field_type["format"]
+            self.get_column(path, scalar_format).append(
+                SCALAR_STRUCTS[scalar_format].unpack_from(self.buffer, position)[0]
+                if position is not None else 0)
+            if len(shape) > 0:
+                self.shapes[path] = shape
+        elif kind == "struct":
+            for field in self.types[field_type["name"]]["fields"]:
+                if projection is None or field["name"] in projection:
+                    self.append_inline(None if position is None else position + field["offset"],
+                                       field["type"], path + "." + field["name"],
+                                       get_sub_projection(projection, field["name"]), shape)
+        else:
+            element_type = field_type["element"]
+            element_size = get_inline_element_size(self.types, element_type)
+            for i in range(field_type["length"]):
+                self.append_inline(None if position is None else position + i * element_size,
+                                   element_type, path, projection,
+                                   shape + (field_type["length"],))
+
+    def append_string(self, position: int | None, path: str):
+        """
+        Добавление строки (отсутствующая строка - пустая).
+        :param position: Позиция смещения на строку или None.
+        :param path: Путь строки.
+        """
+        offsets = self.get_offsets(path)
+        data = self.columns.setdefault(path + DATA_SUFFIX, array("B"))
+        if position is not None:
+            position += UOFFSET.unpack_from(self.buffer, position)[0]
+            length = UOFFSET.unpack_from(self.buffer, position)[0]
+            data.frombytes(self.buffer[position + 4:position + 4 + length])
+        offsets.append(len(data))
+
+    def append_vector(self, position: int | None, element_type: dict, path: str,
+                      projection: dict | None):
+        """
+        Добавление вектора: элементы дописываются в колонки уровня <путь>.item, а в колонку
+        смещений - новое число элементов уровня.
+        :param position: Позиция смещения на вектор или None (пустой вектор).
+        :param element_type: Словарь описания типа элемента.
+        :param path: Путь вектора.
+        :param projection: Дерево выбранных полей элементов.
+        """
+        offsets = self.get_offsets(path)
+        item_path = path + ITEM_SUFFIX
+        kind = element_type["kind"]
+        length = 0
+        if position is not None:
+            buffer = self.buffer
+            position += UOFFSET.unpack_from(buffer, position)[0]
+            length = UOFFSET.unpack_from(buffer, position)[0]
+            position += UOFFSET.size
+            projection = get_element_projection(projection)
+            if kind in ("scalar", "enum", "union_type"):
+                scalar_format = "B" if kind == "union_type" else element_type["format"]
+                column = self.get_column(item_path, scalar_format)
+                size = SCALAR_STRUCTS[scalar_format].size
+                if NATIVE_LITTLE_ENDIAN:
+                    column.frombytes(buffer[position:position + length * size])
+                else:
+                    column.extend(struct.unpack_from(f"<{length}{scalar_format}", buffer,
+                                                     position))
+            elif kind == "struct":
+                size = get_inline_element_size(self.types, element_type)
+                for i in range(length):
+                    self.append_inline(position + i * size, element_type, item_path, projection,
+                                       ())
+            elif kind == "string":
+                for i in range(length):
+                    self.append_string(position + i * UOFFSET.size, item_path)
+            elif kind == "table":
+                for i in range(length):
+                    self.append_table(position + i * UOFFSET.size, element_type["name"],
+                                      item_path + ".", projection, {element_type["name"]})
+            else:
+                length = 0
+        offsets.append(offsets[-1] + length)
+
+    def get_arrays(self) -> dict:
+        """
+        Получение колонок в виде массивов NumPy (без копирования данных, поэтому после вызова
+        файлы в таблицу больше не добавляются).
+        :return: Словарь {имя колонки: массив NumPy}.
+        """
+        numpy = import_numpy()
+        arrays = {}
+        for path, column in self.columns.items():
+            values = numpy.frombuffer(column, dtype=column.typecode) if len(column) > 0 else \
+                numpy.zeros(0, dtype=column.typecode)
+            if path in self.bool_columns:
+                values = values.view(numpy.bool_)
+            if path in self.shapes:
+                values = values.reshape((-1,) + self.shapes[path])
+            arrays[path] = values
+        arrays[FILES_COLUMN] = numpy.array(self.files, dtype=str)
+        return arrays
+
+    def save(self, output_path: str, column_format: str = COLUMN_FORMAT_NPZ) -> str:
+        """
+        Запись таблицы: в один файл .npz или в директорию с файлом .npy на каждую колонку (такие
+        файлы можно открыть через numpy.load(..., mmap_mode="r") без чтения в память) и описанием
+        колонок columns.json.
+        :param output_path: Путь к файлу .npz или к директории.
+        :param column_format: Формат: npz или npy.
+        :return: Путь к записанному файлу или директории.
+        """
+        numpy = import_numpy()
+        arrays = self.get_arrays()
+        if column_format == COLUMN_FORMAT_NPZ:
+            if not output_path.lower().endswith(".npz"):
+                output_path += ".npz"
+            numpy.savez(output_path, **arrays)
+            return output_path
+        os.makedirs(output_path, exist_ok=True)
+        for path, values in arrays.items():
+            numpy.save(os.path.join(output_path, path + ".npy"), values)
+        with open(os.path.join(output_path, COLUMNS_MANIFEST), "w", encoding="utf-8") as file:
+            json.dump({"root_type": self.root_type, "rows": len(self.files),
+                       "columns": {path: {"dtype": values.dtype.str, "shape": values.shape}
+                                   for path, values in arrays.items()}}, file, indent=1)
+        return output_path
+
+
+def get_inline_element_size(types: dict, field_type: dict) -> int:
+    """
+    Получение размера значения, хранящегося непосредственно в структуре (скаляр, перечисление,
+    структура, массив фиксированной длины).
+    :param types: Словарь типов схемы.
+    :param field_type: Словарь описания типа.
+    :return: Размер в байтах.
+    """
+    if field_type["kind"] in ("scalar", "enum"):
+        return SCALAR_STRUCTS[field_type["format"]].size
+    if field_type["kind"] == "union_type":
+        return 1
+    if field_type["kind"] == "struct":
+        return types[field_type["name"]]["size"]
+    return get_inline_element_size(types, field_type["element"]) * field_type["length"]
+
+
+def iter_column_binaries(binaries_path: str, schema_paths: list[str], options: DeserializeOptions,
+                         invalid_results: list) -> Iterator[tuple[str, str, str]]:
+    """
+    Обход бинарных файлов для экспорта в колоночные таблицы с опциональной проверкой структуры.
+    Файлы архива и хранилища объектов записываются по одному во временную директорию и удаляются
+    после обработки.
+    :param binaries_path: Путь к директории с бинарными файлами, zip/tar-архиву с ними или URL
+    префикса в хранилище объектов.
+    :param schema_paths: Список путей к файлам схем.
+    :param options: Параметры (используются verify, check_identifier и quarantine_path).
+    :param invalid_results: Список, в который добавляются некорректные файлы и файлы, которые не
+    удалось прочитать из источника.
+    :return: Итератор кортежей (путь к бинарному файлу, путь к файлу схемы, имя файла в таблице).
+    """
+    if not is_archive_path(binaries_path) and not is_remote_path(binaries_path):
+        binary_tuples = get_binary_tuples([binaries_path], schema_paths)
+        if options.verify or options.check_identifier:
+            binary_tuples, invalid_tuples = verify_and_quarantine(
+                binary_tuples, binaries_path, options.check_identifier, options.quarantine_path)
+            invalid_results.extend(invalid_tuples)
+        for binary_path, schema_path in sorted(binary_tuples):
+            yield binary_path, schema_path, os.path.relpath(binary_path, binaries_path).replace(
+                os.sep, "/")
+        return
+    scratch_path = make_scratch_path()
+    try:
+        with get_input_source(binaries_path) as source:
+            source_binaries = SourceBinaries(source, scratch_path, schema_paths, options)
+            for binary_path in source_binaries:
+                yield binary_path, source_binaries.get_schema_path(binary_path), \
+                    source.get_location(os.path.relpath(binary_path, scratch_path))
+                os.remove(binary_path)
+            invalid_results.extend(source_binaries.invalid_results +
+                                   source_binaries.failed_results)
+    finally:
+        rmtree(scratch_path, ignore_errors=True)
+
+
+def execute_export_columns(schemas_path: str, binaries_path: str, output_path: str,
+                           column_format: str = COLUMN_FORMAT_NPZ,
+                           options: DeserializeOptions | None = None) -> (int | str):
+    """
+    Экспорт всех бинарных файлов Flatbuffers в директории в колоночные таблицы без вызова
+    компилятора схемы: по одной таблице (<схема>.npz или директория <схема> с файлами .npy) на
+    каждую схему, для которой нашлись файлы.
+    :param schemas_path: Путь к директории с файлами схем.
+    :param binaries_path: Путь к директории с бинарными файлами, zip/tar-архиву с ними или URL
+    префикса в хранилище объектов.
+    :param output_path: Путь к директории вывода. Если пустой, таблицы записываются в директорию
+    бинарных файлов (или в текущую директорию для архива и хранилища объектов).
+    :param column_format: Формат таблиц: npz или npy.
+    :param options: Параметры (используются field_paths, verify, check_identifier и
+    quarantine_path). Если выбранные поля не заданы, экспортируются все поля.
+    :return: Код ошибки или строка об ошибке.
+    """
+    if options is None:
+        options = DeserializeOptions()
+    schemas_path = get_directory_path(schemas_path, "main.tkinter_fbs_directory_select")
+    binaries_path = get_directory_path(binaries_path, "main.tkinter_binary_directory_select", True)
+    if output_path == "":
+        output_path = binaries_path if os.path.isdir(binaries_path) else os.getcwd()
+    schema_paths = get_schema_paths(schemas_path)
+    if len(schema_paths) < 1:
+        info(get_message("main.no_schema_files_found"), schemas_path)
+        return os.EX_OK
+    import_numpy()
+    tables = {}
+    failed_count = 0
+    invalid_results = []
+    for binary_path, schema_path, file_name in tqdm(iter_column_binaries(
+            binaries_path, schema_paths, options, invalid_results), desc=t("main.files")):
+        if schema_path not in tables:
+            try:
+                tables[schema_path] = ColumnTable(schema_path, options.field_paths)
+            except (IndexError, KeyError, ValueError) as exc:
+                warning(get_message("columnar_funcs.schema_skipped"), schema_path, exc)
+                tables[schema_path] = None
+        if tables[schema_path] is None or not tables[schema_path].append_file(binary_path,
+                                                                              file_name):
+            failed_count += 1
+    tables = {schema_path: table for schema_path, table in tables.items() if table is not None}
+    os.makedirs(output_path, exist_ok=True)
+    for schema_path, table in tables.items():
+        table_path = table.save(os.path.join(output_path, os.path.splitext(
+            os.path.basename(schema_path))[0]), column_format)
+        info(get_message("main.columns_written"), len(table.files), len(table.columns),
+             table_path)
+    failed_count += len(invalid_results)
+    info(get_message("main.columns_summary"), sum(len(table.files) for table in tables.values()),
+         failed_count)
+    return os.EX_OK if failed_count == 0 else errno.EIO
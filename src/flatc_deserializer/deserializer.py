@@ -9,7 +9,9 @@ from i18n import t
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "."))
 
-from general_funcs import init_app, get_flatc_path, execute_deserialize
+from profile_funcs import run_profiled
+from general_funcs import init_app, init_logging, get_flatc_path, add_deserialize_arguments, \
+    get_deserialize_options, execute_deserialize
 
 
 def main() -> int | str:
@@ -25,11 +27,15 @@ def main() -> int | str:
                         help=t("main.binary_files_arg"))
     parser.add_argument("-o", "--output_path", type=str, default="",
                         help=t("main.output_directory_arg"))
-    parser.add_argument("-f", "--flatc_path", type=str, default="", help=t("main.flatc_path_arg"))
+    add_deserialize_arguments(parser)
     args = parser.parse_args()
-    return execute_deserialize(
+    init_logging(args.log_mode)
+    flatc_times = []
+    options = get_deserialize_options(args, flatc_times.append if args.profile != "" else None)
+    return run_profiled(
+        args.profile, flatc_times, execute_deserialize,
         get_flatc_path(os.getcwd(), True, False) if args.flatc_path == "" else args.flatc_path,
-        args.schema_path, args.binary_paths, args.output_path)
+        args.schema_path, args.binary_paths, args.output_path, options)
 
 
 if __name__ == "__main__":
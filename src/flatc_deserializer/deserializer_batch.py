@@ -10,7 +10,13 @@ from i18n import t
 
 sys.path.append(os.path.join(os.path.dirname(__file__), "."))
 
-from general_funcs import init_app, get_flatc_path, execute_deserialize_batch
+from profile_funcs import run_profiled
+from pipeline_funcs import QUEUE_SIZE
+from general_funcs import init_app, init_logging, get_flatc_path, add_deserialize_arguments, \
+    add_verify_arguments, get_deserialize_options, execute_deserialize_batch
+from shard_funcs import execute_merge_manifests
+from columnar_funcs import execute_export_columns, COLUMN_FORMAT_NPZ, COLUMN_FORMATS
+from shm_funcs import execute_benchmark_transport
 
 
 def main() -> int | str:
@@ -26,12 +32,39 @@ def main() -> int | str:
     parser.add_argument("-b", "--binaries_path", type=str, default="",
                         help=t("main.binaries_directory_arg"))
     parser.add_argument("-o", "--output_path", type=str, default="",
-                        help=t("main.output_directory_arg"))
-    parser.add_argument("-f", "--flatc_path", type=str, default="", help=t("main.flatc_path_arg"))
+                        help=t("main.output_archive_arg"))
+    add_deserialize_arguments(parser)
+    parser.add_argument("--shard", type=str, default="", help=t("main.shard_arg"))
+    parser.add_argument("-m", "--merge_shards", action="store_true",
+                        help=t("main.merge_shards_arg"))
+    parser.add_argument("--verify", action="store_true", help=t("main.verify_arg"))
+    add_verify_arguments(parser)
+    parser.add_argument("--stage_workers", type=str, default="",
+                        help=t("main.stage_workers_arg"))
+    parser.add_argument("--queue_size", type=int, default=QUEUE_SIZE,
+                        help=t("main.queue_size_arg"))
+    parser.add_argument("--columns", nargs="?", type=str, default="", const=COLUMN_FORMAT_NPZ,
+                        choices=COLUMN_FORMATS, help=t("main.columns_arg"))
+    parser.add_argument("--process_workers", type=int, default=0,
+                        help=t("main.process_workers_arg"))
+    parser.add_argument("--benchmark_transport", action="store_true",
+                        help=t("main.benchmark_transport_arg"))
     args = parser.parse_args()
-    return execute_deserialize_batch(
+    init_logging(args.log_mode)
+    if args.benchmark_transport:
+        return execute_benchmark_transport(args.process_workers if args.process_workers > 0
+                                           else 2)
+    if args.merge_shards:
+        return execute_merge_manifests(args.output_path)
+    flatc_times = []
+    options = get_deserialize_options(args, flatc_times.append if args.profile != "" else None)
+    if args.columns != "":
+        return run_profiled(args.profile, flatc_times, execute_export_columns, args.schemas_path,
+                            args.binaries_path, args.output_path, args.columns, options)
+    return run_profiled(
+        args.profile, flatc_times, execute_deserialize_batch,
         get_flatc_path(os.getcwd(), True, False) if args.flatc_path == "" else args.flatc_path,
-        args.schemas_path, args.binaries_path, args.output_path)
+        args.schemas_path, args.binaries_path, args.output_path, options)
 
 
 if __name__ == "__main__":
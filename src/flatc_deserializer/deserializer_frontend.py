@@ -20,7 +20,7 @@ sys.path.append(os.path.join(os.path.dirname(__file__), "."))
 
 from general_funcs import init_localization, get_resource_path, execute_download, get_flatc_path, \
     get_binary_tuples
-from flatc_funcs import deserialize
+from session_funcs import DeserializerSession
 
 
 def attempt_apply_dnd(widget_id: int, dnd_event: Callable):
@@ -51,9 +51,13 @@ class Deserializer(CTk):
     allow_non_utf8: BooleanVar
     natural_utf8: BooleanVar
     defaults_json: BooleanVar
+    session: DeserializerSession | None
+    session_key: tuple
 
     def __init__(self):
         super().__init__()
+        self.session = None
+        self.session_key = ()
         self.strict_json = BooleanVar(self)
         self.allow_non_utf8 = BooleanVar(self)
         self.natural_utf8 = BooleanVar(self)
@@ -464,18 +468,43 @@ class Deserializer(CTk):
         schema_paths = [self.src_schemas_table.set(i, 0) for i in
                         self.src_schemas_table.get_children("")]
         binary_tuples = get_binary_tuples(binary_paths, schema_paths, True)
+        session = self._get_session(flatc_path, [schema_path for schema_path in schema_paths if
+                                                 os.path.isfile(schema_path)],
+                                    self._get_flatc_params())
         for i, binary_tuple in enumerate(binary_tuples):
-            self._deserialize_and_update_table(flatc_path, binary_tuple[1], binary_tuple[0],
+            self._deserialize_and_update_table(session, binary_tuple[1], binary_tuple[0],
                                                output_paths[i])
 
-    def _deserialize_and_update_table(self, flatc_path: str, schema_path: str, binary_path: str,
-                                      output_path: str):
+    def _get_session(self, flatc_path: str, schema_paths: list[str],
+                     flatc_params: list[str]) -> DeserializerSession:
         """
-        Deserializes flatbuffers binary and updates destination table.
+        Gets deserializer session, reusing the previous one unless schema compiler, schemas or
+        schema compiler parameters have changed.
         :param flatc_path: Schema compiler path.
-        :param schema_path: Schema file path.
-        :param binary_path: Binary file path.
-        :param output_path: Output directory path.
+        :param schema_paths: Schema file paths.
+        :param flatc_params: Schema compiler parameters.
+        :return: Deserializer session.
+        """
+        session_key = (flatc_path, tuple(schema_paths), tuple(flatc_params))
+        if self.session is None or session_key != self.session_key:
+            self.close_session()
+            self.session = DeserializerSession(flatc_path, schema_paths, flatc_params)
+            self.session_key = session_key
+        return self.session
+
+    def close_session(self):
+        """
+        Closes deserializer session if it was created.
+        """
+        if self.session is not None:
+            self.session.close()
+            self.session = None
+            self.session_key = ()
+
+    def _get_flatc_params(self) -> list[str]:
+        """
+        Gets schema compiler parameters from destination options.
+        :return: List of parameters.
         """
         params = []
         if self.strict_json.get():
@@ -486,7 +515,20 @@ class Deserializer(CTk):
             params.append("--natural-utf8")
         if self.defaults_json.get():
             params.append("--defaults-json")
-        json_path = deserialize(flatc_path, schema_path, binary_path, output_path, params, False)
+        return params
+
+    def _deserialize_and_update_table(self, session: DeserializerSession, schema_path: str,
+                                      binary_path: str, output_path: str):
+        """
+        Deserializes flatbuffers binary and updates destination table.
+        :param session: Deserializer session.
+        :param schema_path: Schema file path.
+        :param binary_path: Binary file path.
+        :param output_path: Output directory path.
+        """
+        json_path = ""
+        if os.path.isfile(binary_path) and os.path.isfile(schema_path):
+            json_path = session.deserialize_one(binary_path, output_path, schema_path)[1]
         for i in self.dest_binaries_table.get_children(""):
             if not os.path.samefile(i, binary_path):
                 continue
@@ -514,7 +556,11 @@ def main() -> str | int:
     init_localization()
     ctk.set_appearance_mode("System")
     ctk.set_default_color_theme("blue")
-    Deserializer().mainloop()
+    deserializer = Deserializer()
+    try:
+        deserializer.mainloop()
+    finally:
+        deserializer.close_session()
     return os.EX_OK
 
 
@@ -0,0 +1,696 @@
+"""
+    Модуль, включающий в себя функции для записи и чтения результатов десериализации в двоичных
+    форматах MessagePack и CBOR. Векторы и массивы скаляров, тип элементов которых известен из
+    схемы (см. get_schema_layout), записываются компактными типизированными массивами
+    (little-endian) вместо массивов чисел:
+    - CBOR: типизированные массивы RFC 8746 (теги 64-86);
+    - MessagePack: [ubyte] - тип bin, остальные векторы - тип ext с кодами из MSGPACK_EXT_CODES.
+    При чтении векторы [ubyte] возвращаются как bytes, остальные типизированные массивы - как
+    списки. Без схемы все списки записываются обычными массивами. Если установлены модули msgpack
+    или cbor2, запись и чтение выполняются ими, иначе - встроенными функциями.
+"""
+# pylint: disable=too-many-return-statements, too-many-branches
+import json
+import os
+import struct
+import sys
+from array import array
+from functools import lru_cache
+from importlib import import_module
+from typing import Callable, NamedTuple
+
+from schema_funcs import parse_schema
+
+OUTPUT_FORMAT_JSON = "json"
+OUTPUT_FORMAT_MSGPACK = "msgpack"
+OUTPUT_FORMAT_CBOR = "cbor"
+OUTPUT_FORMATS = (OUTPUT_FORMAT_JSON, OUTPUT_FORMAT_MSGPACK, OUTPUT_FORMAT_CBOR)
+OUTPUT_EXTENSIONS = {OUTPUT_FORMAT_JSON: ".json", OUTPUT_FORMAT_MSGPACK: ".msgpack",
+                     OUTPUT_FORMAT_CBOR: ".cbor"}
+MSGPACK_EXT_CODES = {"b": 1, "H": 2, "h": 3, "I": 4, "i": 5, "Q": 6, "q": 7, "f": 8, "d": 9}
+MSGPACK_EXT_TYPECODES = {code: typecode for typecode, code in MSGPACK_EXT_CODES.items()}
+CBOR_TAGS = {"B": 64, "b": 72, "H": 69, "h": 77, "I": 70, "i": 78, "Q": 71, "q": 79, "f": 85,
+             "d": 86}
+CBOR_TAG_TYPECODES = {tag: typecode for typecode, tag in CBOR_TAGS.items()}
+MSGPACK_FIXEXT_PREFIXES = {1: 0xD4, 2: 0xD5, 4: 0xD6, 8: 0xD7, 16: 0xD8}
+MSGPACK_FIXEXT_LENGTHS = {prefix: length for length, prefix in MSGPACK_FIXEXT_PREFIXES.items()}
+IS_BIG_ENDIAN = sys.byteorder == "big"
+
+
+def get_type_layout(types: dict, name: str, layouts: dict) -> dict:
+    """
+    Получение раскладки таблицы или структуры для записи типизированных массивов - словаря
+    {имя поля: значение}, где значение - код типа элементов array для векторов и массивов
+    скаляров, раскладка для вложенных таблиц и структур (и векторов из них) или кортеж (имя поля
+    типа объединения, {имя типа: раскладка}) для объединений.
+    :param types: Словарь типов схемы.
+    :param name: Полное имя таблицы или структуры.
+    :param layouts: Словарь уже полученных раскладок по именам типов (для рекурсивных типов).
+    :return: Раскладка.
+    """
+    if name in layouts:
+        return layouts[name]
+    layout = layouts[name] = {}
+    for field in types[name]["fields"]:
+        field_type = field["type"]
+        if field_type["kind"] in ("vector", "array"):
+            field_type = field_type["element"]
+            if field_type["kind"] == "scalar" and field_type["format"] in CBOR_TAGS:
+                layout[field["name"]] = field_type["format"]
+                continue
+        if field_type["kind"] in ("table", "struct"):
+            layout[field["name"]] = get_type_layout(types, field_type["name"], layouts)
+        elif field_type["kind"] == "union":
+            union = types[field_type["name"]]
+            layout[field["name"]] = (field["name"] + "_type", {
+                union["values"][value]: get_type_layout(types, type_name, layouts)
+                for value, type_name in union["types"].items() if type_name is not None})
+    return layout
+
+
+def get_schema_layout(schema_path: str) -> dict | None:
+    """
+    Получение раскладки корневой таблицы схемы (см. get_type_layout). Раскладка кэшируется вместе
+    с разобранной схемой.
+    :param schema_path: Путь к файлу схемы.
+    :return: Раскладка или None, если схему не удалось разобрать или в ней не объявлен root_type.
+    """
+    try:
+        schema = parse_schema(os.path.abspath(schema_path))
+    except (IndexError, KeyError, ValueError):
+        return None
+    if schema["root_type"] is None:
+        return None
+    if "layout" not in schema:
+        schema["layout"] = get_type_layout(schema["types"], schema["root_type"], {})
+    return schema["layout"]
+
+
+def get_item_layout(layout, key: str, value: dict):
+    """
+    Получение раскладки значения поля. Для объединения раскладка выбирается по значению поля типа
+    (для вектора объединений - список раскладок элементов).
+    :param layout: Раскладка словаря или None.
+    :param key: Имя поля.
+    :param value: Словарь, содержащий поле.
+    :return: Раскладка значения поля или None.
+    """
+    if not isinstance(layout, dict):
+        return None
+    item_layout = layout.get(key)
+    if not isinstance(item_layout, tuple):
+        return item_layout
+    type_field_name, member_layouts = item_layout
+    member = value.get(type_field_name)
+    if isinstance(member, list):
+        return [member_layouts.get(item) if isinstance(item, (str, int)) else None
+                for item in member]
+    return member_layouts.get(member) if isinstance(member, (str, int)) else None
+
+
+def get_typed_array(values: list, layout) -> array | None:
+    """
+    Получение типизированного массива для вектора скаляров по коду типа элементов из схемы.
+    :param values: Список значений.
+    :param layout: Раскладка вектора (код типа элементов array для векторов скаляров).
+    :return: Массив array или None, если вектор не является вектором скаляров или значения не
+    помещаются в тип элементов.
+    """
+    if not isinstance(layout, str):
+        return None
+    try:
+        return array(layout, values)
+    except (TypeError, OverflowError):
+        return None
+
+
+def get_list_layouts(values: list, layout) -> list:
+    """
+    Получение раскладок элементов списка.
+    :param values: Список значений.
+    :param layout: Раскладка списка (общая для всех элементов или список раскладок элементов).
+    :return: Список раскладок элементов.
+    """
+    if isinstance(layout, list) and len(layout) == len(values):
+        return layout
+    return [None if isinstance(layout, (list, str)) else layout] * len(values)
+
+
+def get_array_payload(typed_array: array) -> bytes:
+    """
+    Получение содержимого типизированного массива в порядке байтов little-endian.
+    :param typed_array: Массив.
+    :return: Байты массива.
+    """
+    if IS_BIG_ENDIAN and typed_array.itemsize > 1:
+        typed_array = array(typed_array.typecode, typed_array)
+        typed_array.byteswap()
+    return typed_array.tobytes()
+
+
+def get_array_values(typecode: str, payload: bytes) -> list:
+    """
+    Получение списка значений из содержимого типизированного массива в порядке байтов
+    little-endian.
+    :param typecode: Код типа элементов array.
+    :param payload: Байты массива.
+    :return: Список значений (bytes для массива байтов без знака).
+    """
+    if typecode == "B":
+        return bytes(payload)
+    typed_array = array(typecode)
+    typed_array.frombytes(payload)
+    if IS_BIG_ENDIAN and typed_array.itemsize > 1:
+        typed_array.byteswap()
+    return typed_array.tolist()
+
+
+class TypedArray(NamedTuple):
+    """
+    Типизированный массив для записи встроенными функциями pack_msgpack и pack_cbor.
+    """
+    code: int  # Код типа ext MessagePack или номер тега CBOR.
+    payload: bytes  # Байты массива в порядке little-endian.
+
+
+def get_packable_value(value, layout, pack_array: Callable[[array], object]):
+    """
+    Получение значения для записи, в котором векторы скаляров, тип элементов которых известен из
+    раскладки, заменены объектами типизированных массивов.
+    :param value: Значение (словарь, список, строка, число, bool или None).
+    :param layout: Раскладка значения (см. get_type_layout) или None.
+    :param pack_array: Функция получения объекта для записи типизированного массива (см.
+    get_msgpack_array и get_cbor_array).
+    :return: Значение для записи.
+    """
+    if layout is None:
+        return value
+    if isinstance(value, dict):
+        return {key: get_packable_value(item, get_item_layout(layout, key, value), pack_array)
+                for key, item in value.items()}
+    if isinstance(value, list):
+        typed_array = get_typed_array(value, layout)
+        if typed_array is not None:
+            return pack_array(typed_array)
+        return [get_packable_value(item, item_layout, pack_array)
+                for item, item_layout in zip(value, get_list_layouts(value, layout))]
+    return value
+
+
+def pack_msgpack(value, buffer: bytearray):
+    """
+    Запись значения в формате MessagePack (если модуль msgpack не установлен).
+    :param value: Значение (словарь, список, строка, число, bool, None, bytes или TypedArray - см.
+    get_packable_value).
+    :param buffer: Буфер, в который дописываются байты.
+    """
+    if value is None:
+        buffer.append(0xC0)
+    elif value is True:
+        buffer.append(0xC3)
+    elif value is False:
+        buffer.append(0xC2)
+    elif isinstance(value, int):
+        if 0 <= value < 0x80:
+            buffer.append(value)
+        elif -0x20 <= value < 0:
+            buffer.append(value & 0xFF)
+        elif value >= 0:
+            for prefix, value_format, max_value in ((0xCC, ">B", 0xFF), (0xCD, ">H", 0xFFFF),
+                                                    (0xCE, ">I", 0xFFFFFFFF),
+                                                    (0xCF, ">Q", 0xFFFFFFFFFFFFFFFF)):
+                if value <= max_value:
+                    buffer.append(prefix)
+                    buffer += struct.pack(value_format, value)
+                    return
+            raise OverflowError(value)
+        else:
+            for prefix, value_format, min_value in ((0xD0, ">b", -0x80), (0xD1, ">h", -0x8000),
+                                                    (0xD2, ">i", -0x80000000),
+                                                    (0xD3, ">q", -0x8000000000000000)):
+                if value >= min_value:
+                    buffer.append(prefix)
+                    buffer += struct.pack(value_format, value)
+                    return
+            raise OverflowError(value)
+    elif isinstance(value, float):
+        buffer.append(0xCB)
+        buffer += struct.pack(">d", value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        pack_msgpack_header(buffer, len(data), 0xA0, 32, 0xD9, 0xDA, 0xDB)
+        buffer += data
+    elif isinstance(value, bytes):
+        pack_msgpack_header(buffer, len(value), None, 0, 0xC4, 0xC5, 0xC6)
+        buffer += value
+    elif isinstance(value, dict):
+        pack_msgpack_header(buffer, len(value), 0x80, 16, None, 0xDE, 0xDF)
+        for key, item in value.items():
+            pack_msgpack(key, buffer)
+            pack_msgpack(item, buffer)
+    elif isinstance(value, list):
+        pack_msgpack_header(buffer, len(value), 0x90, 16, None, 0xDC, 0xDD)
+        for item in value:
+            pack_msgpack(item, buffer)
+    elif isinstance(value, TypedArray):
+        if len(value.payload) in MSGPACK_FIXEXT_PREFIXES:
+            buffer.append(MSGPACK_FIXEXT_PREFIXES[len(value.payload)])
+        else:
+            pack_msgpack_header(buffer, len(value.payload), None, 0, 0xC7, 0xC8, 0xC9)
+        buffer.append(value.code)
+        buffer += value.payload
+    else:
+        raise TypeError(type(value).__name__)
+
+
+def pack_msgpack_header(buffer: bytearray, length: int, fix_prefix: int | None, fix_limit: int,
+                        prefix8: int | None, prefix16: int, prefix32: int):
+    """
+    Запись заголовка строки, массива, словаря или двоичных данных MessagePack.
+    :param buffer: Буфер, в который дописываются байты.
+    :param length: Длина.
+    :param fix_prefix: Префикс короткой формы (fixstr, fixarray, fixmap) или None.
+    :param fix_limit: Максимальная длина короткой формы (не включительно).
+    :param prefix8: Префикс формы с 8-битной длиной или None.
+    :param prefix16: Префикс формы с 16-битной длиной.
+    :param prefix32: Префикс формы с 32-битной длиной.
+    """
+    if fix_prefix is not None and length < fix_limit:
+        buffer.append(fix_prefix | length)
+    elif prefix8 is not None and length <= 0xFF:
+        buffer.append(prefix8)
+        buffer.append(length)
+    elif length <= 0xFFFF:
+        buffer.append(prefix16)
+        buffer += struct.pack(">H", length)
+    else:
+        buffer.append(prefix32)
+        buffer += struct.pack(">I", length)
+
+
+def unpack_msgpack(data: bytes, position: int) -> tuple[object, int]:
+    """
+    Чтение значения в формате MessagePack.
+    :param data: Байты.
+    :param position: Позиция начала значения.
+    :return: Кортеж из двух элементов: (значение, позиция после значения).
+    """
+    prefix = data[position]
+    position += 1
+    if prefix < 0x80:
+        return prefix, position
+    if prefix >= 0xE0:
+        return prefix - 0x100, position
+    if prefix < 0x90:
+        return unpack_msgpack_map(data, position, prefix & 0x0F)
+    if prefix < 0xA0:
+        return unpack_msgpack_array(data, position, prefix & 0x0F)
+    if prefix < 0xC0:
+        length = prefix & 0x1F
+        return data[position:position + length].decode("utf-8"), position + length
+    if prefix == 0xC0:
+        return None, position
+    if prefix in (0xC2, 0xC3):
+        return prefix == 0xC3, position
+    if prefix in MSGPACK_FORMATS:
+        value_format = MSGPACK_FORMATS[prefix]
+        return value_format.unpack_from(data, position)[0], position + value_format.size
+    if prefix in (0xD9, 0xDA, 0xDB, 0xC4, 0xC5, 0xC6, 0xC7, 0xC8, 0xC9):
+        length_format = MSGPACK_LENGTH_FORMATS[prefix]
+        length = length_format.unpack_from(data, position)[0]
+        position += length_format.size
+        if prefix in (0xD9, 0xDA, 0xDB):
+            return data[position:position + length].decode("utf-8"), position + length
+        if prefix in (0xC4, 0xC5, 0xC6):
+            return bytes(data[position:position + length]), position + length
+        typecode = MSGPACK_EXT_TYPECODES[data[position]]
+        position += 1
+        return get_array_values(typecode, data[position:position + length]), position + length
+    if prefix in MSGPACK_FIXEXT_LENGTHS:
+        length = MSGPACK_FIXEXT_LENGTHS[prefix]
+        typecode = MSGPACK_EXT_TYPECODES[data[position]]
+        position += 1
+        return get_array_values(typecode, data[position:position + length]), position + length
+    if prefix in (0xDC, 0xDD, 0xDE, 0xDF):
+        length_format = MSGPACK_LENGTH_FORMATS[prefix]
+        length = length_format.unpack_from(data, position)[0]
+        position += length_format.size
+        if prefix in (0xDC, 0xDD):
+            return unpack_msgpack_array(data, position, length)
+        return unpack_msgpack_map(data, position, length)
+    raise ValueError(prefix)
+
+
+def unpack_msgpack_array(data: bytes, position: int, length: int) -> tuple[list, int]:
+    """
+    Чтение элементов массива MessagePack.
+    :param data: Байты.
+    :param position: Позиция первого элемента.
+    :param length: Количество элементов.
+    :return: Кортеж из двух элементов: (список, позиция после массива).
+    """
+    result = []
+    for _ in range(length):
+        item, position = unpack_msgpack(data, position)
+        result.append(item)
+    return result, position
+
+
+def unpack_msgpack_map(data: bytes, position: int, length: int) -> tuple[dict, int]:
+    """
+    Чтение элементов словаря MessagePack.
+    :param data: Байты.
+    :param position: Позиция первого ключа.
+    :param length: Количество пар.
+    :return: Кортеж из двух элементов: (словарь, позиция после словаря).
+    """
+    result = {}
+    for _ in range(length):
+        key, position = unpack_msgpack(data, position)
+        result[key], position = unpack_msgpack(data, position)
+    return result, position
+
+
+MSGPACK_FORMATS = {0xCA: struct.Struct(">f"), 0xCB: struct.Struct(">d"),
+                   0xCC: struct.Struct(">B"), 0xCD: struct.Struct(">H"), 0xCE: struct.Struct(">I"),
+                   0xCF: struct.Struct(">Q"), 0xD0: struct.Struct(">b"), 0xD1: struct.Struct(">h"),
+                   0xD2: struct.Struct(">i"), 0xD3: struct.Struct(">q")}
+MSGPACK_LENGTH_FORMATS = {0xD9: struct.Struct(">B"), 0xDA: struct.Struct(">H"),
+                          0xDB: struct.Struct(">I"), 0xC4: struct.Struct(">B"),
+                          0xC5: struct.Struct(">H"), 0xC6: struct.Struct(">I"),
+                          0xC7: struct.Struct(">B"), 0xC8: struct.Struct(">H"),
+                          0xC9: struct.Struct(">I"), 0xDC: struct.Struct(">H"),
+                          0xDD: struct.Struct(">I"), 0xDE: struct.Struct(">H"),
+                          0xDF: struct.Struct(">I")}
+
+
+def pack_cbor_header(buffer: bytearray, major_type: int, length: int):
+    """
+    Запись начального байта CBOR с аргументом.
+    :param buffer: Буфер, в который дописываются байты.
+    :param major_type: Основной тип (0-7).
+    :param length: Аргумент (длина, значение или номер тега).
+    """
+    major_type <<= 5
+    if length < 24:
+        buffer.append(major_type | length)
+    elif length <= 0xFF:
+        buffer.append(major_type | 24)
+        buffer.append(length)
+    elif length <= 0xFFFF:
+        buffer.append(major_type | 25)
+        buffer += struct.pack(">H", length)
+    elif length <= 0xFFFFFFFF:
+        buffer.append(major_type | 26)
+        buffer += struct.pack(">I", length)
+    else:
+        buffer.append(major_type | 27)
+        buffer += struct.pack(">Q", length)
+
+
+def pack_cbor(value, buffer: bytearray):
+    """
+    Запись значения в формате CBOR (если модуль cbor2 не установлен).
+    :param value: Значение (словарь, список, строка, число, bool, None или TypedArray - см.
+    get_packable_value).
+    :param buffer: Буфер, в который дописываются байты.
+    """
+    if value is None:
+        buffer.append(0xF6)
+    elif value is True:
+        buffer.append(0xF5)
+    elif value is False:
+        buffer.append(0xF4)
+    elif isinstance(value, int):
+        if value >= 0:
+            pack_cbor_header(buffer, 0, value)
+        else:
+            pack_cbor_header(buffer, 1, -1 - value)
+    elif isinstance(value, float):
+        buffer.append(0xFB)
+        buffer += struct.pack(">d", value)
+    elif isinstance(value, str):
+        data = value.encode("utf-8")
+        pack_cbor_header(buffer, 3, len(data))
+        buffer += data
+    elif isinstance(value, dict):
+        pack_cbor_header(buffer, 5, len(value))
+        for key, item in value.items():
+            pack_cbor(key, buffer)
+            pack_cbor(item, buffer)
+    elif isinstance(value, list):
+        pack_cbor_header(buffer, 4, len(value))
+        for item in value:
+            pack_cbor(item, buffer)
+    elif isinstance(value, TypedArray):
+        pack_cbor_header(buffer, 6, value.code)
+        pack_cbor_header(buffer, 2, len(value.payload))
+        buffer += value.payload
+    else:
+        raise TypeError(type(value).__name__)
+
+
+def unpack_cbor(data: bytes, position: int) -> tuple[object, int]:
+    """
+    Чтение значения в формате CBOR (определённой длины).
+    :param data: Байты.
+    :param position: Позиция начала значения.
+    :return: Кортеж из двух элементов: (значение, позиция после значения).
+    """
+    initial_byte = data[position]
+    position += 1
+    major_type = initial_byte >> 5
+    additional_info = initial_byte & 0x1F
+    if major_type == 7:
+        if additional_info in CBOR_SIMPLE_VALUES:
+            return CBOR_SIMPLE_VALUES[additional_info], position
+        value_format = CBOR_FLOAT_FORMATS[additional_info]
+        return value_format.unpack_from(data, position)[0], position + value_format.size
+    if additional_info < 24:
+        argument = additional_info
+    else:
+        argument_format = CBOR_ARGUMENT_FORMATS[additional_info]
+        argument = argument_format.unpack_from(data, position)[0]
+        position += argument_format.size
+    if major_type == 0:
+        return argument, position
+    if major_type == 1:
+        return -1 - argument, position
+    if major_type == 2:
+        return bytes(data[position:position + argument]), position + argument
+    if major_type == 3:
+        return data[position:position + argument].decode("utf-8"), position + argument
+    if major_type == 4:
+        result = []
+        for _ in range(argument):
+            item, position = unpack_cbor(data, position)
+            result.append(item)
+        return result, position
+    if major_type == 5:
+        result = {}
+        for _ in range(argument):
+            key, position = unpack_cbor(data, position)
+            result[key], position = unpack_cbor(data, position)
+        return result, position
+    if argument not in CBOR_TAG_TYPECODES:
+        return unpack_cbor(data, position)
+    initial_byte = data[position]
+    length = initial_byte & 0x1F
+    position += 1
+    if length >= 24:
+        length_format = CBOR_ARGUMENT_FORMATS[length]
+        length = length_format.unpack_from(data, position)[0]
+        position += length_format.size
+    return get_array_values(CBOR_TAG_TYPECODES[argument], data[position:position + length]), \
+        position + length
+
+
+CBOR_SIMPLE_VALUES = {20: False, 21: True, 22: None, 23: None}
+CBOR_FLOAT_FORMATS = {25: struct.Struct(">e"), 26: struct.Struct(">f"), 27: struct.Struct(">d")}
+CBOR_ARGUMENT_FORMATS = {24: struct.Struct(">B"), 25: struct.Struct(">H"),
+                         26: struct.Struct(">I"), 27: struct.Struct(">Q")}
+
+
+@lru_cache(maxsize=None)
+def import_optional(module_name: str):
+    """
+    Импорт необязательного модуля.
+    :param module_name: Имя модуля.
+    :return: Модуль или None, если он не установлен.
+    """
+    try:
+        return import_module(module_name)
+    except ImportError:
+        return None
+
+
+def decode_msgpack_ext(code: int, payload: bytes) -> list:
+    """
+    Декодирование типизированного массива MessagePack (для ext_hook модуля msgpack).
+    :param code: Код типа ext.
+    :param payload: Байты массива.
+    :return: Список значений.
+    """
+    return get_array_values(MSGPACK_EXT_TYPECODES[code], payload)
+
+
+def decode_cbor_tag(*args):
+    """
+    Декодирование типизированного массива CBOR (для tag_hook модуля cbor2). Аргументы
+    отличаются в разных версиях cbor2: (декодер, тег) или (тег, неизменяемость).
+    :param args: Аргументы tag_hook.
+    :return: Список значений или исходный тег, если он не является типизированным массивом.
+    """
+    tag = args[0] if isinstance(args[0], import_optional("cbor2").CBORTag) else args[1]
+    if tag.tag in CBOR_TAG_TYPECODES:
+        return get_array_values(CBOR_TAG_TYPECODES[tag.tag], tag.value)
+    return tag
+
+
+def get_msgpack_array(typed_array: array):
+    """
+    Получение объекта для записи типизированного массива в MessagePack (см. get_packable_value):
+    bytes для массива байтов без знака, иначе - ext (msgpack.ExtType, если модуль установлен).
+    :param typed_array: Массив.
+    :return: Объект для записи.
+    """
+    if typed_array.typecode == "B":
+        return typed_array.tobytes()
+    code = MSGPACK_EXT_CODES[typed_array.typecode]
+    msgpack = import_optional("msgpack")
+    if msgpack is None:
+        return TypedArray(code, get_array_payload(typed_array))
+    return msgpack.ExtType(code, get_array_payload(typed_array))
+
+
+def get_cbor_array(typed_array: array):
+    """
+    Получение объекта для записи типизированного массива в CBOR (см. get_packable_value): тег
+    RFC 8746 с байтами массива (cbor2.CBORTag, если модуль установлен).
+    :param typed_array: Массив.
+    :return: Объект для записи.
+    """
+    tag = CBOR_TAGS[typed_array.typecode]
+    cbor2 = import_optional("cbor2")
+    if cbor2 is None:
+        return TypedArray(tag, get_array_payload(typed_array))
+    return cbor2.CBORTag(tag, get_array_payload(typed_array))
+
+
+def encode_value(value, output_format: str, layout=None) -> bytes:
+    """
+    Кодирование значения в JSON (UTF-8, с отступами, как в write_output), MessagePack или CBOR.
+    Если установлены модули msgpack или cbor2, используются они.
+    :param value: Значение.
+    :param output_format: Формат (json, msgpack или cbor).
+    :param layout: Раскладка значения (см. get_schema_layout) или None.
+    :return: Байты.
+    """
+    if output_format == OUTPUT_FORMAT_JSON:
+        return json.dumps(value, indent=2, ensure_ascii=False).encode("utf-8")
+    buffer = bytearray()
+    if output_format == OUTPUT_FORMAT_MSGPACK:
+        value = get_packable_value(value, layout, get_msgpack_array)
+        msgpack = import_optional("msgpack")
+        if msgpack is not None:
+            return msgpack.packb(value, use_bin_type=True)
+        pack_msgpack(value, buffer)
+    else:
+        value = get_packable_value(value, layout, get_cbor_array)
+        cbor2 = import_optional("cbor2")
+        if cbor2 is not None:
+            return cbor2.dumps(value)
+        pack_cbor(value, buffer)
+    return bytes(buffer)
+
+
+def decode_value(data: bytes, output_format: str):
+    """
+    Декодирование значения из MessagePack или CBOR. Если установлены модули msgpack или cbor2,
+    используются они.
+    :param data: Байты.
+    :param output_format: Формат (msgpack или cbor).
+    :return: Значение.
+    """
+    if output_format == OUTPUT_FORMAT_MSGPACK:
+        msgpack = import_optional("msgpack")
+        if msgpack is not None:
+            return msgpack.unpackb(data, ext_hook=decode_msgpack_ext, strict_map_key=False)
+        return unpack_msgpack(data, 0)[0]
+    cbor2 = import_optional("cbor2")
+    if cbor2 is not None:
+        return cbor2.loads(data, tag_hook=decode_cbor_tag)
+    return unpack_cbor(data, 0)[0]
+
+
+def get_output_path(file_path: str, output_format: str) -> str:
+    """
+    Получение пути к файлу вывода с расширением, соответствующим формату.
+    :param file_path: Путь к файлу.
+    :param output_format: Формат вывода.
+    :return: Путь к файлу вывода.
+    """
+    return os.path.splitext(file_path)[0] + OUTPUT_EXTENSIONS[output_format]
+
+
+def get_path_format(file_path: str) -> str:
+    """
+    Получение формата файла по расширению.
+    :param file_path: Путь к файлу.
+    :return: Формат файла (json, если расширение неизвестно).
+    """
+    extension = os.path.splitext(file_path)[1].lower()
+    for output_format, output_extension in OUTPUT_EXTENSIONS.items():
+        if extension == output_extension:
+            return output_format
+    return OUTPUT_FORMAT_JSON
+
+
+def write_output(value, file_path: str, output_format: str, layout=None) -> str:
+    """
+    Запись значения в файл в заданном формате.
+    :param value: Значение.
+    :param file_path: Путь к файлу (расширение заменяется в соответствии с форматом).
+    :param output_format: Формат вывода.
+    :param layout: Раскладка значения (см. get_schema_layout) или None.
+    :return: Путь к записанному файлу.
+    """
+    file_path = get_output_path(file_path, output_format)
+    if output_format == OUTPUT_FORMAT_JSON:
+        with open(file_path, "w", encoding="utf-8") as file:
+            json.dump(value, file, indent=2, ensure_ascii=False)
+    else:
+        with open(file_path, "wb") as file:
+            file.write(encode_value(value, output_format, layout))
+    return file_path
+
+
+def convert_json_file(json_path: str, output_format: str, layout=None) -> str:
+    """
+    Преобразование JSON-файла в заданный формат с удалением исходного файла.
+    :param json_path: Путь к JSON-файлу.
+    :param output_format: Формат вывода.
+    :param layout: Раскладка значения (см. get_schema_layout) или None.
+    :return: Путь к файлу вывода.
+    """
+    if output_format == OUTPUT_FORMAT_JSON:
+        return json_path
+    with open(json_path, "rb") as json_file:
+        value = json.loads(json_file.read())
+    output_path = write_output(value, json_path, output_format, layout)
+    os.remove(json_path)
+    return output_path
+
+
+def load_output(file_path: str):
+    """
+    Чтение файла вывода в формате, определяемом по расширению (JSON, MessagePack или CBOR).
+    :param file_path: Путь к файлу.
+    :return: Значение.
+    """
+    with open(file_path, "rb") as file:
+        data = file.read()
+    output_format = get_path_format(file_path)
+    if output_format == OUTPUT_FORMAT_JSON:
+        return json.loads(data)
+    return decode_value(data, output_format)
@@ -3,46 +3,203 @@
 """
 # pylint: disable=too-many-branches, too-many-statements, too-many-arguments, too-many-locals
 import os
-import shutil
-from json import loads
-from logging import info
-from subprocess import run, CalledProcessError
+import signal
+import time
+from hashlib import blake2b
+from logging import warning
+from collections.abc import Callable, Iterator
+from subprocess import run, CalledProcessError, TimeoutExpired, CompletedProcess
+from typing import NamedTuple
 
-from i18n import t
+from encoding_funcs import convert_json_file, get_schema_layout, load_output, OUTPUT_FORMAT_JSON
+from log_funcs import file_logger, get_message
+from source_funcs import fetch_remote_file, is_remote_path
+from schema_funcs import get_schema_file_extension
+from stream_funcs import iter_json_items
 
+STATUS_DONE = "done"
+STATUS_ERROR = "error"
+STATUS_TIMEOUT = "timeout"
+STATUS_LIMIT = "limit"
+# Сообщения компилятора схемы о неудачном выделении памяти.
+MEMORY_ERROR_MARKERS = ("bad_alloc", "Cannot allocate memory", "out of memory")
 
-def deserialize(flatc_path: str, schema_path: str, binary_path: str, output_path: str = "",
-                additional_params=None, return_dict=True) -> dict:
+
+class FlatcLimits(NamedTuple):
     """
-    Десериализация бинарного файла, используя схему Flatbuffers.
+    Ограничения для каждого процесса компилятора схемы.
+    """
+    timeout: float | None = None  # Ограничение времени выполнения в секундах.
+    memory_limit: int = 0  # Ограничение адресного пространства (RLIMIT_AS) в байтах.
+    cpu_limit: int = 0  # Ограничение процессорного времени (RLIMIT_CPU) в секундах.
+    retries: int = 0  # Количество повторных попыток после превышения времени выполнения.
+    on_run: Callable[[float], None] | None = None  # Получатель времени каждого запуска в секундах.
+
+
+def get_limited_args(args: list[str], limits: FlatcLimits) -> list[str]:
+    """
+    Получение аргументов запуска компилятора схемы через оболочку, устанавливающую ограничения
+    ресурсов командой ulimit перед exec (только для POSIX). В отличие от preexec_fn, в дочернем
+    процессе до exec не выполняется код Python, поэтому запуск безопасен из нескольких потоков.
+    :param args: Список аргументов командной строки.
+    :param limits: Ограничения процесса.
+    :return: Список аргументов командной строки (исходный, если ограничения не заданы).
+    """
+    if os.name != "posix" or (limits.memory_limit <= 0 and limits.cpu_limit <= 0):
+        return args
+    commands = []
+    if limits.memory_limit > 0:
+        commands.append(f"ulimit -v {max(limits.memory_limit // 1024, 1)}")
+    if limits.cpu_limit > 0:
+        commands.append(f"ulimit -S -t {limits.cpu_limit}")
+        commands.append(f"ulimit -H -t {limits.cpu_limit + 1}")
+    commands.append("exec \"$@\"")
+    return ["/bin/sh", "-c", "; ".join(commands), "sh"] + args
+
+
+def is_limit_exceeded(cpe: CalledProcessError, limits: FlatcLimits) -> bool:
+    """
+    Проверка, завершился ли компилятор схемы из-за превышения ограничений ресурсов: сигналом
+    SIGXCPU или SIGKILL (мягкое и жёсткое ограничение RLIMIT_CPU) или сигналом SIGABRT или SIGSEGV
+    с сообщением о неудачном выделении памяти (std::bad_alloc) при ограничении RLIMIT_AS. Без
+    такого сообщения SIGABRT и SIGSEGV считаются ошибкой компилятора схемы.
+    :param cpe: Исключение завершённого с ошибкой процесса.
+    :param limits: Ограничения процесса.
+    :return: True, если превышено ограничение ресурсов.
+    """
+    if os.name != "posix" or cpe.returncode >= 0:
+        return False
+    if limits.cpu_limit > 0 and -cpe.returncode in (signal.SIGXCPU, signal.SIGKILL):
+        return True
+    return limits.memory_limit > 0 and -cpe.returncode in (signal.SIGABRT, signal.SIGSEGV) and \
+        any(marker in (cpe.stderr or "") for marker in MEMORY_ERROR_MARKERS)
+
+
+def get_file_digest(file_path: str, chunk_size: int = 1048576) -> bytes:
+    """
+    Получение хэша содержимого файла с чтением по частям (без загрузки файла в память целиком).
+    :param file_path: Путь к файлу.
+    :param chunk_size: Размер читаемой за раз части файла в байтах.
+    :return: Хэш содержимого файла.
+    """
+    digest = blake2b()
+    with open(file_path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.digest()
+
+
+def run_flatc(args: list[str], limits: FlatcLimits | None = None) \
+        -> tuple[str, CompletedProcess | None]:
+    """
+    Запуск компилятора схемы с ограничениями времени выполнения и ресурсов. После превышения
+    времени выполнения запуск повторяется не более limits.retries раз. Если задан limits.on_run,
+    ему передаётся время запуска вместе с повторными попытками.
+    :param args: Список аргументов командной строки.
+    :param limits: Ограничения процесса. Если None, процесс не ограничивается.
+    :return: Кортеж из двух элементов: (статус, завершённый процесс или None при ошибке).
+    """
+    if limits is None:
+        limits = FlatcLimits()
+    if limits.on_run is None:
+        return run_limited_flatc(args, limits)
+    start_time = time.perf_counter()
+    try:
+        return run_limited_flatc(args, limits)
+    finally:
+        limits.on_run(time.perf_counter() - start_time)
+
+
+def run_limited_flatc(args: list[str], limits: FlatcLimits) -> tuple[str, CompletedProcess | None]:
+    """
+    Запуск компилятора схемы с ограничениями и повторными попытками (см. run_flatc).
+    :param args: Список аргументов командной строки.
+    :param limits: Ограничения процесса.
+    :return: Кортеж из двух элементов: (статус, завершённый процесс или None при ошибке).
+    """
+    limited_args = get_limited_args(args, limits)
+    for attempt in range(limits.retries + 1):
+        try:
+            return STATUS_DONE, run(limited_args, shell=False, capture_output=True, text=True,
+                                    check=True, timeout=limits.timeout)
+        except TimeoutExpired:
+            warning(get_message("flatc_funcs.run_timeout"), " ".join(args), limits.timeout,
+                    attempt + 1, limits.retries + 1)
+        except CalledProcessError as cpe:
+            if is_limit_exceeded(cpe, limits):
+                warning(get_message("flatc_funcs.run_limit"), " ".join(args), -cpe.returncode)
+                return STATUS_LIMIT, None
+            warning(get_message("flatc_funcs.run_error"), " ".join(args), cpe.returncode)
+            if cpe.stderr is not None and cpe.stderr != "":
+                warning("%s", cpe.stderr)
+            return STATUS_ERROR, None
+    return STATUS_TIMEOUT, None
+
+
+def deserialize_file(flatc_path: str, schema_path: str, binary_path: str, output_path: str = "",
+                     additional_params=None, limits: FlatcLimits | None = None,
+                     output_format: str = OUTPUT_FORMAT_JSON) -> tuple[str, str]:
+    """
+    Десериализация бинарного файла в JSON-файл, используя схему Flatbuffers.
     :param flatc_path: Путь к компилятору схемы.
     :param schema_path: Путь к файлу схемы.
-    :param binary_path: Путь к бинарному файлу.
-    :param output_path: Путь к директории или файлу вывода.
+    :param binary_path: Путь к бинарному файлу или URL объекта в HTTP/S3-совместимом хранилище
+    (объект загружается во временную директорию на время десериализации).
+    :param output_path: Путь к директории или файлу вывода. Если пустой, файл вывода записывается
+    рядом с бинарным файлом (для URL - в текущую директорию).
     :param additional_params: Дополнительный список параметров для компилятора схемы.
-    :param return_dict: Если True, возвращать словарь из прочитанного файла. Иначе - путь к файлу.
-    :return: Десериализованный бинарный файл в виде словаря.
+    :param limits: Ограничения процесса компилятора схемы.
+    :param output_format: Формат файла вывода (json, msgpack или cbor).
+    :return: Кортеж из двух элементов: (статус, путь к файлу вывода или пустая строка при ошибке).
     """
+    if is_remote_path(binary_path):
+        with fetch_remote_file(binary_path) as local_binary_path:
+            return deserialize_file(flatc_path, schema_path, local_binary_path,
+                                    os.getcwd() if output_path == "" else output_path,
+                                    additional_params, limits, output_format)
     if additional_params is None:
         additional_params = []
     if not os.path.isfile(flatc_path) or not os.path.isfile(schema_path) or not os.path.isfile(
             binary_path):
-        return {} if return_dict else ""
+        return STATUS_ERROR, ""
     flatc_path = os.path.abspath(flatc_path)
     schema_path = os.path.abspath(schema_path)
     binary_path = os.path.abspath(binary_path)
     binary_name = os.path.splitext(os.path.basename(binary_path))[0]
-    output_path = os.path.abspath(output_path)
     if output_path == "":
         output_path = os.path.dirname(binary_path)
         json_path = os.path.join(output_path, binary_name + ".json")
     elif os.path.splitext(output_path)[1].lower() == ".json":
-        output_path = os.path.dirname(output_path)
-        json_path = output_path
+        json_path = os.path.abspath(output_path)
+        output_path = os.path.dirname(json_path)
     elif os.path.isfile(output_path):
-        return {} if return_dict else ""
+        return STATUS_ERROR, ""
     else:
+        output_path = os.path.abspath(output_path)
         json_path = os.path.join(output_path, binary_name + ".json")
+    return run_deserialize(flatc_path, schema_path, binary_path, output_path, json_path,
+                           additional_params, limits, output_format)
+
+
+def run_deserialize(flatc_path: str, schema_path: str, binary_path: str, output_path: str,
+                    json_path: str, additional_params: list[str],
+                    limits: FlatcLimits | None = None,
+                    output_format: str = OUTPUT_FORMAT_JSON) -> tuple[str, str]:
+    """
+    Десериализация бинарного файла в JSON-файл без проверки и преобразования путей (для
+    вызывающего кода, который уже проверил их, например DeserializerSession).
+    :param flatc_path: Абсолютный путь к компилятору схемы.
+    :param schema_path: Абсолютный путь к файлу схемы.
+    :param binary_path: Абсолютный путь к бинарному файлу.
+    :param output_path: Абсолютный путь к директории вывода компилятора схемы.
+    :param json_path: Абсолютный путь к итоговому JSON-файлу.
+    :param additional_params: Дополнительный список параметров для компилятора схемы.
+    :param limits: Ограничения процесса компилятора схемы.
+    :param output_format: Формат файла вывода (json, msgpack или cbor). JSON-файл компилятора
+    схемы преобразуется в него и удаляется.
+    :return: Кортеж из двух элементов: (статус, путь к файлу вывода или пустая строка при ошибке).
+    """
+    binary_name = os.path.splitext(os.path.basename(binary_path))[0]
     output_path += os.sep
     args = [flatc_path]
     args += ["--raw-binary"]
@@ -51,33 +208,226 @@ def deserialize(flatc_path: str, schema_path: str, binary_path: str, output_path
     args += ["-t", schema_path]
     args += ["--", binary_path]
     output_json_path = os.path.join(output_path, binary_name + ".json")
-    previous_json_contents = None
-    if os.path.isfile(output_json_path):
-        with open(output_json_path, "rb") as file:
-            previous_json_contents = file.read()
+    previous_json_digest = get_file_digest(json_path) if os.path.isfile(json_path) else b""
+    backup_json_path = ""
+    if os.path.normcase(output_json_path) != os.path.normcase(json_path) and os.path.isfile(
+            output_json_path):
+        backup_json_path = output_json_path + ".previous"
+        os.replace(output_json_path, backup_json_path)
     try:
-        proc = run(args, shell=False, capture_output=True, text=True, check=True)
-    except CalledProcessError as cpe:
-        info(t("flatc_funcs.run_error"), " ".join(cpe.cmd), cpe.returncode)
-        if cpe.stderr is not None and cpe.stderr != "":
-            info(cpe.stderr)
-        return {} if return_dict else ""
-    if proc.stdout is not None and proc.stdout != "":
-        info(t("flatc_funcs.run_ok"), " ".join(args))
-        info(proc.stdout)
-    if not os.path.isfile(output_json_path):
-        info(t("flatc_funcs.json_error"), binary_path)
-        return {} if return_dict else ""
-    if previous_json_contents is not None and not os.path.samefile(output_json_path, json_path):
-        shutil.copy(output_json_path, json_path)
-        with open(output_json_path, "wb") as file:
-            file.write(previous_json_contents)
+        status, proc = run_flatc(args, limits)
+        if proc is None:
+            return status, ""
+        if proc.stdout is not None and proc.stdout != "":
+            file_logger.info(get_message("flatc_funcs.run_ok"), " ".join(args))
+            file_logger.info("%s", proc.stdout)
+        if not os.path.isfile(output_json_path):
+            warning(get_message("flatc_funcs.json_error"), binary_path)
+            return STATUS_ERROR, ""
+        if os.path.normcase(output_json_path) != os.path.normcase(json_path):
+            os.replace(output_json_path, json_path)
+    finally:
+        if backup_json_path != "":
+            os.replace(backup_json_path, output_json_path)
+    if output_format != OUTPUT_FORMAT_JSON:
+        try:
+            output_file_path = convert_json_file(json_path, output_format,
+                                                 get_schema_layout(schema_path))
+        except (OSError, ValueError) as exc:
+            warning(get_message("flatc_funcs.json_error"), binary_path)
+            warning("%s", exc)
+            return STATUS_ERROR, ""
+        file_logger.info(get_message("flatc_funcs.json_ok"), binary_path, output_file_path)
+        return STATUS_DONE, output_file_path
     try:
-        with open(json_path, "rb") as json_file:
-            current_json_contents = json_file.read()
+        current_json_digest = get_file_digest(json_path)
     except OSError:
-        info(t("main.file_failed_to_open"), json_path)
-        return {} if return_dict else ""
-    if current_json_contents != previous_json_contents:
-        info(t("flatc_funcs.json_ok"), binary_path, json_path)
-    return loads(current_json_contents.decode("utf-8")) if return_dict else json_path
+        warning(get_message("main.file_failed_to_open"), json_path)
+        return STATUS_ERROR, ""
+    if current_json_digest != previous_json_digest:
+        file_logger.info(get_message("flatc_funcs.json_ok"), binary_path, json_path)
+    return STATUS_DONE, json_path
+
+
+def run_deserialize_group(flatc_path: str, schema_path: str, binary_paths: list[str],
+                          output_path: str, additional_params: list[str],
+                          limits: FlatcLimits | None = None) -> list[tuple[str, str]]:
+    """
+    Десериализация нескольких бинарных файлов одной схемы одним запуском компилятора схемы. Если
+    запуск завершился ошибкой, файлы группы десериализуются по отдельности, чтобы ошибка одного
+    файла не влияла на остальные. Имена бинарных файлов группы (без расширения) должны быть
+    уникальными, так как JSON-файлы записываются в одну директорию.
+    :param flatc_path: Абсолютный путь к компилятору схемы.
+    :param schema_path: Абсолютный путь к файлу схемы.
+    :param binary_paths: Список абсолютных путей к бинарным файлам.
+    :param output_path: Абсолютный путь к директории вывода.
+    :param additional_params: Дополнительный список параметров для компилятора схемы.
+    :param limits: Ограничения процесса компилятора схемы.
+    :return: Список кортежей (статус, путь к JSON-файлу или пустая строка при ошибке) в порядке
+    binary_paths.
+    """
+    json_paths = [os.path.join(output_path, os.path.splitext(os.path.basename(binary_path))[0] +
+                               ".json") for binary_path in binary_paths]
+    args = [flatc_path, "--raw-binary", "-o", output_path + os.sep] + additional_params + \
+        ["-t", schema_path, "--"] + binary_paths
+    status, proc = run_flatc(args, limits)
+    if proc is None:
+        if len(binary_paths) > 1:
+            return [result for binary_path in binary_paths for result in run_deserialize_group(
+                flatc_path, schema_path, [binary_path], output_path, additional_params, limits)]
+        return [(status, "")]
+    if proc.stdout is not None and proc.stdout != "":
+        file_logger.info(get_message("flatc_funcs.run_ok"), " ".join(args))
+        file_logger.info("%s", proc.stdout)
+    results = []
+    for binary_path, json_path in zip(binary_paths, json_paths):
+        if os.path.isfile(json_path):
+            file_logger.info(get_message("flatc_funcs.json_ok"), binary_path, json_path)
+            results.append((STATUS_DONE, json_path))
+        else:
+            warning(get_message("flatc_funcs.json_error"), binary_path)
+            results.append((STATUS_ERROR, ""))
+    return results
+
+
+def deserialize(flatc_path: str, schema_path: str, binary_path: str, output_path: str = "",
+                additional_params=None, return_dict=True, limits: FlatcLimits | None = None,
+                output_format: str = OUTPUT_FORMAT_JSON) -> dict:
+    """
+    Десериализация бинарного файла, используя схему Flatbuffers.
+    :param flatc_path: Путь к компилятору схемы.
+    :param schema_path: Путь к файлу схемы.
+    :param binary_path: Путь к бинарному файлу.
+    :param output_path: Путь к директории или файлу вывода.
+    :param additional_params: Дополнительный список параметров для компилятора схемы.
+    :param return_dict: Если True, возвращать словарь из прочитанного файла. Иначе - путь к файлу.
+    :param limits: Ограничения процесса компилятора схемы.
+    :param output_format: Формат файла вывода (json, msgpack или cbor). Словарь читается из файла
+    в этом формате.
+    :return: Десериализованный бинарный файл в виде словаря.
+    """
+    _, json_path = deserialize_file(flatc_path, schema_path, binary_path, output_path,
+                                    additional_params, limits, output_format)
+    if not return_dict:
+        return json_path
+    if json_path == "":
+        return {}
+    return load_output(json_path)
+
+
+def deserialize_iter(flatc_path: str, schema_path: str, binary_path: str, output_path: str = "",
+                     additional_params=None, prefix: str = "",
+                     limits: FlatcLimits | None = None) -> Iterator:
+    """
+    Десериализация бинарного файла с потоковым чтением результата: в памяти одновременно находится
+    только одно поле корневой таблицы или один элемент вектора, а не весь документ.
+    :param flatc_path: Путь к компилятору схемы.
+    :param schema_path: Путь к файлу схемы.
+    :param binary_path: Путь к бинарному файлу.
+    :param output_path: Путь к директории или файлу вывода.
+    :param additional_params: Дополнительный список параметров для компилятора схемы.
+    :param prefix: Путь к значениям через точку (см. stream_funcs.iter_json_items). Если пустой,
+    возвращаются пары (имя поля, значение) корневой таблицы.
+    :param limits: Ограничения процесса компилятора схемы.
+    :return: Итератор значений по заданному пути.
+    """
+    _, json_path = deserialize_file(flatc_path, schema_path, binary_path, output_path,
+                                    additional_params, limits)
+    if json_path != "":
+        yield from iter_json_items(json_path, prefix)
+
+
+def get_serialized_path(schema_path: str, json_path: str, output_path: str) -> str:
+    """
+    Получение пути к бинарному файлу, в который сериализуется JSON-файл. Расширение бинарного файла
+    совпадает с именем схемы (как ожидает пакетная десериализация): a.json и a.<схема>.json
+    сериализуются в a.<схема>.
+    :param schema_path: Путь к файлу схемы.
+    :param json_path: Путь к JSON-файлу.
+    :param output_path: Путь к директории вывода.
+    :return: Путь к бинарному файлу.
+    """
+    schema_name = os.path.splitext(os.path.basename(schema_path))[0]
+    binary_name = os.path.splitext(os.path.basename(json_path))[0]
+    if os.path.splitext(binary_name)[1][1:].casefold() != schema_name.casefold():
+        binary_name += "." + schema_name
+    return os.path.join(output_path, binary_name)
+
+
+def get_colliding_paths(schema_path: str, json_paths: list[str], output_path: str) -> set[str]:
+    """
+    Получение JSON-файлов, которые сериализуются в один и тот же бинарный файл (например, a.json и
+    a.<схема>.json), с выводом предупреждения о каждом таком бинарном файле.
+    :param schema_path: Путь к файлу схемы.
+    :param json_paths: Список путей к JSON-файлам.
+    :param output_path: Путь к директории вывода.
+    :return: Множество путей к JSON-файлам, сериализация которых перезаписала бы друг друга.
+    """
+    target_paths = {}
+    for json_path in json_paths:
+        target_paths.setdefault(os.path.normcase(get_serialized_path(
+            schema_path, json_path, output_path)), []).append(json_path)
+    colliding_paths = set()
+    for binary_path, target_json_paths in target_paths.items():
+        if len(target_json_paths) > 1:
+            warning(get_message("flatc_funcs.binary_collision"), ", ".join(target_json_paths),
+                    binary_path)
+            colliding_paths.update(target_json_paths)
+    return colliding_paths
+
+
+def serialize(flatc_path: str, schema_path: str, json_paths: list[str], output_path: str,
+              additional_params=None, limits: FlatcLimits | None = None) -> list[str]:
+    """
+    Сериализация JSON-файлов в бинарные файлы, используя схему Flatbuffers, одним вызовом
+    компилятора схемы. При ошибке вызова файлы сериализуются по одному, чтобы найти ошибочные.
+    Файлы, которые сериализуются в один и тот же бинарный файл (см. get_colliding_paths), считаются
+    ошибочными и не сериализуются.
+    :param flatc_path: Путь к компилятору схемы.
+    :param schema_path: Путь к файлу схемы.
+    :param json_paths: Список путей к JSON-файлам.
+    :param output_path: Путь к директории вывода.
+    :param additional_params: Дополнительный список параметров для компилятора схемы.
+    :param limits: Ограничения процесса компилятора схемы.
+    :return: Список путей к бинарным файлам (пустая строка для файлов с ошибкой).
+    """
+    if additional_params is None:
+        additional_params = []
+    if len(json_paths) < 1:
+        return []
+    output_path = os.path.abspath(output_path)
+    colliding_paths = get_colliding_paths(schema_path, json_paths, output_path)
+    if len(colliding_paths) > 0:
+        remaining_paths = [json_path for json_path in json_paths
+                           if json_path not in colliding_paths]
+        binary_paths = iter(serialize(flatc_path, schema_path, remaining_paths, output_path,
+                                      additional_params, limits))
+        return ["" if json_path in colliding_paths else next(binary_paths)
+                for json_path in json_paths]
+    os.makedirs(output_path, exist_ok=True)
+    args = [flatc_path]
+    args += ["-b"]
+    args += ["-o", output_path + os.sep]
+    args += additional_params
+    args += [schema_path]
+    args += json_paths
+    _, proc = run_flatc(args, limits)
+    if proc is None:
+        if len(json_paths) > 1:
+            return [serialize(flatc_path, schema_path, [json_path], output_path,
+                              additional_params, limits)[0] for json_path in json_paths]
+        return [""]
+    binary_ext = get_schema_file_extension(schema_path)
+    binary_paths = []
+    for json_path in json_paths:
+        flatc_binary_path = os.path.join(output_path, os.path.splitext(os.path.basename(
+            json_path))[0] + "." + (binary_ext if binary_ext != "" else "bin"))
+        binary_path = get_serialized_path(schema_path, json_path, output_path)
+        if not os.path.isfile(flatc_binary_path):
+            warning(get_message("flatc_funcs.binary_error"), json_path)
+            binary_paths.append("")
+            continue
+        if flatc_binary_path != binary_path:
+            os.replace(flatc_binary_path, binary_path)
+        binary_paths.append(binary_path)
+    return binary_paths
@@ -2,24 +2,55 @@
     Десериализация бинарных файлов Flatbuffers по заданной схеме.
 """
 # pylint: disable=import-error, line-too-long, too-many-branches
+import argparse
 import logging
 import os
 import sys
 import errno
 from locale import getdefaultlocale
-from shutil import which
+from shutil import which, rmtree
+from collections.abc import Callable, Iterable, Iterator
 from tkinter import Tk
 from tkinter.filedialog import askopenfilename, askopenfilenames, askdirectory
 from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import NamedTuple
 from warnings import filterwarnings
 
 import i18n
 from PIL.ImageTk import PhotoImage
 from tqdm import tqdm
-from tqdm.contrib.logging import logging_redirect_tqdm
 
 from download_funcs import download_flatc
-from flatc_funcs import deserialize
+from encoding_funcs import OUTPUT_FORMAT_JSON, OUTPUT_FORMATS
+from flatc_funcs import serialize, get_colliding_paths, FlatcLimits, STATUS_DONE, STATUS_ERROR, \
+    STATUS_TIMEOUT, STATUS_LIMIT
+from session_funcs import DeserializerSession, check_flatc_path
+from shm_funcs import SharedMemoryTransport, SLOTS_PER_WORKER
+from pipeline_funcs import Pipeline, DeserializeStages, BinaryJob, parse_stage_workers, \
+    QUEUE_SIZE, STAGE_NAMES
+from verify_funcs import verify_binary, verify_binary_tuples, quarantine_binaries
+from schema_funcs import get_schema_file_identifier
+from archive_funcs import is_archive_path, make_scratch_path
+from source_funcs import InputSource, get_input_source, is_remote_path
+from shard_funcs import ShardPlan, parse_shard, shard_binary_tuples, shard_items, \
+    write_shard_manifest
+from log_funcs import set_log_mode, get_message, LOG_MODE_TEXT, LOG_MODES
+
+
+class DeserializeOptions(NamedTuple):
+    """
+    Параметры десериализации, задаваемые аргументами командной строки.
+    """
+    field_paths: list[str] | None = None  # Пути к выбранным полям (десериализация без flatc).
+    limits: FlatcLimits | None = None  # Ограничения процесса компилятора схемы.
+    output_format: str = OUTPUT_FORMAT_JSON  # Формат файлов вывода (json, msgpack или cbor).
+    shard: str = ""  # Шард в формате K/N.
+    verify: bool = False  # Проверять ли структуру бинарных файлов.
+    check_identifier: bool = False  # Проверять ли идентификатор файла, объявленный в схеме.
+    quarantine_path: str = ""  # Путь к директории карантина для некорректных файлов.
+    stage_workers: str = ""  # Число потоков стадий конвейера ("read=2,decode=8,...").
+    queue_size: int = QUEUE_SIZE  # Размер очереди перед каждой стадией конвейера.
+    process_workers: int = 0  # Число процессов для декодирования выбранных полей.
 
 
 def get_resource_path(file_path: str) -> str:
@@ -48,11 +79,12 @@ def init_app(icon_path: str):
     init_tkinter(icon_path)
 
 
-def init_logging():
+def init_logging(log_mode: str = LOG_MODE_TEXT):
     """
     Инициализация логирования.
+    :param log_mode: Режим логирования (text, quiet или json).
     """
-    logging.basicConfig(stream=sys.stdout, format="%(message)s", level=logging.INFO)
+    set_log_mode(log_mode)
     filterwarnings("ignore", category=DeprecationWarning)
 
 
@@ -112,6 +144,117 @@ def get_flatc_path(root_path: str, allow_ask: bool, suppress_error: bool) -> str
     return os.path.abspath(flatc_path)
 
 
+def add_limit_arguments(parser: argparse.ArgumentParser):
+    """
+    Добавление аргументов командной строки для ограничений процесса компилятора схемы.
+    :param parser: Парсер аргументов командной строки.
+    """
+    parser.add_argument("--timeout", type=float, default=0, help=i18n.t("main.timeout_arg"))
+    parser.add_argument("--memory_limit", type=int, default=0,
+                        help=i18n.t("main.memory_limit_arg"))
+    parser.add_argument("--cpu_limit", type=int, default=0, help=i18n.t("main.cpu_limit_arg"))
+    parser.add_argument("--retries", type=int, default=0, help=i18n.t("main.retries_arg"))
+
+
+def add_deserialize_arguments(parser: argparse.ArgumentParser):
+    """
+    Добавление аргументов командной строки, общих для скриптов десериализации: путь к компилятору
+    схемы, выбранные поля, ограничения процесса компилятора схемы, профилирование, режим
+    логирования и формат вывода.
+    :param parser: Парсер аргументов командной строки.
+    """
+    parser.add_argument("-f", "--flatc_path", type=str, default="",
+                        help=i18n.t("main.flatc_path_arg"))
+    parser.add_argument("--fields", dest="field_paths", nargs="+", default=[],
+                        help=i18n.t("main.fields_arg"))
+    add_limit_arguments(parser)
+    parser.add_argument("--profile", nargs="?", type=str, default="", const="flatc_profile.txt",
+                        help=i18n.t("main.profile_arg"))
+    parser.add_argument("--log_mode", type=str, default=LOG_MODE_TEXT, choices=LOG_MODES,
+                        help=i18n.t("main.log_mode_arg"))
+    parser.add_argument("--output_format", type=str, default=OUTPUT_FORMAT_JSON,
+                        choices=OUTPUT_FORMATS, help=i18n.t("main.output_format_arg"))
+
+
+def add_verify_arguments(parser: argparse.ArgumentParser):
+    """
+    Добавление аргументов командной строки для проверки идентификатора файла и карантина
+    некорректных файлов.
+    :param parser: Парсер аргументов командной строки.
+    """
+    parser.add_argument("--verify_identifier", dest="check_identifier", action="store_true",
+                        help=i18n.t("main.verify_identifier_arg"))
+    parser.add_argument("--quarantine_path", type=str, default="",
+                        help=i18n.t("main.quarantine_directory_arg"))
+
+
+def get_flatc_limits(args: argparse.Namespace,
+                     on_run: Callable[[float], None] | None = None) -> FlatcLimits:
+    """
+    Получение ограничений процесса компилятора схемы из аргументов командной строки (см.
+    add_limit_arguments).
+    :param args: Разобранные аргументы командной строки.
+    :param on_run: Получатель времени каждого запуска компилятора схемы в секундах.
+    :return: Ограничения процесса компилятора схемы.
+    """
+    return FlatcLimits(args.timeout if args.timeout > 0 else None,
+                       args.memory_limit * 1024 * 1024, args.cpu_limit, args.retries, on_run)
+
+
+def get_deserialize_options(args: argparse.Namespace,
+                            on_run: Callable[[float], None] | None = None) -> DeserializeOptions:
+    """
+    Получение параметров десериализации из аргументов командной строки (см.
+    add_deserialize_arguments). Параметры, для которых у скрипта нет аргументов, получают значения
+    по умолчанию.
+    :param args: Разобранные аргументы командной строки.
+    :param on_run: Получатель времени каждого запуска компилятора схемы в секундах.
+    :return: Параметры десериализации.
+    """
+    arguments = vars(args)
+    return DeserializeOptions(**{name: arguments[name] for name in DeserializeOptions._fields
+                                 if name in arguments})._replace(
+        limits=get_flatc_limits(args, on_run))
+
+
+def get_directory_path(directory_path: str, title: str, allow_sources: bool = False) -> str:
+    """
+    Получение пути к существующей директории. Если путь пустой, директория выбирается через
+    диалоговое окно.
+    :param directory_path: Путь к директории или пустая строка.
+    :param title: Ключ локализации заголовка диалогового окна.
+    :param allow_sources: Допускаются ли вместо директории zip/tar-архив и URL префикса в
+    хранилище объектов.
+    :return: Путь к директории (архиву или URL).
+    """
+    if directory_path == "":
+        directory_path = askdirectory(title=i18n.t(title))
+        if directory_path == "":
+            raise IOError(errno.EIO, i18n.t("main.no_directory_selected"))
+    if not os.path.isdir(directory_path) and not (allow_sources and (
+            is_archive_path(directory_path) or is_remote_path(directory_path))):
+        raise FileNotFoundError(errno.ENOENT, i18n.t("main.directory_not_found") %
+                                directory_path)
+    return directory_path
+
+
+def get_output_path(output_path: str, flatc_path: str) -> str:
+    """
+    Получение пути вывода. Если путь пустой, директория выбирается через диалоговое окно, а если
+    она не выбрана - используется директория компилятора схемы.
+    :param output_path: Путь вывода или пустая строка.
+    :param flatc_path: Путь к файлу компилятора схемы.
+    :return: Путь вывода.
+    """
+    if output_path == "":
+        output_path = askdirectory(title=i18n.t("main.tkinter_output_select"))
+        if output_path == "":
+            output_path = os.path.split(flatc_path)[0]
+            if output_path == "":
+                raise IOError(errno.EIO, i18n.t("main.no_directory_selected"))
+    return output_path
+
+
 def execute_download(root_path: str) -> int | str:
     """
     Скачивание компилятора схемы при его отсутствии в рабочей директории.
@@ -120,26 +263,40 @@ def execute_download(root_path: str) -> int | str:
     """
     flatc_path = get_flatc_path(root_path, False, True)
     if flatc_path != "":
-        logging.info(i18n.t("main.flatc_already_exists"), flatc_path)
+        logging.info(get_message("main.flatc_already_exists"), flatc_path)
     else:
         download_flatc(root_path)
     return os.EX_OK
 
 
-def execute_deserialize(flatc_path: str, schema_path: str, binary_paths: list[str], output_path:
-str) -> (int | str):
+def log_deserialize_summary(statuses: list[str]):
+    """
+    Вывод сводки по статусам десериализации файлов.
+    :param statuses: Список статусов файлов.
+    """
+    logging.info(get_message("main.deserialize_summary"), len(statuses),
+                 statuses.count(STATUS_DONE), statuses.count(STATUS_ERROR),
+                 statuses.count(STATUS_TIMEOUT), statuses.count(STATUS_LIMIT),
+                 statuses.count("invalid"))
+
+
+def execute_deserialize(flatc_path: str, schema_path: str, binary_paths: list[str],
+                        output_path: str, options: DeserializeOptions | None = None) \
+        -> (int | str):
     """
     Десериализация бинарных файлов Flatbuffers по заданной схеме.
     :param flatc_path: Путь к файлу компилятора схемы.
     :param schema_path: Путь к файлу схемы.
     :param binary_paths: Список путей к бинарным файлам.
     :param output_path: Путь к директории вывода для десериализованных файлов.
+    :param options: Параметры десериализации (используются field_paths, limits и output_format).
+    Если заданы выбранные поля, файлы десериализуются без компилятора схемы и в JSON-файлы
+    записываются только выбранные поля.
     :return: Код ошибки или строка об ошибке.
     """
-    if not os.path.isfile(flatc_path):
-        raise FileNotFoundError(errno.ENOENT, i18n.t("main.file_not_found") % flatc_path)
-    if which(os.path.split(flatc_path)[1], path=os.path.split(flatc_path)[0]) is None:
-        raise FileNotFoundError(errno.ENOENT, i18n.t("main.file_not_executable") % flatc_path)
+    if options is None:
+        options = DeserializeOptions()
+    flatc_path = check_flatc_path(flatc_path)
     if schema_path == "":
         schema_path = askopenfilename(title=i18n.t("main.tkinter_fbs_select"),
                                       filetypes=[(i18n.t("main.fbs_filetype"), "*.fbs")])
@@ -161,20 +318,17 @@ str) -> (int | str):
             raise IOError(errno.EIO, i18n.t("main.no_directory_selected"))
     elif not os.path.isdir(output_path):
         raise FileNotFoundError(errno.ENOENT, i18n.t("main.directory_not_found") % output_path)
-    with logging_redirect_tqdm():
-        pbar = tqdm(total=len(binary_paths), desc=i18n.t("main.files"))
-        with ThreadPoolExecutor() as executor:
-            future_deserialize_binaries = {
-                executor.submit(deserialize, flatc_path, schema_path, binary_path,
-                                output_path, ["--strict-json"]):
-                    binary_path for binary_path in binary_paths}
-            for future in as_completed(future_deserialize_binaries):
-                binary_path = future_deserialize_binaries[future]
-                pbar.set_postfix_str(binary_path)
-                future.result()
-                pbar.update(1)
-        pbar.set_postfix_str("")
-        pbar.close()
+    pbar = tqdm(total=len(binary_paths), desc=i18n.t("main.files"))
+    statuses = []
+    with DeserializerSession(flatc_path, [schema_path], ["--strict-json"], options.field_paths,
+                             options.limits, output_format=options.output_format) as session:
+        for binary_path, _, status, _ in session.deserialize_many(binary_paths, output_path):
+            pbar.set_postfix_str(binary_path, refresh=False)
+            statuses.append(status)
+            pbar.update(1)
+    pbar.set_postfix_str("")
+    pbar.close()
+    log_deserialize_summary(statuses)
     return os.EX_OK
 
 
@@ -199,13 +353,40 @@ def get_binary_tuples(binary_paths: list[str], schema_paths: list[str],
                       return_empty_pairs: bool = False) -> list[tuple[str, str]]:
     """
     Получение списка кортежей из двух элементов: (путь к бинарному файлу, путь к соответствующему ему файлу схемы)
-    :param binary_paths: Список путей к бинарным файлам или директориям с ними.
+    :param binary_paths: Список путей к бинарным файлам или директориям с ними. URL префиксов
+    хранилища объектов (http(s)://, s3://) заменяются на URL объектов под ними.
     :param schema_paths: Список путей к файлам схем.
     :param return_empty_pairs: True, если необходимо добавить в список файлы, к которым нет схем.
     :return: Кортеж из двух строковых элементов.
     """
-    binary_tuples = []
+    return list(iter_binary_tuples(binary_paths, schema_paths, return_empty_pairs))
+
+
+def iter_binary_tuples(binary_paths: list[str], schema_paths: list[str],
+                       return_empty_pairs: bool = False) -> Iterator[tuple[str, str]]:
+    """
+    Ленивый обход бинарных файлов (см. get_binary_tuples): кортежи возвращаются по мере обхода
+    директорий, без построения полного списка.
+    :param binary_paths: Список путей к бинарным файлам или директориям с ними.
+    :param schema_paths: Список путей к файлам схем.
+    :param return_empty_pairs: True, если необходимо добавить файлы, к которым нет схем.
+    :return: Итератор кортежей (путь к бинарному файлу, путь к файлу схемы).
+    """
     for _, binary_path in enumerate(binary_paths):
+        if is_remote_path(binary_path):
+            with get_input_source(binary_path) as source:
+                for member_path, _ in source.list_members():
+                    schema_found = False
+                    for schema_path in schema_paths:
+                        schema_ext = os.path.splitext(os.path.basename(schema_path))[0]
+                        file_ext = os.path.splitext(member_path)[1][1:]
+                        if schema_ext.casefold() == file_ext.casefold():
+                            schema_found = True
+                            yield source.get_location(member_path), schema_path
+                            break
+                    if not schema_found and return_empty_pairs:
+                        yield source.get_location(member_path), ""
+            continue
         if os.path.isfile(binary_path):
             schema_found = False
             file_path = os.path.abspath(binary_path)
@@ -214,14 +395,14 @@ def get_binary_tuples(binary_paths: list[str], schema_paths: list[str],
                 file_ext = os.path.splitext(file_path)[1][1:]
                 if schema_ext.casefold() == file_ext.casefold():
                     schema_found = True
-                    binary_tuples.append((file_path, schema_path))
+                    yield file_path, schema_path
                     break
             if not schema_found and return_empty_pairs:
-                binary_tuples.append((file_path, ""))
+                yield file_path, ""
             continue
         if not os.path.isdir(binary_path):
             if return_empty_pairs:
-                binary_tuples.append((binary_path, ""))
+                yield binary_path, ""
             continue
         for subdir, _, files in os.walk(binary_path):
             for file in files:
@@ -232,66 +413,458 @@ def get_binary_tuples(binary_paths: list[str], schema_paths: list[str],
                     file_ext = os.path.splitext(file_path)[1][1:]
                     if schema_ext.casefold() == file_ext.casefold():
                         schema_found = True
-                        binary_tuples.append((file_path, schema_path))
+                        yield file_path, schema_path
                         break
                 if not schema_found and return_empty_pairs:
-                    binary_tuples.append((file_path, ""))
-    return binary_tuples
+                    yield file_path, ""
+
+
+def verify_and_quarantine(binary_tuples: list[tuple[str, str]], binaries_path: str,
+                          check_identifier: bool, quarantine_path: str) \
+        -> tuple[list[tuple[str, str]], list[tuple[str, str, str]]]:
+    """
+    Структурная проверка бинарных файлов перед десериализацией, вывод сводки по некорректным файлам
+    и их перемещение в директорию карантина.
+    :param binary_tuples: Список кортежей (путь к бинарному файлу, путь к файлу схемы).
+    :param binaries_path: Путь к корневой директории бинарных файлов.
+    :param check_identifier: Проверять ли идентификатор файла, если он объявлен в схеме.
+    :param quarantine_path: Путь к директории карантина. Если пустой, файлы не перемещаются.
+    :return: Кортеж из двух списков: корректные кортежи (путь к бинарному файлу, путь к файлу
+    схемы) и некорректные кортежи (путь к бинарному файлу, путь к файлу схемы, ключ причины).
+    """
+    valid_tuples, invalid_tuples = verify_binary_tuples(binary_tuples, check_identifier)
+    for binary_path, _, reason in invalid_tuples:
+        logging.warning(get_message("main.binary_invalid"), binary_path, get_message(reason))
+    logging.info(get_message("main.verify_summary"), len(binary_tuples), len(valid_tuples),
+                 len(invalid_tuples))
+    if quarantine_path != "" and len(invalid_tuples) > 0:
+        quarantine_binaries([binary_path for binary_path, _, _ in invalid_tuples], binaries_path,
+                            quarantine_path)
+        logging.info(get_message("main.binaries_quarantined"), len(invalid_tuples), quarantine_path)
+    return valid_tuples, invalid_tuples
+
+
+def execute_verify(schemas_path: str, binaries_path: str, check_identifier: bool,
+                   quarantine_path: str) -> (int | str):
+    """
+    Структурная проверка всех бинарных файлов Flatbuffers в директории по всем схемам из другой
+    директории без вызова компилятора схемы.
+    :param schemas_path: Путь к директории с файлами схем.
+    :param binaries_path: Путь к директории с бинарными файлами, zip/tar-архиву с ними или URL
+    префикса в хранилище объектов.
+    :param check_identifier: Проверять ли идентификатор файла, если он объявлен в схеме.
+    :param quarantine_path: Путь к директории карантина. Если пустой, файлы не перемещаются.
+    :return: Код ошибки или строка об ошибке.
+    """
+    schemas_path = get_directory_path(schemas_path, "main.tkinter_fbs_directory_select")
+    binaries_path = get_directory_path(binaries_path, "main.tkinter_binary_directory_select", True)
+    schema_paths = get_schema_paths(schemas_path)
+    if len(schema_paths) < 1:
+        logging.info(get_message("main.no_schema_files_found"), schemas_path)
+        return os.EX_OK
+    if not is_archive_path(binaries_path) and not is_remote_path(binaries_path):
+        _, invalid_tuples = verify_and_quarantine(get_binary_tuples([binaries_path], schema_paths),
+                                                  binaries_path, check_identifier, quarantine_path)
+        return os.EX_OK if len(invalid_tuples) == 0 else errno.EINVAL
+    scratch_path = make_scratch_path()
+    try:
+        valid_count = 0
+        with get_input_source(binaries_path) as source:
+            source_binaries = SourceBinaries(source, scratch_path, schema_paths, DeserializeOptions(
+                verify=True, check_identifier=check_identifier, quarantine_path=quarantine_path))
+            for binary_path in source_binaries:
+                os.remove(binary_path)
+                valid_count += 1
+    finally:
+        rmtree(scratch_path, ignore_errors=True)
+    invalid_count = len(source_binaries.invalid_results) + len(source_binaries.failed_results)
+    logging.info(get_message("main.verify_summary"), valid_count + invalid_count, valid_count,
+                 invalid_count)
+    return os.EX_OK if invalid_count == 0 else errno.EINVAL
+
+
+class SourceBinaries:
+    """
+    Потоковая запись бинарных файлов источника (архива или хранилища объектов), для которых есть
+    схема (по расширению, как в get_binary_tuples), во временную директорию с опциональной
+    проверкой структуры. Следующий файл записывается только при запросе следующего элемента
+    итератора (хранилище объектов загружает следующие файлы заранее в ограниченный буфер).
+    """
+
+    def __init__(self, source: InputSource, scratch_path: str, schema_paths: list[str],
+                 options: DeserializeOptions, shard: ShardPlan | None = None):
+        """
+        Создание обхода источника.
+        :param source: Источник бинарных файлов.
+        :param scratch_path: Путь к временной директории.
+        :param schema_paths: Список путей к файлам схем.
+        :param options: Параметры десериализации (используются verify, check_identifier и
+        quarantine_path). Некорректные файлы не возвращаются, а при пустом пути карантина
+        удаляются из временной директории.
+        :param shard: Шард. Если задан, записываются только файлы шарда.
+        """
+        self.source = source
+        self.scratch_path = scratch_path
+        self.options = options
+        self.shard = shard
+        self.schemas = {}
+        for schema_path in schema_paths:
+            self.schemas.setdefault(os.path.splitext(os.path.basename(schema_path))[0].casefold(),
+                                    schema_path)
+        # Кортежи (путь к файлу в источнике, путь к файлу схемы, "", "invalid").
+        self.invalid_results = []
+        # Кортежи (путь к файлу в источнике, путь к файлу схемы, "", "error") для файлов, которые
+        # не удалось прочитать из источника.
+        self.failed_results = []
+        self.binary_sizes = {}  # Размеры записанных файлов {путь к файлу в источнике: размер}.
+
+    def get_schema_path(self, member_path: str) -> str:
+        """
+        Получение пути к файлу схемы для файла источника по его расширению.
+        :param member_path: Путь к файлу.
+        :return: Путь к файлу схемы или пустая строка, если схемы нет.
+        """
+        return self.schemas.get(os.path.splitext(member_path)[1][1:].casefold(), "")
+
+    def add_failed(self, member_path: str, exc: Exception):
+        """
+        Учёт файла, который не удалось прочитать из источника (см. InputSource.extract_members).
+        :param member_path: Относительный путь файла.
+        :param exc: Исключение.
+        """
+        location = self.source.get_location(member_path)
+        logging.warning(get_message("main.binary_read_failed"), location, exc)
+        self.failed_results.append((location, self.get_schema_path(member_path), "",
+                                    STATUS_ERROR))
+
+    def __iter__(self) -> Iterator[str]:
+        """
+        Обход источника.
+        :return: Итератор путей к записанным бинарным файлам.
+        """
+        check_identifier = self.options.check_identifier
+        identifiers = {schema_path: get_schema_file_identifier(schema_path) if check_identifier
+                       else "" for schema_path in self.schemas.values()}
+        selected_paths = None
+        if self.shard is not None:
+            selected_paths = set(shard_items(
+                [(member_path, size, member_path) for member_path, size in
+                 self.source.list_members() if self.get_schema_path(member_path) != ""],
+                self.shard))
+
+        def accept(member_path: str) -> bool:
+            if selected_paths is not None:
+                return member_path in selected_paths
+            return self.get_schema_path(member_path) != ""
+
+        for binary_path in self.source.extract_members(self.scratch_path, accept,
+                                                        self.add_failed):
+            location = self.source.get_location(os.path.relpath(binary_path, self.scratch_path))
+            self.binary_sizes[location] = os.path.getsize(binary_path)
+            if not self.options.verify and not check_identifier:
+                yield binary_path
+                continue
+            schema_path = self.get_schema_path(binary_path)
+            reason = verify_binary(binary_path, identifiers[schema_path])
+            if reason == "":
+                yield binary_path
+                continue
+            logging.warning(get_message("main.binary_invalid"), location, get_message(reason))
+            self.invalid_results.append((location, schema_path, "", "invalid"))
+            if self.options.quarantine_path != "":
+                quarantine_binaries([binary_path], self.scratch_path, self.options.quarantine_path)
+            else:
+                os.remove(binary_path)
+        if self.options.quarantine_path != "" and len(self.invalid_results) > 0:
+            logging.info(get_message("main.binaries_quarantined"), len(self.invalid_results),
+                         self.options.quarantine_path)
+
+
+def deserialize_binaries(stages: DeserializeStages, binary_tuples: Iterable[tuple[str, str]],
+                         options: DeserializeOptions, total: int | None = None,
+                         source: InputSource | None = None) \
+        -> list[tuple[str, str, str, str]]:
+    """
+    Десериализация бинарных файлов конвейером (см. pipeline_funcs) с индикатором прогресса, на
+    котором отображается заполнение очередей стадий.
+    :param stages: Стадии конвейера десериализации.
+    :param binary_tuples: Кортежи (путь к бинарному файлу, путь к файлу схемы). Могут быть ленивым
+    итератором - обход выполняется параллельно с остальными стадиями.
+    :param options: Параметры десериализации (используются stage_workers и queue_size).
+    :param total: Количество файлов (если известно).
+    :param source: Исходный архив или хранилище объектов, если бинарные файлы записаны из него во
+    временную директорию (для вывода исходных путей файлов).
+    :return: Список кортежей (путь к бинарному файлу, путь к файлу схемы, путь к файлу вывода или
+    пустая строка при ошибке, статус).
+    """
+    results = []
+    pipeline = Pipeline(stages.get_stages(parse_stage_workers(options.stage_workers)),
+                        options.queue_size)
+    pbar = tqdm(total=total, desc=i18n.t("main.files"))
+    try:
+        for binary_path, schema_path, output_file_path, status in pipeline.run(
+                BinaryJob(binary_path, schema_path) for binary_path, schema_path in binary_tuples):
+            pbar.set_postfix_str(pipeline.format_queue_depths(), refresh=False)
+            if source is not None:
+                binary_path = source.get_location(os.path.relpath(binary_path,
+                                                                  stages.binaries_path))
+            results.append((binary_path, schema_path, output_file_path, status))
+            pbar.update(1)
+    finally:
+        stages.close()
+        pbar.set_postfix_str("")
+        pbar.close()
+    pipeline.log_stats()
+    return results
+
+
+def deserialize_source_binaries(stages: DeserializeStages, binaries_path: str,
+                                schema_paths: list[str], options: DeserializeOptions,
+                                shard: ShardPlan | None = None) \
+        -> tuple[list[tuple[str, str, str, str]], dict[str, int]]:
+    """
+    Десериализация бинарных файлов архива или хранилища объектов, записываемых по одному во
+    временную директорию стадий (см. SourceBinaries).
+    :param stages: Стадии конвейера десериализации с временной директорией в качестве директории
+    бинарных файлов.
+    :param binaries_path: Путь к zip/tar-архиву или URL префикса в хранилище объектов.
+    :param schema_paths: Список путей к файлам схем.
+    :param options: Параметры десериализации.
+    :param shard: Шард. Если задан, десериализуются только файлы шарда.
+    :return: Кортеж из двух элементов: (список кортежей (путь к файлу в источнике, путь к файлу
+    схемы, путь к файлу вывода или пустая строка при ошибке, статус), словарь {путь к файлу в
+    источнике: размер}).
+    """
+    with get_input_source(binaries_path) as source:
+        source_binaries = SourceBinaries(source, stages.binaries_path, schema_paths, options,
+                                         shard)
+        results = deserialize_binaries(
+            stages, ((binary_path, source_binaries.get_schema_path(binary_path))
+                     for binary_path in source_binaries), options, None, source)
+    return results + source_binaries.invalid_results + source_binaries.failed_results, \
+        source_binaries.binary_sizes
+
+
+def deserialize_directory_binaries(stages: DeserializeStages, schema_paths: list[str],
+                                   options: DeserializeOptions, shard: ShardPlan | None = None) \
+        -> list[tuple[str, str, str, str]]:
+    """
+    Десериализация бинарных файлов директории с проверкой структуры на стадии read (если заданы
+    идентификаторы стадий).
+    :param stages: Стадии конвейера десериализации.
+    :param schema_paths: Список путей к файлам схем.
+    :param options: Параметры десериализации.
+    :param shard: Шард. Если задан, десериализуются только файлы шарда.
+    :return: Список кортежей (путь к бинарному файлу, путь к файлу схемы, путь к файлу вывода или
+    пустая строка при ошибке, статус).
+    """
+    total = None
+    binary_tuples = iter_binary_tuples([stages.binaries_path], schema_paths)
+    if shard is not None:
+        binary_tuples = shard_binary_tuples(list(binary_tuples), stages.binaries_path, shard)
+        total = len(binary_tuples)
+    results = deserialize_binaries(stages, binary_tuples, options, total)
+    if stages.identifiers is not None:
+        logging.info(get_message("main.verify_summary"), len(results),
+                     len(results) - stages.invalid_count, stages.invalid_count)
+    if options.quarantine_path != "" and stages.invalid_count > 0:
+        logging.info(get_message("main.binaries_quarantined"), stages.invalid_count,
+                     options.quarantine_path)
+    return results
 
 
 def execute_deserialize_batch(flatc_path: str, schemas_path: str, binaries_path: str,
-                              output_path: str) -> (int | str):
+                              output_path: str, options: DeserializeOptions | None = None) \
+        -> (int | str):
     """
     Десериализация всех файлов Flatbuffers в директории по всем схемам из другой директории.
+    Файлы обрабатываются конвейером со стадиями scan (обход), read, decode, encode и write,
+    связанными ограниченными очередями.
+    :param flatc_path: Путь к файлу компилятора схемы.
+    :param schemas_path: Путь к директории с файлами схем.
+    :param binaries_path: Путь к директории с бинарными файлами, к zip/tar-архиву с ними или URL
+    префикса в HTTP/S3-совместимом хранилище объектов (файлы архива и хранилища записываются по
+    одному во временную директорию в tmpfs).
+    :param output_path: Путь к директории вывода или к zip/tar-архиву для JSON-файлов.
+    :param options: Параметры десериализации. Если задан шард, обрабатывается только его часть
+    файлов и в директорию вывода записывается манифест шарда. При проверке структуры
+    некорректные файлы пропускаются. Если заданы выбранные поля, файлы десериализуются без
+    компилятора схемы (при заданном числе процессов - в пуле процессов с передачей данных через
+    разделяемую память, см. shm_funcs).
+    :return: Код ошибки или строка об ошибке.
+    """
+    if options is None:
+        options = DeserializeOptions()
+    shard = parse_shard(options.shard) if options.shard != "" else None
+    flatc_path = check_flatc_path(flatc_path)
+    schemas_path = get_directory_path(schemas_path, "main.tkinter_fbs_directory_select")
+    binaries_path = get_directory_path(binaries_path, "main.tkinter_binary_directory_select", True)
+    output_path = get_output_path(output_path, flatc_path)
+    output_directory = os.path.dirname(os.path.abspath(output_path)) if is_archive_path(
+        output_path) else output_path
+    if not os.path.isdir(output_directory):
+        raise FileNotFoundError(errno.ENOENT, i18n.t("main.directory_not_found") %
+                                output_directory)
+    schema_paths = get_schema_paths(schemas_path)
+    if len(schema_paths) < 1:
+        logging.info(get_message("main.no_schema_files_found"), binaries_path)
+        return os.EX_OK
+    binaries_scratched = is_archive_path(binaries_path) or is_remote_path(binaries_path)
+    scratch_path = make_scratch_path() if binaries_scratched or is_archive_path(output_path) \
+        else ""
+    transport = None
+    binary_sizes = {}
+    try:
+        if options.process_workers > 0 and options.field_paths:
+            transport = SharedMemoryTransport(options.process_workers,
+                                              SLOTS_PER_WORKER * options.process_workers +
+                                              len(STAGE_NAMES) * options.queue_size)
+        with DeserializerSession(flatc_path, schema_paths, ["--strict-json"], options.field_paths,
+                                 options.limits) as session:
+            output_scratch_path = scratch_path if is_archive_path(output_path) else ""
+            if binaries_scratched:
+                results, binary_sizes = deserialize_source_binaries(
+                    DeserializeStages(session, os.path.join(scratch_path, "input"), output_path,
+                                      options.output_format, output_scratch_path, True,
+                                      transport=transport),
+                    binaries_path, schema_paths, options, shard)
+            else:
+                results = deserialize_directory_binaries(
+                    DeserializeStages(session, binaries_path, output_path, options.output_format,
+                                      output_scratch_path, False, {
+                                          schema_path: get_schema_file_identifier(schema_path) if
+                                          options.check_identifier else "" for schema_path in
+                                          schema_paths} if options.verify or
+                                      options.check_identifier else None,
+                                      options.quarantine_path, transport),
+                    schema_paths, options, shard)
+    finally:
+        if transport is not None:
+            transport.close()
+        if scratch_path != "":
+            rmtree(scratch_path, ignore_errors=True)
+    log_deserialize_summary([result[3] for result in results])
+    if shard is not None:
+        write_shard_manifest(shard, binaries_path, output_path, results, binary_sizes)
+    return os.EX_OK if all(result[3] == STATUS_DONE for result in results) else errno.EIO
+
+
+def get_json_tuples(json_paths: list[str], schema_paths: list[str]) -> list[tuple[str, str]]:
+    """
+    Получение списка кортежей из двух элементов: (путь к JSON-файлу, путь к соответствующему ему
+    файлу схемы). Схема определяется по второму расширению файла (a.<схема>.json), а если схема
+    всего одна - используется она.
+    :param json_paths: Список путей к JSON-файлам или директориям с ними.
+    :param schema_paths: Список путей к файлам схем.
+    :return: Список кортежей из двух строковых элементов.
+    """
+    schemas = {os.path.splitext(os.path.basename(schema_path))[0].casefold(): schema_path
+               for schema_path in reversed(schema_paths)}
+    default_schema_path = schema_paths[0] if len(schema_paths) == 1 else ""
+    json_tuples = []
+    for json_path in json_paths:
+        if os.path.isfile(json_path):
+            file_paths = [os.path.abspath(json_path)]
+        else:
+            file_paths = [os.path.abspath(os.path.join(subdir, file))
+                          for subdir, _, files in os.walk(json_path) for file in files]
+        for file_path in file_paths:
+            file_name, file_ext = os.path.splitext(file_path)
+            if file_ext.lower() != ".json":
+                continue
+            schema_path = schemas.get(os.path.splitext(file_name)[1][1:].casefold(),
+                                      default_schema_path)
+            if schema_path != "":
+                json_tuples.append((file_path, schema_path))
+    return json_tuples
+
+
+def get_path_chunks(paths: list[str], max_count: int = 256, max_length: int = 24576) \
+        -> list[list[str]]:
+    """
+    Разбиение списка путей на части для передачи в один вызов компилятора схемы с ограничением
+    по количеству путей и суммарной длине командной строки.
+    :param paths: Список путей.
+    :param max_count: Максимальное количество путей в части.
+    :param max_length: Максимальная суммарная длина путей в части.
+    :return: Список частей.
+    """
+    chunks = []
+    chunk = []
+    chunk_length = 0
+    for path in paths:
+        if len(chunk) >= max_count or (len(chunk) > 0 and chunk_length + len(path) > max_length):
+            chunks.append(chunk)
+            chunk = []
+            chunk_length = 0
+        chunk.append(path)
+        chunk_length += len(path) + 1
+    if len(chunk) > 0:
+        chunks.append(chunk)
+    return chunks
+
+
+def get_json_groups(jsons_path: str, output_path: str, schema_paths: list[str]) \
+        -> tuple[dict[tuple[str, str], list[str]], int]:
+    """
+    Группировка JSON-файлов директории по схеме и директории вывода с исключением файлов, выводы
+    которых совпадают (см. get_colliding_paths).
+    :param jsons_path: Путь к директории с JSON-файлами.
+    :param output_path: Путь к директории вывода.
+    :param schema_paths: Список путей к файлам схем.
+    :return: Кортеж из двух элементов: (словарь {(путь к файлу схемы, путь к директории вывода):
+    список путей к JSON-файлам}, количество исключённых файлов).
+    """
+    json_groups = {}
+    for json_path, schema_path in get_json_tuples([jsons_path], schema_paths):
+        json_output_path = os.path.join(output_path,
+                                        os.path.split(os.path.relpath(json_path, jsons_path))[0])
+        json_groups.setdefault((schema_path, json_output_path), []).append(json_path)
+    files_failed = 0
+    for (schema_path, json_output_path), json_paths in json_groups.items():
+        colliding_paths = get_colliding_paths(schema_path, json_paths, json_output_path)
+        files_failed += len(colliding_paths)
+        json_paths[:] = [json_path for json_path in json_paths if json_path not in colliding_paths]
+    return json_groups, files_failed
+
+
+def execute_serialize_batch(flatc_path: str, schemas_path: str, jsons_path: str,
+                            output_path: str) -> (int | str):
+    """
+    Сериализация всех JSON-файлов в директории в бинарные файлы Flatbuffers по всем схемам из другой
+    директории. Файлы с одной схемой и одной директорией вывода сериализуются частями, одним вызовом
+    компилятора схемы на часть.
     :param flatc_path: Путь к файлу компилятора схемы.
     :param schemas_path: Путь к директории с файлами схем.
-    :param binaries_path: Путь к директории с бинарными файлами.
+    :param jsons_path: Путь к директории с JSON-файлами.
     :param output_path: Путь к директории вывода.
     :return: Код ошибки или строка об ошибке.
     """
-    if not os.path.isfile(flatc_path):
-        raise FileNotFoundError(errno.ENOENT, i18n.t("main.file_not_found") % flatc_path)
-    if which(os.path.split(flatc_path)[1], path=os.path.split(flatc_path)[0]) is None:
-        raise FileNotFoundError(errno.ENOENT, i18n.t("main.file_not_executable") % flatc_path)
-    if schemas_path == "":
-        schemas_path = askdirectory(title=i18n.t("main.tkinter_fbs_directory_select"))
-        if schemas_path == "":
-            raise IOError(errno.EIO, i18n.t("main.no_directory_selected"))
-    if not os.path.isdir(schemas_path):
-        raise FileNotFoundError(errno.ENOENT, i18n.t("main.directory_not_found") % schemas_path)
-    if binaries_path == "":
-        binaries_path = askdirectory(title=i18n.t("main.tkinter_binary_directory_select"))
-        if binaries_path == "":
-            raise IOError(errno.EIO, i18n.t("main.no_directory_selected"))
-    if not os.path.isdir(binaries_path):
-        raise FileNotFoundError(errno.ENOENT, i18n.t("main.directory_not_found") % binaries_path)
-    if output_path == "":
-        output_path = askdirectory(title=i18n.t("main.tkinter_output_select"))
-        if output_path == "":
-            output_path = os.path.split(flatc_path)[0]
-            if output_path == "":
-                raise IOError(errno.EIO, i18n.t("main.no_directory_selected"))
+    flatc_path = check_flatc_path(flatc_path)
+    schemas_path = get_directory_path(schemas_path, "main.tkinter_fbs_directory_select")
+    jsons_path = get_directory_path(jsons_path, "main.tkinter_json_directory_select")
+    output_path = get_output_path(output_path, flatc_path)
     if not os.path.isdir(output_path):
         raise FileNotFoundError(errno.ENOENT, i18n.t("main.directory_not_found") % output_path)
     schema_paths = get_schema_paths(schemas_path)
     if len(schema_paths) < 1:
-        logging.info(i18n.t("main.no_schema_files_found"), binaries_path)
+        logging.info(get_message("main.no_schema_files_found"), schemas_path)
         return os.EX_OK
-    binary_tuples = get_binary_tuples([binaries_path], schema_paths)
-    with logging_redirect_tqdm():
-        pbar = tqdm(total=len(binary_tuples), desc=i18n.t("main.files"))
-        with ThreadPoolExecutor() as executor:
-            future_deserialize_binaries = {
-                executor.submit(deserialize, flatc_path, schema_path, binary_path,
-                                output_path + os.sep +
-                                os.path.split(os.path.relpath(binary_path, binaries_path))[0],
-                                ["--strict-json"]):
-                    binary_path for binary_path, schema_path in binary_tuples}
-            for future in as_completed(future_deserialize_binaries):
-                binary_path = future_deserialize_binaries[future]
-                pbar.set_postfix_str(binary_path)
-                future.result()
-                pbar.update(1)
-        pbar.set_postfix_str("")
-        pbar.close()
-    return os.EX_OK
+    json_groups, files_failed = get_json_groups(jsons_path, output_path, schema_paths)
+    files_total = files_failed + sum(len(json_paths) for json_paths in json_groups.values())
+    pbar = tqdm(total=files_total, initial=files_failed, desc=i18n.t("main.files"))
+    with ThreadPoolExecutor() as executor:
+        future_serialize_jsons = {
+            executor.submit(serialize, flatc_path, schema_path, json_chunk, json_output_path):
+                json_chunk for (schema_path, json_output_path), json_paths in
+            json_groups.items() for json_chunk in get_path_chunks(json_paths)}
+        for future in as_completed(future_serialize_jsons):
+            json_chunk = future_serialize_jsons[future]
+            pbar.set_postfix_str(json_chunk[-1], refresh=False)
+            files_failed += sum(1 for binary_path in future.result() if binary_path == "")
+            pbar.update(len(json_chunk))
+    pbar.set_postfix_str("")
+    pbar.close()
+    logging.info(get_message("main.serialize_summary"), files_total, files_total - files_failed,
+                 files_failed)
+    return os.EX_OK if files_failed == 0 else errno.EIO
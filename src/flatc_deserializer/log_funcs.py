@@ -0,0 +1,187 @@
+"""
+    Модуль, включающий в себя функции для неблокирующего логирования с низкими накладными расходами.
+"""
+import atexit
+import json
+import logging
+import sys
+import threading
+import time
+from functools import lru_cache
+from logging.handlers import QueueHandler, QueueListener
+from queue import SimpleQueue
+
+from i18n import t
+from tqdm import tqdm
+
+LOG_MODE_TEXT = "text"
+LOG_MODE_QUIET = "quiet"
+LOG_MODE_JSON = "json"
+LOG_MODES = (LOG_MODE_TEXT, LOG_MODE_QUIET, LOG_MODE_JSON)
+RATE_LIMIT_COUNT = 20
+RATE_LIMIT_INTERVAL = 1.0
+# Типы аргументов сообщений, которые не нужно копировать перед помещением записи в очередь.
+IMMUTABLE_TYPES = (str, int, float, bool, type(None))
+
+# Логгер для сообщений об успешной обработке отдельных файлов. Ошибки логируются с уровнем
+# WARNING и не ограничиваются.
+file_logger = logging.getLogger("flatc_deserializer.files")
+message_keys = {}
+
+
+@lru_cache(maxsize=None)
+def get_message(key: str) -> str:
+    """
+    Получение перевода строки локализации с кэшированием (для частых сообщений).
+    :param key: Ключ строки локализации.
+    :return: Переведённая строка.
+    """
+    message = t(key)
+    message_keys[message] = key
+    return message
+
+
+class DeferredQueueHandler(QueueHandler):
+    """
+    Обработчик, помещающий записи в очередь без форматирования - сообщения форматируются в потоке
+    QueueListener, а не в вызывающем потоке.
+    """
+
+    def __init__(self, queue: SimpleQueue, listener: QueueListener):
+        """
+        Создание обработчика.
+        :param queue: Очередь записей.
+        :param listener: Поток, выводящий записи из очереди (останавливается в stop_logging).
+        """
+        super().__init__(queue)
+        self.listener = listener
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Запись форматируется позже в другом потоке, поэтому изменяемые аргументы (списки,
+        # словари, объекты) заменяются их строковым представлением на момент вызова - все
+        # шаблоны сообщений используют только %s. Строки и числа неизменяемы и передаются как
+        # есть. exc_info в сообщениях не используется.
+        if isinstance(record.args, tuple) and \
+                not all(isinstance(arg, IMMUTABLE_TYPES) for arg in record.args):
+            record.args = tuple(arg if isinstance(arg, IMMUTABLE_TYPES) else str(arg)
+                                for arg in record.args)
+        return record
+
+
+class TqdmWriteHandler(logging.Handler):
+    """
+    Обработчик, выводящий сообщения через tqdm.write, не ломая индикаторы прогресса.
+    """
+
+    def emit(self, record: logging.LogRecord):
+        try:
+            tqdm.write(self.format(record), file=sys.stdout)
+        except Exception:  # pylint: disable=broad-exception-caught
+            self.handleError(record)
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Форматирование записей в виде JSON-объектов (по одному на строку).
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {"time": round(record.created, 3), "level": record.levelname,
+                 "event": message_keys.get(record.msg, ""), "message": record.getMessage()}
+        if record.args:
+            entry["args"] = [str(arg) for arg in record.args]
+        return json.dumps(entry, ensure_ascii=False)
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Ограничение числа одинаковых (по шаблону) сообщений за интервал времени. Число отброшенных
+    сообщений выводится при смене интервала и при завершении логирования.
+    """
+
+    def __init__(self, limit: int = RATE_LIMIT_COUNT, interval: float = RATE_LIMIT_INTERVAL):
+        super().__init__()
+        self.limit = limit
+        self.interval = interval
+        self.lock = threading.Lock()
+        self.window_start = time.monotonic()
+        self.counts = {}
+        self.suppressed = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        now = time.monotonic()
+        suppressed = None
+        with self.lock:
+            if now - self.window_start >= self.interval:
+                suppressed = self.suppressed
+                self.counts = {}
+                self.suppressed = {}
+                self.window_start = now
+            count = self.counts.get(record.msg, 0) + 1
+            self.counts[record.msg] = count
+            if count > self.limit:
+                self.suppressed[record.msg] = self.suppressed.get(record.msg, 0) + 1
+        if suppressed:
+            log_suppressed(suppressed)
+        return count <= self.limit
+
+    def flush(self):
+        """
+        Вывод числа отброшенных сообщений текущего интервала.
+        """
+        with self.lock:
+            suppressed = self.suppressed
+            self.suppressed = {}
+        if suppressed:
+            log_suppressed(suppressed)
+
+
+def log_suppressed(suppressed: dict[str, int]):
+    """
+    Вывод числа отброшенных сообщений по шаблонам.
+    :param suppressed: Словарь {шаблон сообщения: число отброшенных сообщений}.
+    """
+    for message, count in suppressed.items():
+        logging.info(get_message("log_funcs.messages_suppressed"), count,
+                     message_keys.get(message, message))
+
+
+def stop_logging():
+    """
+    Остановка потоков логирования с выводом всех сообщений из очереди.
+    """
+    for log_filter in file_logger.filters:
+        if isinstance(log_filter, RateLimitFilter):
+            log_filter.flush()
+    root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        if isinstance(handler, DeferredQueueHandler):
+            root_logger.removeHandler(handler)
+            handler.listener.stop()
+
+
+def set_log_mode(log_mode: str = LOG_MODE_TEXT):
+    """
+    Настройка логирования: сообщения помещаются в очередь и выводятся отдельным потоком.
+    :param log_mode: Режим логирования: text - текст, quiet - без сообщений об успешной обработке
+    отдельных файлов, json - JSON-объекты по одному на строку.
+    """
+    stop_logging()
+    handler = TqdmWriteHandler()
+    handler.setFormatter(JsonFormatter() if log_mode == LOG_MODE_JSON else
+                         logging.Formatter("%(message)s"))
+    queue = SimpleQueue()
+    queue_handler = DeferredQueueHandler(queue, QueueListener(queue, handler))
+    queue_handler.listener.start()
+    root_logger = logging.getLogger()
+    root_logger.addHandler(queue_handler)
+    root_logger.setLevel(logging.INFO)
+    file_logger.filters.clear()
+    if log_mode == LOG_MODE_QUIET:
+        file_logger.setLevel(logging.WARNING)
+    else:
+        file_logger.setLevel(logging.INFO)
+        file_logger.addFilter(RateLimitFilter())
+
+
+atexit.register(stop_logging)
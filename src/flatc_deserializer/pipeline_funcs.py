@@ -0,0 +1,481 @@
+"""
+    Модуль, включающий в себя конвейер обработки с отдельными пулами потоков для каждой стадии,
+    связанными ограниченными очередями, и стадии конвейера пакетной десериализации.
+"""
+# pylint: disable=too-many-arguments, too-many-instance-attributes
+import json
+import logging
+import os
+import struct
+import threading
+import time
+from collections.abc import Callable, Iterable, Iterator
+from concurrent.futures.process import BrokenProcessPool
+from queue import Queue, Empty, Full
+from typing import NamedTuple
+
+from i18n import t
+
+from archive_funcs import ArchiveWriter
+from buffer_funcs import decode_buffer
+from encoding_funcs import encode_value, get_output_path, get_schema_layout, OUTPUT_FORMAT_JSON
+from flatc_funcs import STATUS_DONE, STATUS_ERROR
+from log_funcs import file_logger, get_message
+from session_funcs import DeserializerSession
+from shm_funcs import SharedMemoryTransport, ShmHandle
+from verify_funcs import verify_binary, quarantine_binaries
+
+STAGE_READ = "read"
+STAGE_DECODE = "decode"
+STAGE_ENCODE = "encode"
+STAGE_WRITE = "write"
+STAGE_NAMES = (STAGE_READ, STAGE_DECODE, STAGE_ENCODE, STAGE_WRITE)
+QUEUE_SIZE = 16
+POLL_INTERVAL = 0.1
+STATUS_INVALID = "invalid"
+# Признак завершения очереди.
+END_OF_QUEUE = object()
+
+
+class PipelineStage(NamedTuple):
+    """
+    Стадия конвейера: функция, вызываемая для каждого элемента в workers потоках. Если функция
+    возвращает None, элемент не передаётся на следующую стадию.
+    """
+    name: str
+    func: Callable
+    workers: int = 1
+
+
+class Pipeline:
+    """
+    Конвейер из стадий, каждая из которых обрабатывает элементы в своём пуле потоков. Стадии
+    связаны очередями ограниченного размера: если стадия не успевает, очередь перед ней
+    заполняется и предыдущие стадии блокируются, поэтому темп задаёт самая медленная стадия,
+    а объём памяти ограничен. Входные элементы читаются отдельным потоком (стадия scan).
+    """
+
+    def __init__(self, stages: list[PipelineStage], queue_size: int = QUEUE_SIZE):
+        """
+        Создание конвейера.
+        :param stages: Список стадий.
+        :param queue_size: Размер очереди перед каждой стадией и очереди результатов.
+        """
+        self.stages = stages
+        self.queue_size = max(queue_size, 1)
+        self.queues = [Queue(self.queue_size) for _ in range(len(stages) + 1)]
+        self.stop_event = threading.Event()
+        self.lock = threading.Lock()
+        self.error = None
+        self.active_workers = [stage.workers for stage in stages]
+        self.processed = [0] * len(stages)
+        self.busy_times = [0.0] * len(stages)
+        self.max_depths = [0] * len(stages)
+        self.wall_time = 0.0
+
+    def get_queue_depths(self) -> dict[str, int]:
+        """
+        Получение текущего числа элементов в очередях перед стадиями.
+        :return: Словарь {имя стадии: число элементов в очереди}.
+        """
+        return {stage.name: self.queues[i].qsize() for i, stage in enumerate(self.stages)}
+
+    def format_queue_depths(self) -> str:
+        """
+        Получение строки с текущим заполнением очередей (для индикатора прогресса).
+        :return: Строка вида "read 3/16 decode 16/16 ...".
+        """
+        return " ".join(f"{name} {depth}/{self.queue_size}"
+                        for name, depth in self.get_queue_depths().items())
+
+    def log_stats(self):
+        """
+        Вывод статистики стадий: число элементов, загрузка потоков и максимальное заполнение
+        очереди. Стадия с наибольшей загрузкой и полной очередью перед ней - узкое место.
+        """
+        for i, stage in enumerate(self.stages):
+            utilization = self.busy_times[i] / (stage.workers * self.wall_time) * 100 \
+                if self.wall_time > 0 else 0
+            logging.info(get_message("pipeline_funcs.stage_summary"), stage.name, stage.workers,
+                         self.processed[i], f"{utilization:.0f}%", self.max_depths[i],
+                         self.queue_size)
+
+    def fail(self, exc: Exception):
+        """
+        Остановка конвейера из-за исключения в одном из потоков.
+        :param exc: Исключение, которое будет выброшено в потоке, читающем результаты.
+        """
+        with self.lock:
+            if self.error is None:
+                self.error = exc
+        self.stop_event.set()
+
+    def put(self, index: int, item) -> bool:
+        """
+        Помещение элемента в очередь с ожиданием свободного места.
+        :param index: Номер очереди.
+        :param item: Элемент.
+        :return: False, если конвейер остановлен.
+        """
+        while not self.stop_event.is_set():
+            try:
+                self.queues[index].put(item, timeout=POLL_INTERVAL)
+            except Full:
+                continue
+            if index < len(self.stages):
+                self.max_depths[index] = max(self.max_depths[index], self.queues[index].qsize())
+            return True
+        return False
+
+    def get(self, index: int):
+        """
+        Получение элемента из очереди с ожиданием.
+        :param index: Номер очереди.
+        :return: Элемент или END_OF_QUEUE, если конвейер остановлен.
+        """
+        while not self.stop_event.is_set():
+            try:
+                return self.queues[index].get(timeout=POLL_INTERVAL)
+            except Empty:
+                continue
+        return END_OF_QUEUE
+
+    def feed(self, items: Iterable):
+        """
+        Чтение входных элементов в первую очередь (стадия scan).
+        :param items: Входные элементы.
+        """
+        try:
+            for item in items:
+                if not self.put(0, item):
+                    return
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            self.fail(exc)
+            return
+        self.put(0, END_OF_QUEUE)
+
+    def work(self, index: int):
+        """
+        Цикл потока стадии. Признак завершения очереди передаётся соседним потокам стадии, а
+        последний завершившийся поток передаёт его следующей стадии.
+        :param index: Номер стадии.
+        """
+        stage = self.stages[index]
+        while True:
+            item = self.get(index)
+            if item is END_OF_QUEUE:
+                break
+            start_time = time.perf_counter()
+            try:
+                result = stage.func(item)
+            except Exception as exc:  # pylint: disable=broad-exception-caught
+                self.fail(exc)
+                break
+            with self.lock:
+                self.processed[index] += 1
+                self.busy_times[index] += time.perf_counter() - start_time
+            if result is not None and not self.put(index + 1, result):
+                break
+        with self.lock:
+            self.active_workers[index] -= 1
+            last_worker = self.active_workers[index] == 0
+        self.put(index + 1 if last_worker else index, END_OF_QUEUE)
+
+    def run(self, items: Iterable) -> Iterator:
+        """
+        Запуск конвейера.
+        :param items: Входные элементы (может быть ленивым итератором любой длины).
+        :return: Итератор результатов последней стадии в порядке завершения.
+        """
+        threads = [threading.Thread(target=self.feed, args=(items,), name="pipeline-scan",
+                                    daemon=True)]
+        for i, stage in enumerate(self.stages):
+            threads += [threading.Thread(target=self.work, args=(i,),
+                                         name=f"pipeline-{stage.name}-{j + 1}", daemon=True)
+                        for j in range(stage.workers)]
+        start_time = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        try:
+            while True:
+                result = self.get(len(self.stages))
+                if result is END_OF_QUEUE:
+                    break
+                yield result
+        finally:
+            self.stop_event.set()
+            for thread in threads:
+                thread.join()
+            self.wall_time = time.perf_counter() - start_time
+        if self.error is not None:
+            raise self.error
+
+
+def parse_stage_workers(stage_workers: str) -> dict[str, int]:
+    """
+    Разбор строки с числом потоков стадий.
+    :param stage_workers: Строка вида "read=2,decode=8,encode=4,write=1".
+    :return: Словарь {имя стадии: число потоков}.
+    """
+    workers = {}
+    for part in stage_workers.split(","):
+        if part.strip() == "":
+            continue
+        name, _, count = part.partition("=")
+        name = name.strip().lower()
+        if name not in STAGE_NAMES or not count.strip().isdigit() or int(count) < 1:
+            raise ValueError(t("pipeline_funcs.invalid_stage_workers") % stage_workers)
+        workers[name] = int(count)
+    return workers
+
+
+class BinaryJob(NamedTuple):
+    """
+    Бинарный файл, передаваемый между стадиями конвейера десериализации.
+    """
+    binary_path: str
+    schema_path: str
+    status: str = ""
+    output_path: str = ""
+    data: bytes | ShmHandle | None = None
+    value: dict | None = None
+    slot: int = -1
+
+
+class DeserializeStages:
+    """
+    Стадии конвейера пакетной десериализации:
+    read - проверка структуры файла (и его перемещение в карантин) и, при десериализации выбранных
+    полей, чтение файла в память;
+    decode - вызов компилятора схемы или декодирование выбранных полей из памяти;
+    encode - кодирование результата в формат вывода (JSON, MessagePack или CBOR);
+    write - запись файла вывода в директорию или архив.
+    Если задан пул процессов с разделяемой памятью, на стадии read файл читается в ячейку
+    кольцевого буфера, стадия decode декодирует и кодирует его в процессе пула, а стадия write
+    записывает результат прямо из разделяемой памяти.
+    """
+
+    def __init__(self, session: DeserializerSession, binaries_path: str, output_path: str,
+                 output_format: str = OUTPUT_FORMAT_JSON, scratch_path: str = "",
+                 remove_binaries: bool = False, identifiers: dict[str, str] | None = None,
+                 quarantine_path: str = "", transport: SharedMemoryTransport | None = None):
+        """
+        Создание стадий.
+        :param session: Сессия десериализации (с форматом вывода json).
+        :param binaries_path: Путь к корневой директории бинарных файлов.
+        :param output_path: Путь к директории или архиву вывода.
+        :param output_format: Формат файлов вывода (json, msgpack или cbor).
+        :param scratch_path: Путь к временной директории для файлов вывода, если вывод - архив.
+        :param remove_binaries: Удалять ли бинарные файлы после десериализации (временные копии
+        файлов из архива или хранилища объектов).
+        :param identifiers: Словарь {путь к файлу схемы: идентификатор файла} для проверки
+        структуры на стадии read. Если None, файлы не проверяются.
+        :param quarantine_path: Путь к директории карантина для некорректных файлов.
+        :param transport: Пул процессов для декодирования выбранных полей с передачей данных
+        через разделяемую память. Если None, выбранные поля декодируются в потоках.
+        """
+        self.session = session
+        self.binaries_path = binaries_path
+        self.output_path = output_path
+        self.output_format = output_format
+        self.remove_binaries = remove_binaries
+        self.identifiers = identifiers
+        self.quarantine_path = quarantine_path
+        self.transport = transport
+        self.archive_writer = None
+        self.work_path = output_path
+        if scratch_path != "":
+            self.archive_writer = ArchiveWriter(output_path)
+            self.work_path = os.path.join(scratch_path, "output")
+        self.lock = threading.Lock()
+        self.invalid_count = 0
+
+    def get_stages(self, stage_workers: dict[str, int] | None = None) -> list[PipelineStage]:
+        """
+        Получение списка стадий с числом потоков. По умолчанию на стадии decode столько же
+        потоков, сколько в пуле сессии, на стадии encode - по числу процессоров, а запись в
+        архив выполняется одним потоком.
+        :param stage_workers: Словарь {имя стадии: число потоков}.
+        :return: Список стадий.
+        """
+        workers = {STAGE_READ: 2, STAGE_DECODE: self.session.max_workers,
+                   STAGE_ENCODE: os.cpu_count() or 1, STAGE_WRITE: 2}
+        if self.transport is not None:
+            workers[STAGE_DECODE] = self.transport.max_workers * 2
+            workers[STAGE_ENCODE] = 1
+        workers.update(stage_workers or {})
+        if self.archive_writer is not None:
+            workers[STAGE_WRITE] = 1
+        funcs = {STAGE_READ: self.read, STAGE_DECODE: self.decode, STAGE_ENCODE: self.encode,
+                 STAGE_WRITE: self.write}
+        return [PipelineStage(name, funcs[name], workers[name]) for name in STAGE_NAMES]
+
+    def get_job_output_path(self, job: BinaryJob) -> str:
+        """
+        Получение пути к директории вывода для бинарного файла с сохранением структуры
+        поддиректорий относительно корневой директории бинарных файлов.
+        :param job: Бинарный файл.
+        :return: Путь к директории вывода.
+        """
+        return os.path.join(self.work_path, os.path.dirname(os.path.relpath(job.binary_path,
+                                                                            self.binaries_path)))
+
+    def read(self, job: BinaryJob) -> BinaryJob:
+        """
+        Стадия read.
+        :param job: Бинарный файл.
+        :return: Бинарный файл с содержимым или статусом invalid.
+        """
+        if self.identifiers is not None:
+            reason = verify_binary(job.binary_path, self.identifiers.get(job.schema_path, ""))
+            if reason != "":
+                logging.warning(get_message("main.binary_invalid"), job.binary_path,
+                                get_message(reason))
+                with self.lock:
+                    self.invalid_count += 1
+                if self.quarantine_path != "":
+                    quarantine_binaries([job.binary_path], self.binaries_path,
+                                        self.quarantine_path)
+                return job._replace(status=STATUS_INVALID)
+        if len(self.session.field_paths) == 0:
+            return job
+        if self.transport is not None:
+            data = self.transport.read_input(job.binary_path)
+            return job._replace(data=data, slot=data.slot if isinstance(data, ShmHandle) else -1)
+        with open(job.binary_path, "rb") as file:
+            return job._replace(data=file.read())
+
+    def decode(self, job: BinaryJob) -> BinaryJob:
+        """
+        Стадия decode.
+        :param job: Бинарный файл.
+        :return: Бинарный файл с путём к JSON-файлу компилятора схемы или декодированным значением.
+        """
+        if job.status != "":
+            return job
+        try:
+            if len(self.session.field_paths) == 0:
+                status, json_path = self.session.deserialize_one(
+                    job.binary_path, self.get_job_output_path(job), job.schema_path)
+                return job._replace(status=status, output_path=json_path)
+            if self.transport is not None:
+                return self.decode_shared(job)
+            try:
+                value = decode_buffer(job.schema_path, job.data, False, self.session.field_paths)
+            except (struct.error, IndexError, KeyError, ValueError) as exc:
+                logging.warning(get_message("flatc_funcs.json_error"), job.binary_path)
+                logging.warning("%s", exc)
+                return job._replace(status=STATUS_ERROR, data=None)
+            return job._replace(status=STATUS_DONE, data=None, value=value)
+        finally:
+            if self.remove_binaries and os.path.isfile(job.binary_path):
+                os.remove(job.binary_path)
+
+    def decode_shared(self, job: BinaryJob) -> BinaryJob:
+        """
+        Декодирование и кодирование бинарного файла в пуле процессов. При любой ошибке ячейка
+        входного буфера освобождается сразу, иначе - на стадии write. Ошибки декодирования,
+        кодирования и аварийное завершение процесса пула дают статус error для файла.
+        :param job: Бинарный файл с дескриптором входного буфера.
+        :return: Бинарный файл с дескриптором результата.
+        """
+        data = None
+        try:
+            data = self.transport.decode(job.data, job.schema_path, self.session.field_paths,
+                                         self.output_format)
+        except (struct.error, IndexError, KeyError, ValueError, TypeError, OverflowError,
+                BrokenProcessPool) as exc:
+            logging.warning(get_message("flatc_funcs.json_error"), job.binary_path)
+            logging.warning("%s", exc)
+        finally:
+            if data is None:
+                self.transport.release(job.slot)
+        if data is None:
+            return job._replace(status=STATUS_ERROR, data=None)
+        return job._replace(status=STATUS_DONE, data=data)
+
+    def encode(self, job: BinaryJob) -> BinaryJob:
+        """
+        Стадия encode. JSON-файл компилятора схемы перекодируется, только если формат вывода не
+        JSON.
+        :param job: Бинарный файл.
+        :return: Бинарный файл с содержимым файла вывода или статусом error.
+        """
+        if job.status != STATUS_DONE:
+            return job
+        try:
+            if job.value is not None:
+                return job._replace(data=encode_value(job.value, self.output_format,
+                                                      get_schema_layout(job.schema_path)),
+                                    value=None)
+            if self.transport is not None or self.output_format == OUTPUT_FORMAT_JSON:
+                return job
+            try:
+                with open(job.output_path, "rb") as json_file:
+                    data = encode_value(json.loads(json_file.read()), self.output_format,
+                                        get_schema_layout(job.schema_path))
+            finally:
+                os.remove(job.output_path)
+        except (OSError, ValueError, TypeError, OverflowError) as exc:
+            logging.warning(get_message("flatc_funcs.json_error"), job.binary_path)
+            logging.warning("%s", exc)
+            return job._replace(status=STATUS_ERROR, output_path="", value=None)
+        return job._replace(data=data)
+
+    def write(self, job: BinaryJob) -> tuple[str, str, str, str]:
+        """
+        Стадия write.
+        :param job: Бинарный файл.
+        :return: Кортеж (путь к бинарному файлу, путь к файлу схемы, путь к файлу вывода или
+        пустая строка при ошибке, статус).
+        """
+        if job.status != STATUS_DONE:
+            return job.binary_path, job.schema_path, "", job.status
+        try:
+            return job.binary_path, job.schema_path, self.write_output(job), STATUS_DONE
+        except OSError as exc:
+            logging.warning(get_message("flatc_funcs.json_error"), job.binary_path)
+            logging.warning("%s", exc)
+            return job.binary_path, job.schema_path, "", STATUS_ERROR
+
+    def write_output(self, job: BinaryJob) -> str:
+        """
+        Запись файла вывода бинарного файла в директорию или архив.
+        :param job: Бинарный файл со статусом done.
+        :return: Путь к файлу вывода.
+        """
+        output_file_path = job.output_path
+        if job.data is not None:
+            if output_file_path == "":
+                output_file_path = os.path.join(self.get_job_output_path(job), os.path.splitext(
+                    os.path.basename(job.binary_path))[0])
+            output_file_path = get_output_path(output_file_path, self.output_format)
+            if self.transport is None:
+                os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+                with open(output_file_path, "wb") as output_file:
+                    output_file.write(job.data)
+            else:
+                try:
+                    with self.transport.open_result(job.data) as data:
+                        os.makedirs(os.path.dirname(output_file_path), exist_ok=True)
+                        with open(output_file_path, "wb") as output_file:
+                            output_file.write(data)
+                finally:
+                    self.transport.release(job.slot)
+            if job.output_path == "":
+                file_logger.info(get_message("flatc_funcs.json_ok"), job.binary_path,
+                                 output_file_path)
+        if self.archive_writer is not None:
+            member_path = os.path.relpath(output_file_path, self.work_path)
+            with self.lock:
+                self.archive_writer.add(output_file_path, member_path)
+            os.remove(output_file_path)
+            output_file_path = os.path.join(self.output_path, member_path)
+        return output_file_path
+
+    def close(self):
+        """
+        Завершение записи архива вывода.
+        """
+        if self.archive_writer is not None:
+            self.archive_writer.close()
@@ -0,0 +1,138 @@
+"""
+    Модуль, включающий в себя функции для профилирования запусков десериализации: статистику
+    cProfile, пиковое потребление памяти (tracemalloc) и время дочерних процессов flatc.
+"""
+# pylint: disable=too-many-locals
+import cProfile
+import io
+import pstats
+import sys
+import threading
+import time
+import tracemalloc
+from logging import info
+
+from i18n import t
+
+try:
+    import resource
+except ImportError:  # Windows.
+    resource = None
+
+TOP_COUNT = 25
+TRACEBACK_LIMIT = 10
+# Начиная с Python 3.12, cProfile использует sys.monitoring, общий для всех потоков: второй
+# профилировщик не включается (ValueError), а первый уже видит вызовы во всех потоках.
+THREAD_PROFILERS = sys.version_info < (3, 12)
+
+
+def get_children_usage():
+    """
+    Получение использования ресурсов завершёнными дочерними процессами.
+    :return: Объект resource.struct_rusage или None, если модуль resource недоступен.
+    """
+    return None if resource is None else resource.getrusage(resource.RUSAGE_CHILDREN)
+
+
+def get_thread_profiler_starter(profilers: list[cProfile.Profile]):
+    """
+    Получение функции для threading.setprofile, которая при первом событии в новом потоке
+    (например, потоке ThreadPoolExecutor) включает для него отдельный профилировщик (только до
+    Python 3.12, см. THREAD_PROFILERS).
+    :param profilers: Список, в который добавляются профилировщики потоков.
+    :return: Функция профилирования.
+    """
+
+    def start_thread_profiler(*_):
+        profiler = cProfile.Profile()
+        profilers.append(profiler)
+        profiler.enable()
+
+    return start_thread_profiler
+
+
+def format_report(wall_time: float, cpu_time: float, flatc_times: list[float], usage_before,
+                  usage_after, peak_memory: int, snapshot: tracemalloc.Snapshot,
+                  stats: pstats.Stats) -> str:
+    """
+    Формирование текстового отчёта профилирования.
+    :param wall_time: Общее время выполнения в секундах.
+    :param cpu_time: Процессорное время текущего процесса в секундах.
+    :param flatc_times: Список времени вызовов компилятора схемы в секундах.
+    :param usage_before: Использование ресурсов дочерними процессами до запуска.
+    :param usage_after: Использование ресурсов дочерними процессами после запуска.
+    :param peak_memory: Пиковый объём памяти, выделенной Python, в байтах.
+    :param snapshot: Снимок выделений памяти tracemalloc.
+    :param stats: Статистика cProfile.
+    :return: Текст отчёта.
+    """
+    lines = [t("profile_funcs.wall_time") % f"{wall_time:.3f}",
+             t("profile_funcs.cpu_time") % f"{cpu_time:.3f}",
+             t("profile_funcs.flatc_calls") % (len(flatc_times), f"{sum(flatc_times):.3f}",
+                                               f"{max(flatc_times, default=0):.3f}")]
+    if usage_before is None or usage_after is None:
+        lines.append(t("profile_funcs.children_usage_unavailable"))
+    else:
+        max_rss = usage_after.ru_maxrss * (1 if sys.platform == "darwin" else 1024)
+        lines.append(t("profile_funcs.children_cpu_time") % (
+            f"{usage_after.ru_utime - usage_before.ru_utime:.3f}",
+            f"{usage_after.ru_stime - usage_before.ru_stime:.3f}"))
+        lines.append(t("profile_funcs.children_max_rss") % f"{max_rss / 1048576:.1f}")
+    lines.append(t("profile_funcs.peak_memory") % f"{peak_memory / 1048576:.1f}")
+    lines += ["", t("profile_funcs.top_allocations")]
+    for statistic in snapshot.statistics("lineno")[:TOP_COUNT]:
+        lines.append(str(statistic))
+    for sort_key, title_key in (("cumulative", "profile_funcs.hot_spots_cumulative"),
+                                ("tottime", "profile_funcs.hot_spots_internal")):
+        stream = io.StringIO()
+        stats.stream = stream
+        stats.sort_stats(sort_key).print_stats(TOP_COUNT)
+        lines += ["", t(title_key), stream.getvalue().strip("\n")]
+    return "\n".join(lines) + "\n"
+
+
+def run_profiled(report_path: str, flatc_times: list[float], func, *args, **kwargs):
+    """
+    Запуск функции с профилированием и записью отчёта. Если путь к отчёту пустой, функция
+    вызывается напрямую, без каких-либо накладных расходов.
+    :param report_path: Путь к файлу отчёта.
+    :param flatc_times: Список, в который функция добавляет время каждого запуска компилятора
+    схемы (через FlatcLimits.on_run, см. general_funcs.get_deserialize_options).
+    :param func: Запускаемая функция.
+    :param args: Позиционные аргументы функции.
+    :param kwargs: Именованные аргументы функции.
+    :return: Результат функции.
+    """
+    if report_path == "":
+        return func(*args, **kwargs)
+    thread_profilers = []
+    tracemalloc.start(TRACEBACK_LIMIT)
+    usage_before = get_children_usage()
+    profiler = cProfile.Profile()
+    if THREAD_PROFILERS:
+        threading.setprofile(get_thread_profiler_starter(thread_profilers))
+    start_cpu_time = time.process_time()
+    start_time = time.perf_counter()
+    profiler.enable()
+    try:
+        return func(*args, **kwargs)
+    finally:
+        profiler.disable()
+        wall_time = time.perf_counter() - start_time
+        cpu_time = time.process_time() - start_cpu_time
+        if THREAD_PROFILERS:
+            threading.setprofile(None)
+        usage_after = get_children_usage()
+        snapshot = tracemalloc.take_snapshot().filter_traces([
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            tracemalloc.Filter(False, tracemalloc.__file__)])
+        peak_memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        stats = pstats.Stats(profiler)
+        for thread_profiler in thread_profilers:
+            stats.add(thread_profiler)
+        with open(report_path, "w", encoding="utf-8") as file:
+            file.write(format_report(wall_time, cpu_time, flatc_times, usage_before, usage_after,
+                                     peak_memory, snapshot, stats))
+        info(t("profile_funcs.report_written"), report_path)
@@ -0,0 +1,47 @@
+"""
+    Локальный заменитель S3-совместимого хранилища объектов, раздающий файлы выбранной директории,
+    для проверки и замеров удалённых источников бинарных файлов без доступа к сети.
+"""
+# pylint: disable=import-error, wrong-import-position
+import os
+import sys
+import argparse
+from i18n import t
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "."))
+
+from log_funcs import LOG_MODE_TEXT, LOG_MODES
+from general_funcs import init_app, init_logging
+from s3_stub_funcs import execute_s3_stub, StubOptions, STUB_BUCKET, STUB_HOST, STUB_PORT, \
+    STUB_DELAY, STUB_PAGE_SIZE
+
+
+def main() -> int | str:
+    """
+    Запуск скрипта.
+    :return: Код ошибки или строка об ошибке.
+    """
+    init_app(os.path.join("images", "flatbuffers-batch-logo-clean.png"))
+    parser = argparse.ArgumentParser(prog=t("main.flatc_s3_stub_name"),
+                                     description=t("main.flatc_s3_stub_desc"))
+    parser.add_argument("-b", "--binaries_path", type=str, default="",
+                        help=t("main.stub_directory_arg"))
+    parser.add_argument("--self_check", action="store_true", help=t("main.self_check_arg"))
+    parser.add_argument("--bucket", type=str, default=STUB_BUCKET, help=t("main.bucket_arg"))
+    parser.add_argument("--host", type=str, default=STUB_HOST, help=t("main.host_arg"))
+    parser.add_argument("-p", "--port", type=int, default=STUB_PORT, help=t("main.port_arg"))
+    parser.add_argument("--delay", type=float, default=STUB_DELAY * 1000,
+                        help=t("main.delay_arg"))
+    parser.add_argument("--page_size", type=int, default=STUB_PAGE_SIZE,
+                        help=t("main.page_size_arg"))
+    parser.add_argument("--log_mode", type=str, default=LOG_MODE_TEXT, choices=LOG_MODES,
+                        help=t("main.log_mode_arg"))
+    args = parser.parse_args()
+    init_logging(args.log_mode)
+    return execute_s3_stub(args.binaries_path, StubOptions(args.bucket, args.host, args.port,
+                                                           args.delay / 1000, args.page_size),
+                           args.self_check)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
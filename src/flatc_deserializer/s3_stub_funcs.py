@@ -0,0 +1,303 @@
+"""
+    Модуль, включающий в себя локальный заменитель S3-совместимого хранилища объектов для проверки
+    и замеров источника HttpSource (см. source_funcs) без доступа к сети: объекты - файлы
+    директории, запросы ListObjectsV2 (с постраничной выдачей) и GET (с заголовком Range)
+    обслуживаются с искусственной задержкой, имитирующей сетевую. Подписи запросов не
+    проверяются, а только подсчитываются вместе с соединениями и запросами (GET /stats).
+"""
+import errno
+import json
+import os
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from logging import info, warning
+from shutil import rmtree
+from typing import NamedTuple
+from urllib.parse import urlsplit, parse_qs, unquote
+from xml.sax.saxutils import escape
+
+from archive_funcs import make_scratch_path
+from general_funcs import get_directory_path
+from log_funcs import get_message
+from source_funcs import HttpSource
+
+STUB_HOST = "127.0.0.1"
+STUB_PORT = 9000
+STUB_BUCKET = "binaries"
+STUB_DELAY = 0.02
+STUB_PAGE_SIZE = 1000
+LISTEN_BACKLOG = 128
+LISTING_NAMESPACE = "http://s3.amazonaws.com/doc/2006-03-01/"
+CHECK_RANGE_SIZE = 65536
+
+
+class StubOptions(NamedTuple):
+    """
+    Параметры заменителя хранилища, задаваемые аргументами командной строки.
+    """
+    bucket: str = STUB_BUCKET  # Имя bucket.
+    host: str = STUB_HOST  # Адрес для TCP-подключений.
+    port: int = STUB_PORT  # Порт для TCP-подключений (0 - любой свободный).
+    delay: float = STUB_DELAY  # Задержка перед ответом на каждый запрос в секундах.
+    page_size: int = STUB_PAGE_SIZE  # Число объектов на странице списка.
+
+
+class S3StubRequestHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик запросов заменителя хранилища (keep-alive соединения HTTP/1.1).
+    """
+    protocol_version = "HTTP/1.1"
+    server: "S3StubServer"
+
+    def setup(self):
+        super().setup()
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self.server.count("connections")
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def send_body(self, status: int, body: bytes, headers: dict[str, str] | None = None):
+        """
+        Отправка ответа.
+        :param status: Код ответа.
+        :param body: Тело ответа.
+        :param headers: Дополнительные заголовки.
+        """
+        self.send_response(status)
+        for name, value in ({} if headers is None else headers).items():
+            self.send_header(name, value)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Обработка GET-запроса: /stats, /<bucket>?list-type=2 или /<bucket>/<ключ>.
+        """
+        time.sleep(self.server.delay)
+        self.server.count("requests")
+        if "Authorization" in self.headers:
+            self.server.count("signed_requests")
+        url_parts = urlsplit(self.path)
+        path = unquote(url_parts.path)
+        if path == "/stats":
+            self.send_body(200, json.dumps(self.server.get_stats()).encode("utf-8"),
+                           {"Content-Type": "application/json"})
+            return
+        bucket, _, key = path.lstrip("/").partition("/")
+        if bucket != self.server.bucket:
+            self.send_body(404, b"NoSuchBucket")
+        elif key == "":
+            query = {name: values[0] for name, values in
+                     parse_qs(url_parts.query, keep_blank_values=True).items()}
+            self.send_body(200, self.server.get_listing(query.get("prefix", ""), int(
+                query.get("continuation-token", "") or 0)), {"Content-Type": "application/xml"})
+        else:
+            self.send_object(key)
+
+    def send_object(self, key: str):
+        """
+        Отправка объекта целиком или диапазона, заданного заголовком Range (bytes=начало-конец,
+        bytes=начало- или bytes=-длина). Некорректный заголовок Range и диапазон пустого объекта
+        игнорируются, на диапазон за концом объекта отправляется ответ 416.
+        :param key: Ключ объекта.
+        """
+        object_path = os.path.join(self.server.root_path, *key.split("/"))
+        if ".." in key.split("/") or not os.path.isfile(object_path):
+            self.send_body(404, b"NoSuchKey")
+            return
+        with open(object_path, "rb") as file:
+            data = file.read()
+        byte_range = self.headers.get("Range", "")
+        if not byte_range.startswith("bytes=") or len(data) == 0:
+            self.send_body(200, data)
+            return
+        self.server.count("range_requests")
+        first, _, last = byte_range[len("bytes="):].partition("-")
+        try:
+            if first == "":
+                start, end = max(len(data) - int(last), 0), len(data) - 1
+            else:
+                start = int(first)
+                end = min(int(last) if last != "" else len(data) - 1, len(data) - 1)
+        except ValueError:
+            self.send_body(200, data)
+            return
+        if start > end:
+            self.send_body(416, b"InvalidRange", {"Content-Range": f"bytes */{len(data)}"})
+            return
+        self.send_body(206, data[start:end + 1],
+                       {"Content-Range": f"bytes {start}-{end}/{len(data)}"})
+
+
+class S3StubServer(ThreadingHTTPServer):
+    """
+    Многопоточный HTTP-сервер заменителя хранилища с одним bucket.
+    """
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+    def __init__(self, address, root_path: str, bucket: str = STUB_BUCKET,
+                 delay: float = STUB_DELAY, page_size: int = STUB_PAGE_SIZE):
+        """
+        Создание сервера.
+        :param address: Кортеж (адрес, порт).
+        :param root_path: Путь к директории с объектами.
+        :param bucket: Имя bucket.
+        :param delay: Задержка перед ответом на каждый запрос в секундах.
+        :param page_size: Число объектов на странице списка.
+        """
+        self.root_path = os.path.abspath(root_path)
+        self.bucket = bucket
+        self.delay = delay
+        self.page_size = page_size
+        self.stats = {"connections": 0, "requests": 0, "range_requests": 0, "signed_requests": 0}
+        self.lock = threading.Lock()
+        super().__init__(address, S3StubRequestHandler)
+
+    def count(self, name: str):
+        """
+        Увеличение счётчика.
+        :param name: Имя счётчика.
+        """
+        with self.lock:
+            self.stats[name] += 1
+
+    def get_stats(self) -> dict[str, int]:
+        """
+        Получение счётчиков соединений и запросов.
+        :return: Словарь счётчиков.
+        """
+        with self.lock:
+            return dict(self.stats)
+
+    def get_listing(self, prefix: str, start: int) -> bytes:
+        """
+        Получение страницы списка объектов в формате ответа ListObjectsV2.
+        :param prefix: Префикс ключей.
+        :param start: Номер первого объекта страницы (маркер продолжения).
+        :return: XML-документ.
+        """
+        keys = sorted(os.path.relpath(os.path.join(directory, file_name), self.root_path)
+                      .replace(os.sep, "/") for directory, _, file_names in
+                      os.walk(self.root_path) for file_name in file_names)
+        keys = [key for key in keys if key.startswith(prefix)]
+        listing = [f"<?xml version=\"1.0\" encoding=\"UTF-8\"?>"
+                   f"<ListBucketResult xmlns=\"{LISTING_NAMESPACE}\">"
+                   f"<Name>{escape(self.bucket)}</Name><Prefix>{escape(prefix)}</Prefix>"]
+        for key in keys[start:start + self.page_size]:
+            size = os.path.getsize(os.path.join(self.root_path, *key.split("/")))
+            listing.append(f"<Contents><Key>{escape(key)}</Key><Size>{size}</Size></Contents>")
+        if start + self.page_size < len(keys):
+            listing.append(f"<IsTruncated>true</IsTruncated>"
+                           f"<NextContinuationToken>{start + self.page_size}"
+                           f"</NextContinuationToken>")
+        else:
+            listing.append("<IsTruncated>false</IsTruncated>")
+        listing.append("</ListBucketResult>")
+        return "".join(listing).encode("utf-8")
+
+    def get_url(self) -> str:
+        """
+        Получение URL bucket для источника HttpSource.
+        :return: URL вида http://хост:порт/bucket.
+        """
+        return f"http://{self.server_address[0]}:{self.server_address[1]}/{self.bucket}"
+
+
+def start_stub(root_path: str, options: StubOptions | None = None) -> S3StubServer:
+    """
+    Запуск заменителя хранилища в фоновом потоке (для замеров из скриптов).
+    :param root_path: Путь к директории с объектами.
+    :param options: Параметры заменителя хранилища (по умолчанию - любой свободный порт).
+    :return: Запущенный сервер (остановка - shutdown и server_close).
+    """
+    if options is None:
+        options = StubOptions(port=0)
+    server = S3StubServer((options.host, options.port), root_path, options.bucket, options.delay,
+                          options.page_size)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def serve_stub(root_path: str, options: StubOptions | None = None):
+    """
+    Запуск заменителя хранилища до прерывания (Ctrl+C).
+    :param root_path: Путь к директории с объектами.
+    :param options: Параметры заменителя хранилища.
+    """
+    if options is None:
+        options = StubOptions()
+    with S3StubServer((options.host, options.port), root_path, options.bucket, options.delay,
+                      options.page_size) as server:
+        info(get_message("s3_stub_funcs.listening"), server.get_url(), server.root_path)
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        stats = server.get_stats()
+    info(get_message("s3_stub_funcs.stopped"), stats["connections"], stats["requests"],
+         stats["range_requests"])
+
+
+def check_stub(root_path: str, options: StubOptions | None = None) -> tuple[int, int]:
+    """
+    Проверка источника HttpSource на заменителе хранилища, запущенном на любом свободном порту:
+    все файлы директории загружаются через источник (с заранее загружаемыми объектами и чтением
+    диапазонами по CHECK_RANGE_SIZE байт) и сравниваются с файлами на диске.
+    :param root_path: Путь к директории с объектами.
+    :param options: Параметры заменителя хранилища (порт не используется).
+    :return: Кортеж из двух элементов: (число файлов, число файлов, которые не удалось загрузить
+    или которые отличаются от файлов на диске).
+    """
+    server = start_stub(root_path, (StubOptions() if options is None else options)._replace(
+        port=0))
+    expected_paths = {os.path.relpath(os.path.join(directory, file_name), root_path)
+                      for directory, _, file_names in os.walk(root_path)
+                      for file_name in file_names}
+    matched_paths = set()
+    scratch_path = make_scratch_path()
+    try:
+        with HttpSource(server.get_url(), range_size=CHECK_RANGE_SIZE) as source:
+            for scratch_file_path in source.extract_members(
+                    scratch_path, lambda _: True, lambda member_path, exc: warning(
+                        get_message("main.binary_read_failed"), source.get_location(member_path),
+                        exc)):
+                member_path = os.path.relpath(scratch_file_path, scratch_path)
+                with open(scratch_file_path, "rb") as file, \
+                        open(os.path.join(root_path, member_path), "rb") as expected_file:
+                    if file.read() == expected_file.read():
+                        matched_paths.add(member_path)
+                    else:
+                        warning(get_message("s3_stub_funcs.check_mismatch"),
+                                source.get_location(member_path))
+                os.remove(scratch_file_path)
+    finally:
+        server.shutdown()
+        server.server_close()
+        rmtree(scratch_path, ignore_errors=True)
+    stats = server.get_stats()
+    info(get_message("s3_stub_funcs.check_summary"), len(expected_paths), len(matched_paths),
+         len(expected_paths - matched_paths), stats["connections"], stats["requests"],
+         stats["range_requests"])
+    return len(expected_paths), len(expected_paths - matched_paths)
+
+
+def execute_s3_stub(binaries_path: str, options: StubOptions | None = None,
+                    self_check: bool = False) -> (int | str):
+    """
+    Запуск локального заменителя S3-совместимого хранилища, раздающего файлы директории, до
+    прерывания или проверка на нём источника HttpSource (см. check_stub).
+    :param binaries_path: Путь к директории с бинарными файлами.
+    :param options: Параметры заменителя хранилища.
+    :param self_check: Если True, выполняется проверка источника вместо запуска.
+    :return: Код ошибки или строка об ошибке.
+    """
+    binaries_path = get_directory_path(binaries_path, "main.tkinter_binary_directory_select")
+    if self_check:
+        return os.EX_OK if check_stub(binaries_path, options)[1] == 0 else errno.EIO
+    serve_stub(binaries_path, options)
+    return os.EX_OK
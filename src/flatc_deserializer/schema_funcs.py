@@ -0,0 +1,420 @@
+"""
+    Модуль, включающий в себя функции для чтения файлов схем Flatbuffers без вызова компилятора.
+"""
+# pylint: disable=too-many-branches, too-many-statements, too-many-locals
+import os
+import re
+import errno
+import threading
+from collections.abc import Callable
+
+from i18n import t
+
+COMMENT_PATTERN = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+FILE_IDENTIFIER_PATTERN = re.compile(r"\bfile_identifier\s+\"([^\"]*)\"\s*;")
+FILE_EXTENSION_PATTERN = re.compile(r"\bfile_extension\s+\"([^\"]*)\"\s*;")
+TOKEN_PATTERN = re.compile(r"\"(?:[^\"\\]|\\.)*\"|[-+]?[\w.](?:[\w.]|(?<=[eE])[-+])*|\S")
+SCALAR_FORMATS = {"bool": "?", "byte": "b", "ubyte": "B", "short": "h", "ushort": "H", "int": "i",
+                  "uint": "I", "long": "q", "ulong": "Q", "float": "f", "double": "d",
+                  "int8": "b", "uint8": "B", "int16": "h", "uint16": "H", "int32": "i",
+                  "uint32": "I", "int64": "q", "uint64": "Q", "float32": "f", "float64": "d"}
+SCALAR_SIZES = {"?": 1, "b": 1, "B": 1, "h": 2, "H": 2, "i": 4, "I": 4, "q": 8, "Q": 8, "f": 4,
+                "d": 8}
+SCHEMA_CACHE = {}
+SCHEMA_CACHE_LOCK = threading.Lock()
+
+
+def read_schema_text(schema_path: str) -> str:
+    """
+    Чтение текста файла схемы без комментариев.
+    :param schema_path: Путь к файлу схемы.
+    :return: Текст схемы без комментариев.
+    """
+    with open(schema_path, "r", encoding="utf-8", errors="replace") as file:
+        return COMMENT_PATTERN.sub(" ", file.read())
+
+
+def read_schema_string(schema_path: str, pattern: re.Pattern) -> str:
+    """
+    Чтение строкового значения объявления схемы (file_identifier или file_extension).
+    :param schema_path: Путь к файлу схемы.
+    :param pattern: Регулярное выражение объявления.
+    :return: Значение или пустая строка, если оно не объявлено.
+    """
+    match = pattern.search(read_schema_text(schema_path))
+    return match.group(1) if match is not None else ""
+
+
+def get_schema_file_identifier(schema_path: str) -> str:
+    """
+    Получение идентификатора файла (file_identifier), объявленного в схеме. Результат кэшируется
+    до изменения файла.
+    :param schema_path: Путь к файлу схемы.
+    :return: Идентификатор файла или пустая строка, если он не объявлен.
+    """
+    return get_cached_value((schema_path, "file_identifier"), lambda _: read_schema_string(
+        schema_path, FILE_IDENTIFIER_PATTERN))
+
+
+def get_schema_file_extension(schema_path: str) -> str:
+    """
+    Получение расширения бинарных файлов (file_extension), объявленного в схеме. Результат
+    кэшируется до изменения файла.
+    :param schema_path: Путь к файлу схемы.
+    :return: Расширение файла без точки или пустая строка, если оно не объявлено.
+    """
+    return get_cached_value((schema_path, "file_extension"), lambda _: read_schema_string(
+        schema_path, FILE_EXTENSION_PATTERN))
+
+
+def tokenize_schema(schema_text: str) -> list[str]:
+    """
+    Разбиение текста схемы на лексемы.
+    :param schema_text: Текст схемы без комментариев.
+    :return: Список лексем.
+    """
+    return TOKEN_PATTERN.findall(schema_text)
+
+
+def parse_attributes(tokens: list[str], i: int) -> tuple[dict, int]:
+    """
+    Разбор списка атрибутов вида (name, name: value), если он начинается с текущей лексемы.
+    :param tokens: Список лексем.
+    :param i: Индекс текущей лексемы.
+    :return: Кортеж из двух элементов: (словарь атрибутов, индекс лексемы после атрибутов).
+    """
+    attributes = {}
+    if i >= len(tokens) or tokens[i] != "(":
+        return attributes, i
+    i += 1
+    while tokens[i] != ")":
+        name = tokens[i].strip("\"")
+        i += 1
+        value = None
+        if tokens[i] == ":":
+            value = tokens[i + 1].strip("\"")
+            i += 2
+        attributes[name] = value
+        if tokens[i] == ",":
+            i += 1
+    return attributes, i + 1
+
+
+def parse_type_name(tokens: list[str], i: int) -> tuple[tuple, int]:
+    """
+    Разбор имени типа поля: скаляр, строка, вектор [type] или массив фиксированной длины [type:N].
+    :param tokens: Список лексем.
+    :param i: Индекс текущей лексемы.
+    :return: Кортеж из двух элементов: (описание типа в виде ("vector", тип), ("array", тип, N) или
+    имени типа, индекс лексемы после типа).
+    """
+    if tokens[i] != "[":
+        return tokens[i], i + 1
+    element_type, i = parse_type_name(tokens, i + 1)
+    if tokens[i] == ":":
+        length = int(tokens[i + 1], 0)
+        return ("array", element_type, length), i + 3
+    return ("vector", element_type), i + 1
+
+
+def parse_number(value: str) -> int | float:
+    """
+    Разбор числового литерала схемы.
+    :param value: Строка литерала.
+    :return: Число.
+    """
+    if value in ("true", "false"):
+        return int(value == "true")
+    try:
+        return int(value, 0)
+    except ValueError:
+        return float(value)
+
+
+def parse_schema_file(schema_path: str, declarations: list, schema: dict, parsed_paths: set,
+                      is_root: bool):
+    """
+    Разбор одного файла схемы (включая файлы из include) и добавление его объявлений в список.
+    :param schema_path: Путь к файлу схемы.
+    :param declarations: Список объявлений (вид, пространство имён, имя, атрибуты, содержимое).
+    :param schema: Словарь схемы для записи root_type_name, file_identifier и file_extension.
+    :param parsed_paths: Множество уже разобранных файлов схем.
+    :param is_root: Является ли файл основным (а не подключённым через include).
+    """
+    schema_path = os.path.abspath(schema_path)
+    if schema_path in parsed_paths:
+        return
+    parsed_paths.add(schema_path)
+    tokens = tokenize_schema(read_schema_text(schema_path))
+    namespace = ""
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in ("include", "native_include"):
+            include_path = os.path.join(os.path.dirname(schema_path), tokens[i + 1].strip("\""))
+            if token == "include":
+                if not os.path.isfile(include_path):
+                    raise FileNotFoundError(errno.ENOENT, t("main.file_not_found") % include_path)
+                parse_schema_file(include_path, declarations, schema, parsed_paths, False)
+            i += 3
+        elif token == "namespace":
+            namespace = tokens[i + 1]
+            i += 3
+        elif token == "root_type":
+            if is_root:
+                schema["root_type_name"] = (namespace, tokens[i + 1])
+            i += 3
+        elif token in ("file_identifier", "file_extension"):
+            if is_root:
+                schema[token] = tokens[i + 1].strip("\"")
+            i += 3
+        elif token == "attribute":
+            i += 3
+        elif token in ("table", "struct"):
+            name = tokens[i + 1]
+            attributes, i = parse_attributes(tokens, i + 2)
+            fields = []
+            i += 1
+            while tokens[i] != "}":
+                field_name = tokens[i]
+                field_type, i = parse_type_name(tokens, i + 2)
+                default = None
+                if tokens[i] == "=":
+                    default = tokens[i + 1]
+                    i += 2
+                field_attributes, i = parse_attributes(tokens, i)
+                fields.append((field_name, field_type, default, field_attributes))
+                i += 1
+            declarations.append((token, namespace, name, attributes, fields))
+            i += 1
+        elif token in ("enum", "union"):
+            name = tokens[i + 1]
+            i += 2
+            base_type = "ubyte"
+            if tokens[i] == ":":
+                base_type = tokens[i + 1]
+                i += 2
+            attributes, i = parse_attributes(tokens, i)
+            attributes["base_type"] = base_type
+            values = []
+            value = 1 if token == "union" else 0
+            i += 1
+            while tokens[i] != "}":
+                value_name = tokens[i]
+                value_type = value_name
+                i += 1
+                if token == "union" and tokens[i] == ":":
+                    value_type = tokens[i + 1]
+                    i += 2
+                if tokens[i] == "=":
+                    value = parse_number(tokens[i + 1])
+                    i += 2
+                _, i = parse_attributes(tokens, i)
+                values.append((value_name, value, value_type))
+                value += 1
+                if tokens[i] == ",":
+                    i += 1
+            declarations.append((token, namespace, name, attributes, values))
+            i += 1
+        elif token == "rpc_service":
+            while tokens[i] != "}":
+                i += 1
+            i += 1
+        else:
+            i += 1
+
+
+def resolve_type_name(types: dict, namespace: str, name: str) -> str:
+    """
+    Получение полного имени типа по его имени, указанному в пространстве имён объявления.
+    :param types: Словарь типов схемы по полным именам.
+    :param namespace: Пространство имён объявления.
+    :param name: Имя типа (возможно, частично или полностью квалифицированное).
+    :return: Полное имя типа.
+    """
+    parts = namespace.split(".") if namespace != "" else []
+    for j in range(len(parts), -1, -1):
+        full_name = ".".join(parts[:j] + [name])
+        if full_name in types:
+            return full_name
+    raise ValueError(t("schema_funcs.unknown_type") % name)
+
+
+def resolve_field_type(types: dict, namespace: str, field_type: str | tuple) -> dict:
+    """
+    Получение описания типа поля.
+    :param types: Словарь типов схемы по полным именам.
+    :param namespace: Пространство имён объявления.
+    :param field_type: Имя типа или кортеж ("vector", тип) / ("array", тип, N).
+    :return: Словарь описания типа с ключом kind (scalar, string, vector, array, enum, struct,
+    table, union).
+    """
+    if isinstance(field_type, tuple):
+        element_type = resolve_field_type(types, namespace, field_type[1])
+        if field_type[0] == "array":
+            return {"kind": "array", "element": element_type, "length": field_type[2]}
+        return {"kind": "vector", "element": element_type}
+    if field_type in SCALAR_FORMATS:
+        return {"kind": "scalar", "format": SCALAR_FORMATS[field_type]}
+    if field_type == "string":
+        return {"kind": "string"}
+    full_name = resolve_type_name(types, namespace, field_type)
+    type_kind = types[full_name]["kind"]
+    if type_kind == "enum":
+        return {"kind": "enum", "name": full_name, "format": types[full_name]["format"]}
+    return {"kind": type_kind, "name": full_name}
+
+
+def layout_struct(types: dict, name: str) -> dict:
+    """
+    Вычисление смещений полей, размера и выравнивания структуры (рекурсивно для вложенных).
+    :param types: Словарь типов схемы по полным именам.
+    :param name: Полное имя структуры.
+    :return: Словарь структуры.
+    """
+    struct_type = types[name]
+    if "size" in struct_type:
+        return struct_type
+    offset = 0
+    align = int(struct_type["force_align"] or 1)
+    for field in struct_type["fields"]:
+        field_size, field_align = get_inline_size(types, field["type"])
+        offset = (offset + field_align - 1) // field_align * field_align
+        field["offset"] = offset
+        offset += field_size
+        align = max(align, field_align)
+    struct_type["size"] = (offset + align - 1) // align * align
+    struct_type["align"] = align
+    return struct_type
+
+
+def get_inline_size(types: dict, field_type: dict) -> tuple[int, int]:
+    """
+    Получение размера и выравнивания значения типа, хранящегося внутри структуры или таблицы.
+    :param types: Словарь типов схемы по полным именам.
+    :param field_type: Словарь описания типа.
+    :return: Кортеж из двух элементов: (размер, выравнивание).
+    """
+    if field_type["kind"] in ("scalar", "enum"):
+        size = SCALAR_SIZES[field_type["format"]]
+        return size, size
+    if field_type["kind"] == "struct":
+        struct_type = layout_struct(types, field_type["name"])
+        return struct_type["size"], struct_type["align"]
+    if field_type["kind"] == "array":
+        size, align = get_inline_size(types, field_type["element"])
+        return size * field_type["length"], align
+    return 4, 4
+
+
+def get_modification_times(schema_paths) -> tuple[int, ...]:
+    """
+    Получение времён изменения файлов схем.
+    :param schema_paths: Пути к файлам схем.
+    :return: Кортеж времён изменения в наносекундах (-1 для недоступных файлов).
+    """
+    modification_times = []
+    for schema_path in schema_paths:
+        try:
+            modification_times.append(os.stat(schema_path).st_mtime_ns)
+        except OSError:
+            modification_times.append(-1)
+    return tuple(modification_times)
+
+
+def parse_schema(schema_path: str) -> dict:
+    """
+    Разбор файла схемы Flatbuffers (включая файлы из include) без вызова компилятора. Результат
+    кэшируется до изменения самого файла или любого из подключённых через include файлов.
+    :param schema_path: Путь к файлу схемы.
+    :return: Словарь схемы с ключами types (словарь типов по полным именам), root_type,
+    file_identifier и file_extension.
+    """
+    return get_cached_value((schema_path, "schema"), lambda parsed_paths: read_schema(
+        schema_path, parsed_paths))
+
+
+def get_cached_value(key: tuple[str, str], read: Callable[[set], object]):
+    """
+    Получение значения, вычисленного по файлу схемы, из кэша SCHEMA_CACHE. Значение действительно
+    до изменения файла схемы или любого из прочитанных при вычислении файлов, иначе оно
+    вычисляется заново. Кэш защищён блокировкой, так как схемы разбираются из нескольких потоков.
+    :param key: Ключ кэша (путь к файлу схемы, вид значения).
+    :param read: Функция вычисления значения, принимающая множество для записи путей прочитанных
+    файлов схем.
+    :return: Значение.
+    """
+    with SCHEMA_CACHE_LOCK:
+        cached = SCHEMA_CACHE.get(key)
+    if cached is not None and get_modification_times(cached[0]) == cached[1]:
+        return cached[2]
+    schema_path = key[0]
+    modification_time = get_modification_times((schema_path,))
+    parsed_paths = set()
+    value = read(parsed_paths)
+    schema_paths = (schema_path,) + tuple(sorted(parsed_paths - {os.path.abspath(schema_path)}))
+    modification_times = modification_time + get_modification_times(schema_paths[1:])
+    with SCHEMA_CACHE_LOCK:
+        SCHEMA_CACHE[key] = (schema_paths, modification_times, value)
+    return value
+
+
+def read_schema(schema_path: str, parsed_paths: set) -> dict:
+    """
+    Разбор файла схемы Flatbuffers (включая файлы из include) без кэширования.
+    :param schema_path: Путь к файлу схемы.
+    :param parsed_paths: Множество для записи путей всех разобранных файлов схем.
+    :return: Словарь схемы (см. parse_schema).
+    """
+    declarations = []
+    schema = {"types": {}, "root_type": None, "file_identifier": "", "file_extension": ""}
+    parse_schema_file(schema_path, declarations, schema, parsed_paths, True)
+    types = schema["types"]
+    for kind, namespace, name, attributes, _ in declarations:
+        full_name = namespace + "." + name if namespace != "" else name
+        types[full_name] = {"kind": kind, "name": full_name, "namespace": namespace}
+        if kind == "enum":
+            types[full_name]["format"] = SCALAR_FORMATS[attributes["base_type"]]
+        elif kind == "struct":
+            types[full_name]["force_align"] = attributes.get("force_align")
+    for kind, namespace, name, attributes, members in declarations:
+        full_name = namespace + "." + name if namespace != "" else name
+        if kind == "enum":
+            types[full_name]["values"] = {value: value_name for value_name, value, _ in members}
+            continue
+        if kind == "union":
+            types[full_name]["values"] = {0: "NONE"}
+            types[full_name]["types"] = {0: None}
+            for value_name, value, value_type in members:
+                types[full_name]["values"][value] = value_name
+                types[full_name]["types"][value] = resolve_type_name(types, namespace, value_type)
+            continue
+        fields = []
+        slot = 0
+        for field_name, field_type, default, field_attributes in members:
+            field_type = resolve_field_type(types, namespace, field_type)
+            if "id" in field_attributes:
+                slot = int(field_attributes["id"])
+            field = {"name": field_name, "type": field_type, "default": default,
+                     "deprecated": "deprecated" in field_attributes}
+            element_type = field_type["element"] if field_type["kind"] == "vector" else field_type
+            if kind == "table" and element_type["kind"] == "union":
+                type_field_type = {"kind": "union_type", "name": element_type["name"]}
+                if field_type["kind"] == "vector":
+                    type_field_type = {"kind": "vector", "element": type_field_type}
+                fields.append({"name": field_name + "_type", "type": type_field_type,
+                               "default": None, "deprecated": field["deprecated"],
+                               "slot": slot - 1 if "id" in field_attributes else slot})
+                if "id" not in field_attributes:
+                    slot += 1
+            field["slot"] = slot
+            fields.append(field)
+            slot += 1
+        types[full_name]["fields"] = fields
+    for type_name, declared_type in types.items():
+        if declared_type["kind"] == "struct":
+            layout_struct(types, type_name)
+    root_type_name = schema.pop("root_type_name", None)
+    if root_type_name is not None:
+        schema["root_type"] = resolve_type_name(types, root_type_name[0], root_type_name[1])
+    return schema
@@ -0,0 +1,42 @@
+"""
+    Сериализация JSON-файлов в выбранной директории в бинарные файлы Flatbuffers по всем схемам в
+    другой выбранной директории.
+"""
+# pylint: disable=import-error, wrong-import-position
+import os
+import sys
+import argparse
+from i18n import t
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "."))
+
+from log_funcs import LOG_MODE_TEXT, LOG_MODES
+from general_funcs import init_app, init_logging, get_flatc_path, execute_serialize_batch
+
+
+def main() -> int | str:
+    """
+    Запуск скрипта.
+    :return: Код ошибки или строка об ошибке.
+    """
+    init_app(os.path.join("images", "flatbuffers-batch-logo-clean.png"))
+    parser = argparse.ArgumentParser(prog=t("main.flatc_serializer_batch_name"),
+                                     description=t("main.flatc_serializer_batch_desc"))
+    parser.add_argument("-s", "--schemas_path", type=str, default="",
+                        help=t("main.schemas_directory_arg"))
+    parser.add_argument("-j", "--jsons_path", type=str, default="",
+                        help=t("main.jsons_directory_arg"))
+    parser.add_argument("-o", "--output_path", type=str, default="",
+                        help=t("main.output_binaries_directory_arg"))
+    parser.add_argument("-f", "--flatc_path", type=str, default="", help=t("main.flatc_path_arg"))
+    parser.add_argument("--log_mode", type=str, default=LOG_MODE_TEXT, choices=LOG_MODES,
+                        help=t("main.log_mode_arg"))
+    args = parser.parse_args()
+    init_logging(args.log_mode)
+    return execute_serialize_batch(
+        get_flatc_path(os.getcwd(), True, False) if args.flatc_path == "" else args.flatc_path,
+        args.schemas_path, args.jsons_path, args.output_path)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
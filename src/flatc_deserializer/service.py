@@ -0,0 +1,54 @@
+"""
+    Локальный HTTP-сервис десериализации бинарных файлов Flatbuffers по всем схемам в выбранной
+    директории.
+"""
+# pylint: disable=import-error, wrong-import-position
+import os
+import sys
+import argparse
+from i18n import t
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "."))
+
+from log_funcs import LOG_MODE_TEXT, LOG_MODES
+from general_funcs import init_app, init_logging, get_flatc_path, add_limit_arguments, \
+    get_flatc_limits
+from service_funcs import execute_serve, ServiceOptions, SERVICE_HOST, SERVICE_PORT, MAX_BATCH, \
+    BATCH_DELAY, CLIENT_LIMIT
+
+
+def main() -> int | str:
+    """
+    Запуск скрипта.
+    :return: Код ошибки или строка об ошибке.
+    """
+    init_app(os.path.join("images", "flatbuffers-batch-logo-clean.png"))
+    parser = argparse.ArgumentParser(prog=t("main.flatc_service_name"),
+                                     description=t("main.flatc_service_desc"))
+    parser.add_argument("-s", "--schemas_path", type=str, default="",
+                        help=t("main.schemas_directory_arg"))
+    parser.add_argument("-f", "--flatc_path", type=str, default="", help=t("main.flatc_path_arg"))
+    parser.add_argument("--host", type=str, default=SERVICE_HOST, help=t("main.host_arg"))
+    parser.add_argument("-p", "--port", type=int, default=SERVICE_PORT, help=t("main.port_arg"))
+    parser.add_argument("--unix_socket", type=str, default="", help=t("main.unix_socket_arg"))
+    parser.add_argument("--max_batch", type=int, default=MAX_BATCH, help=t("main.max_batch_arg"))
+    parser.add_argument("--batch_delay", type=float, default=BATCH_DELAY * 1000,
+                        help=t("main.batch_delay_arg"))
+    parser.add_argument("--client_limit", type=int, default=CLIENT_LIMIT,
+                        help=t("main.client_limit_arg"))
+    parser.add_argument("--workers", type=int, default=0, help=t("main.workers_arg"))
+    add_limit_arguments(parser)
+    parser.add_argument("--log_mode", type=str, default=LOG_MODE_TEXT, choices=LOG_MODES,
+                        help=t("main.log_mode_arg"))
+    args = parser.parse_args()
+    init_logging(args.log_mode)
+    return execute_serve(
+        get_flatc_path(os.getcwd(), True, False) if args.flatc_path == "" else args.flatc_path,
+        args.schemas_path, ServiceOptions(args.host, args.port, args.unix_socket, args.max_batch,
+                                          args.batch_delay / 1000, args.client_limit,
+                                          args.workers if args.workers > 0 else None),
+        get_flatc_limits(args))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
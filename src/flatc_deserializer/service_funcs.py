@@ -0,0 +1,648 @@
+"""
+    Модуль, включающий в себя локальный HTTP-сервис десериализации (по TCP на loopback-адресе или
+    Unix-сокету): сессия с проверенными схемами и пулом потоков создаётся один раз, одновременные
+    запросы к одной схеме объединяются в один запуск компилятора схемы, число одновременных
+    запросов клиента ограничено, а задержки запросов доступны по адресу /metrics.
+"""
+# pylint: disable=too-many-arguments, too-many-instance-attributes
+import json
+import os
+import socket
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from http import HTTPStatus
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from itertools import count
+from logging import warning, info
+from shutil import rmtree
+from socketserver import TCPServer
+from typing import NamedTuple
+from urllib.parse import urlsplit, parse_qs, unquote
+
+from i18n import t
+
+from archive_funcs import make_scratch_path
+from encoding_funcs import convert_json_file, get_schema_layout, OUTPUT_FORMAT_JSON, \
+    OUTPUT_FORMATS
+from flatc_funcs import run_deserialize_group, FlatcLimits, STATUS_DONE, STATUS_ERROR
+from general_funcs import get_directory_path, get_schema_paths
+from log_funcs import file_logger, get_message
+from session_funcs import DeserializerSession
+
+SERVICE_HOST = "127.0.0.1"
+SERVICE_PORT = 8765
+MAX_BATCH = 32
+BATCH_DELAY = 0.002
+CLIENT_LIMIT = 4
+MAX_BODY_SIZE = 256 * 1024 * 1024
+LATENCY_WINDOW = 4096
+CHUNK_SIZE = 65536
+LISTEN_BACKLOG = 128
+CLIENT_ID_HEADER = "X-Client-Id"
+CONTENT_TYPES = {OUTPUT_FORMAT_JSON: "application/json", "msgpack": "application/msgpack",
+                 "cbor": "application/cbor"}
+
+
+class ServiceOptions(NamedTuple):
+    """
+    Параметры сервиса, задаваемые аргументами командной строки.
+    """
+    host: str = SERVICE_HOST  # Адрес для TCP-подключений.
+    port: int = SERVICE_PORT  # Порт для TCP-подключений.
+    unix_socket: str = ""  # Путь к Unix-сокету (если задан, используется вместо TCP).
+    max_batch: int = MAX_BATCH  # Максимальное число файлов в одном запуске компилятора схемы.
+    batch_delay: float = BATCH_DELAY  # Максимальное время ожидания файлов группы в секундах.
+    client_limit: int = CLIENT_LIMIT  # Число одновременных запросов клиента (0 - без ограничения).
+    max_workers: int | None = None  # Число одновременных запусков компилятора схемы.
+
+
+class PendingBinary(NamedTuple):
+    """
+    Бинарный файл запроса, ожидающий запуска компилятора схемы.
+    """
+    binary_path: str
+    future: Future
+    queued_time: float
+
+
+def get_percentiles(values: list[float]) -> dict[str, float]:
+    """
+    Получение перцентилей значений (в миллисекундах).
+    :param values: Список значений в секундах.
+    :return: Словарь {"p50": ..., "p95": ..., "p99": ..., "max": ...}.
+    """
+    if len(values) < 1:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    values = sorted(values)
+    return {name: round(values[min(len(values) - 1, int(quantile * len(values)))] * 1000, 3)
+            for name, quantile in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99), ("max", 1.0))}
+
+
+class ServiceMetrics:
+    """
+    Счётчики и задержки сервиса: время ответа на запрос, ожидание в очереди до запуска
+    компилятора схемы, время запуска компилятора схемы и размеры объединённых групп файлов.
+    Задержки хранятся для последних LATENCY_WINDOW запросов.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.start_time = time.monotonic()
+        self.counters = {"requests": 0, "done": 0, "failed": 0, "rejected": 0, "batches": 0,
+                         "batched_files": 0, "bytes_in": 0, "bytes_out": 0}
+        self.latencies = deque(maxlen=LATENCY_WINDOW)
+        self.queue_times = deque(maxlen=LATENCY_WINDOW)
+        self.flatc_times = deque(maxlen=LATENCY_WINDOW)
+
+    def add(self, name: str, value: int = 1):
+        """
+        Увеличение счётчика.
+        :param name: Имя счётчика.
+        :param value: Приращение.
+        """
+        with self.lock:
+            self.counters[name] += value
+
+    def add_batch(self, queue_times: list[float], flatc_time: float):
+        """
+        Учёт запуска компилятора схемы для группы файлов.
+        :param queue_times: Время ожидания в очереди каждого файла группы в секундах.
+        :param flatc_time: Время запуска компилятора схемы в секундах.
+        """
+        with self.lock:
+            self.counters["batches"] += 1
+            self.counters["batched_files"] += len(queue_times)
+            self.queue_times.extend(queue_times)
+            self.flatc_times.append(flatc_time)
+
+    def add_request(self, status: str, latency: float, bytes_out: int):
+        """
+        Учёт завершённого запроса на десериализацию.
+        :param status: Статус десериализации.
+        :param latency: Время ответа в секундах.
+        :param bytes_out: Размер ответа в байтах.
+        """
+        with self.lock:
+            self.counters["done" if status == STATUS_DONE else "failed"] += 1
+            self.counters["bytes_out"] += bytes_out
+            self.latencies.append(latency)
+
+    def get_snapshot(self) -> dict:
+        """
+        Получение текущих значений метрик.
+        :return: Словарь метрик (задержки в миллисекундах).
+        """
+        with self.lock:
+            counters = dict(self.counters)
+            latencies = list(self.latencies)
+            queue_times = list(self.queue_times)
+            flatc_times = list(self.flatc_times)
+        counters["uptime"] = round(time.monotonic() - self.start_time, 3)
+        counters["mean_batch_size"] = round(counters["batched_files"] / counters["batches"], 3) \
+            if counters["batches"] > 0 else 0.0
+        counters["latency_ms"] = get_percentiles(latencies)
+        counters["queue_ms"] = get_percentiles(queue_times)
+        counters["flatc_ms"] = get_percentiles(flatc_times)
+        return counters
+
+
+class RequestBatcher:
+    """
+    Объединение одновременных запросов к одной схеме в группы. Группа схемы запускается, когда в
+    ней max_batch файлов или когда её самый старый файл ждёт дольше batch_delay. Группы
+    формируются только при свободном потоке пула сессии, поэтому, пока все потоки заняты,
+    файлы накапливаются и следующий запуск компилятора схемы обрабатывает их все сразу.
+    """
+
+    def __init__(self, session: DeserializerSession, output_path: str, metrics: ServiceMetrics,
+                 max_batch: int = MAX_BATCH, batch_delay: float = BATCH_DELAY):
+        """
+        Создание объединителя запросов и запуск потока распределения групп.
+        :param session: Сессия десериализации.
+        :param output_path: Путь к директории JSON-файлов компилятора схемы.
+        :param metrics: Метрики сервиса.
+        :param max_batch: Максимальное число файлов в одном запуске компилятора схемы.
+        :param batch_delay: Максимальное время ожидания файлов группы в секундах.
+        """
+        self.session = session
+        self.output_path = output_path
+        self.metrics = metrics
+        self.max_batch = max(1, max_batch)
+        self.batch_delay = max(0.0, batch_delay)
+        self.pending = {}
+        self.condition = threading.Condition()
+        self.slots = threading.BoundedSemaphore(session.max_workers)
+        self.closed = False
+        self.thread = threading.Thread(target=self.dispatch, name="service-batcher", daemon=True)
+        self.thread.start()
+
+    def submit(self, schema_path: str, binary_path: str) -> Future:
+        """
+        Добавление бинарного файла в группу его схемы.
+        :param schema_path: Абсолютный путь к файлу схемы.
+        :param binary_path: Абсолютный путь к бинарному файлу (имя без расширения уникально).
+        :return: Задача с результатом (статус, путь к JSON-файлу или пустая строка при ошибке).
+        """
+        future = Future()
+        with self.condition:
+            if self.closed:
+                future.set_result((STATUS_ERROR, ""))
+                return future
+            self.pending.setdefault(schema_path, []).append(
+                PendingBinary(binary_path, future, time.monotonic()))
+            self.condition.notify()
+        return future
+
+    def pop_group(self) -> tuple[str, list[PendingBinary], float | None]:
+        """
+        Извлечение готовой группы: заполненной или с самым старым файлом среди всех схем.
+        Вызывается под блокировкой.
+        :return: Кортеж из трёх элементов: (путь к файлу схемы, список файлов группы или пустой
+        список, если готовых групп нет, время до готовности следующей группы или None).
+        """
+        if len(self.pending) < 1:
+            return "", [], None
+        schema_path = next((path for path, items in self.pending.items()
+                            if len(items) >= self.max_batch), None)
+        if schema_path is None:
+            schema_path = min(self.pending, key=lambda path: self.pending[path][0].queued_time)
+            wait_time = self.pending[schema_path][0].queued_time + self.batch_delay - \
+                time.monotonic()
+            if wait_time > 0 and not self.closed:
+                return "", [], wait_time
+        group = self.pending.pop(schema_path)
+        if len(group) > self.max_batch:
+            self.pending[schema_path] = group[self.max_batch:]
+        return schema_path, group[:self.max_batch], None
+
+    def dispatch(self):
+        """
+        Распределение готовых групп по потокам пула сессии (выполняется в отдельном потоке).
+        Новая группа формируется только при свободном потоке пула.
+        """
+        while True:
+            self.slots.acquire()  # pylint: disable=consider-using-with
+            with self.condition:
+                schema_path, group, wait_time = self.pop_group()
+                while len(group) < 1:
+                    if self.closed:
+                        self.slots.release()
+                        return
+                    self.condition.wait(wait_time)
+                    schema_path, group, wait_time = self.pop_group()
+            try:
+                self.session.executor.submit(self.run_group, schema_path, group)
+            except RuntimeError:
+                self.slots.release()
+                for pending_binary in group:
+                    pending_binary.future.set_result((STATUS_ERROR, ""))
+
+    def run_group(self, schema_path: str, group: list[PendingBinary]):
+        """
+        Десериализация группы файлов одним запуском компилятора схемы. Задачи файлов, для которых
+        не получен результат (в том числе при любом исключении), завершаются с ошибкой, чтобы
+        обработчики запросов не ожидали их бесконечно.
+        :param schema_path: Абсолютный путь к файлу схемы.
+        :param group: Список файлов группы.
+        """
+        try:
+            start_time = time.monotonic()
+            results = run_deserialize_group(
+                self.session.flatc_path, schema_path,
+                [pending_binary.binary_path for pending_binary in group], self.output_path,
+                self.session.additional_params, self.session.limits)
+            self.metrics.add_batch([start_time - pending_binary.queued_time
+                                    for pending_binary in group], time.monotonic() - start_time)
+            for pending_binary, result in zip(group, results):
+                pending_binary.future.set_result(result)
+        except Exception as exc:  # pylint: disable=broad-exception-caught
+            warning("%s", exc)
+        finally:
+            for pending_binary in group:
+                if not pending_binary.future.done():
+                    pending_binary.future.set_result((STATUS_ERROR, ""))
+            self.slots.release()
+
+    def close(self):
+        """
+        Остановка потока распределения после запуска всех ожидающих групп.
+        """
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join()
+
+
+class DeserializerService:
+    """
+    Сервис десериализации: сессия, объединитель запросов, ограничения клиентов и метрики.
+    Бинарные файлы запросов и JSON-файлы компилятора схемы хранятся во временной директории и
+    удаляются после отправки ответа.
+    """
+
+    def __init__(self, session: DeserializerSession, max_batch: int = MAX_BATCH,
+                 batch_delay: float = BATCH_DELAY, client_limit: int = CLIENT_LIMIT,
+                 max_body_size: int = MAX_BODY_SIZE):
+        """
+        Создание сервиса.
+        :param session: Сессия десериализации (закрывается вместе с сервисом).
+        :param max_batch: Максимальное число файлов в одном запуске компилятора схемы.
+        :param batch_delay: Максимальное время ожидания файлов группы в секундах.
+        :param client_limit: Максимальное число одновременных запросов одного клиента. Если 0,
+        не ограничивается.
+        :param max_body_size: Максимальный размер бинарного файла в запросе в байтах.
+        """
+        self.session = session
+        self.client_limit = client_limit
+        self.max_body_size = max_body_size
+        self.scratch_path = make_scratch_path()
+        self.input_path = os.path.join(self.scratch_path, "in")
+        self.output_path = os.path.join(self.scratch_path, "out")
+        os.makedirs(self.input_path)
+        os.makedirs(self.output_path)
+        self.metrics = ServiceMetrics()
+        self.batcher = RequestBatcher(session, self.output_path, self.metrics, max_batch,
+                                      batch_delay)
+        self.request_ids = count()
+        self.clients = {}  # Число текущих запросов клиентов {идентификатор клиента: число}.
+        self.clients_lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """
+        Остановка сервиса, закрытие сессии и удаление временной директории.
+        """
+        self.batcher.close()
+        self.session.close()
+        rmtree(self.scratch_path, ignore_errors=True)
+
+    def get_schema_names(self) -> list[str]:
+        """
+        Получение имён схем сервиса (по ним выбирается схема в адресе запроса).
+        :return: Отсортированный список имён схем.
+        """
+        return sorted(self.session.schema_index)
+
+    def acquire_client(self, client_id: str) -> bool:
+        """
+        Занятие места в ограничении одновременных запросов клиента.
+        :param client_id: Идентификатор клиента.
+        :return: True, если место занято. False, если клиент достиг ограничения.
+        """
+        if self.client_limit < 1:
+            return True
+        with self.clients_lock:
+            active_count = self.clients.get(client_id, 0)
+            if active_count >= self.client_limit:
+                return False
+            self.clients[client_id] = active_count + 1
+        return True
+
+    def release_client(self, client_id: str):
+        """
+        Освобождение места в ограничении одновременных запросов клиента. Клиент без текущих
+        запросов удаляется из словаря, поэтому его размер ограничен числом активных клиентов.
+        :param client_id: Идентификатор клиента.
+        """
+        if self.client_limit < 1:
+            return
+        with self.clients_lock:
+            active_count = self.clients.pop(client_id) - 1
+            if active_count > 0:
+                self.clients[client_id] = active_count
+
+    def make_binary_path(self) -> str:
+        """
+        Получение уникального пути к бинарному файлу запроса во временной директории.
+        :return: Путь к бинарному файлу.
+        """
+        return os.path.join(self.input_path, f"{next(self.request_ids)}.bin")
+
+    def deserialize(self, schema_name: str, binary_path: str, output_format: str) \
+            -> tuple[str, str]:
+        """
+        Десериализация бинарного файла запроса (ожидание завершения его группы).
+        :param schema_name: Имя схемы.
+        :param binary_path: Путь к бинарному файлу запроса.
+        :param output_format: Формат ответа (json, msgpack или cbor).
+        :return: Кортеж из двух элементов: (статус, путь к файлу ответа или пустая строка при
+        ошибке).
+        """
+        schema_path = self.session.schema_index[schema_name]
+        status, json_path = self.batcher.submit(schema_path, binary_path).result()
+        if status != STATUS_DONE or output_format == OUTPUT_FORMAT_JSON:
+            return status, json_path
+        try:
+            return status, convert_json_file(json_path, output_format,
+                                             get_schema_layout(schema_path))
+        except (OSError, ValueError) as exc:
+            warning(get_message("flatc_funcs.json_error"), binary_path)
+            warning("%s", exc)
+            return STATUS_ERROR, ""
+
+
+class ServiceRequestHandler(BaseHTTPRequestHandler):
+    """
+    Обработчик запросов сервиса:
+    POST /deserialize/<схема>?format=json|msgpack|cbor - тело запроса - бинарный файл, ответ -
+    десериализованный файл (передаётся частями из файла компилятора схемы);
+    GET /schemas - список имён схем;
+    GET /metrics - метрики сервиса.
+    Клиент определяется заголовком X-Client-Id или адресом подключения.
+    """
+    protocol_version = "HTTP/1.1"
+    server_version = "flatc_deserializer"
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        file_logger.info(format, *args)
+
+    def address_string(self) -> str:
+        if isinstance(self.client_address, tuple) and len(self.client_address) > 0:
+            return str(self.client_address[0])
+        return "unix"
+
+    def send_json(self, status: HTTPStatus, value):
+        """
+        Отправка ответа с JSON-телом.
+        :param status: HTTP-статус.
+        :param value: Значение для записи в JSON.
+        """
+        body = json.dumps(value, indent=1).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def send_error_json(self, status: HTTPStatus, message: str):
+        """
+        Отправка ответа об ошибке.
+        :param status: HTTP-статус.
+        :param message: Текст ошибки.
+        """
+        self.send_json(status, {"error": message})
+
+    def do_GET(self):  # pylint: disable=invalid-name
+        """
+        Обработка GET-запроса.
+        """
+        path = urlsplit(self.path).path.rstrip("/")
+        if path == "/metrics":
+            self.send_json(HTTPStatus.OK, self.server.service.metrics.get_snapshot())
+        elif path == "/schemas":
+            self.send_json(HTTPStatus.OK, self.server.service.get_schema_names())
+        else:
+            self.send_error_json(HTTPStatus.NOT_FOUND, t("service_funcs.not_found") % self.path)
+
+    def do_POST(self):  # pylint: disable=invalid-name
+        """
+        Обработка POST-запроса на десериализацию.
+        """
+        start_time = time.monotonic()
+        service = self.server.service
+        url = urlsplit(self.path)
+        try:
+            length = int(self.headers.get("Content-Length", "0"))
+        except ValueError:
+            length = -1
+        if length < 0:
+            self.close_connection = True
+            self.send_error_json(HTTPStatus.BAD_REQUEST, t("service_funcs.invalid_length") %
+                                 self.headers.get("Content-Length"))
+            return
+        if not url.path.startswith("/deserialize/"):
+            self.close_connection = length > 0
+            self.send_error_json(HTTPStatus.NOT_FOUND, t("service_funcs.not_found") % self.path)
+            return
+        schema_name = unquote(url.path[len("/deserialize/"):]).strip("/").casefold()
+        output_format = parse_qs(url.query).get("format", [OUTPUT_FORMAT_JSON])[0]
+        error = None
+        if schema_name not in service.session.schema_index:
+            error = HTTPStatus.NOT_FOUND, t("service_funcs.unknown_schema") % schema_name
+        elif output_format not in OUTPUT_FORMATS:
+            error = HTTPStatus.BAD_REQUEST, t("service_funcs.invalid_format") % output_format
+        elif length < 1:
+            error = HTTPStatus.BAD_REQUEST, t("service_funcs.missing_body")
+        elif length > service.max_body_size:
+            error = HTTPStatus.REQUEST_ENTITY_TOO_LARGE, t("service_funcs.body_too_large") % (
+                length, service.max_body_size)
+        if error is not None:
+            self.close_connection = length > 0
+            self.send_error_json(*error)
+            return
+        client_id = self.headers.get(CLIENT_ID_HEADER, self.address_string())
+        service.metrics.add("requests")
+        if not service.acquire_client(client_id):
+            service.metrics.add("rejected")
+            self.close_connection = True
+            self.send_response(HTTPStatus.TOO_MANY_REQUESTS)
+            self.send_header("Retry-After", "1")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        binary_path = service.make_binary_path()
+        output_file_path = ""
+        try:
+            try:
+                self.receive_body(binary_path, length)
+            except ConnectionError:
+                self.close_connection = True
+                return
+            service.metrics.add("bytes_in", length)
+            status, output_file_path = service.deserialize(schema_name, binary_path,
+                                                           output_format)
+            if status != STATUS_DONE:
+                service.metrics.add_request(status, time.monotonic() - start_time, 0)
+                self.send_error_json(HTTPStatus.UNPROCESSABLE_ENTITY,
+                                     t("service_funcs.deserialize_failed") % status)
+                return
+            size = self.send_file(output_file_path, CONTENT_TYPES[output_format])
+            service.metrics.add_request(status, time.monotonic() - start_time, size)
+        finally:
+            service.release_client(client_id)
+            for file_path in (binary_path, output_file_path):
+                if file_path != "" and os.path.isfile(file_path):
+                    os.remove(file_path)
+
+    def receive_body(self, binary_path: str, length: int):
+        """
+        Запись тела запроса в файл частями.
+        :param binary_path: Путь к файлу.
+        :param length: Размер тела запроса в байтах.
+        """
+        with open(binary_path, "wb") as file:
+            while length > 0:
+                chunk = self.rfile.read(min(CHUNK_SIZE, length))
+                if chunk == b"":
+                    raise ConnectionError(t("service_funcs.incomplete_body"))
+                file.write(chunk)
+                length -= len(chunk)
+
+    def send_file(self, file_path: str, content_type: str) -> int:
+        """
+        Отправка файла в ответе частями.
+        :param file_path: Путь к файлу.
+        :param content_type: Тип содержимого.
+        :return: Размер файла в байтах.
+        """
+        with open(file_path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(size))
+            self.end_headers()
+            for chunk in iter(lambda: file.read(CHUNK_SIZE), b""):
+                self.wfile.write(chunk)
+        return size
+
+
+class ServiceHTTPServer(ThreadingHTTPServer):
+    """
+    Многопоточный HTTP-сервер сервиса десериализации.
+    """
+    daemon_threads = True
+    request_queue_size = LISTEN_BACKLOG
+
+    def __init__(self, address, service: DeserializerService):
+        self.service = service
+        super().__init__(address, ServiceRequestHandler)
+
+
+class UnixServiceHTTPServer(ServiceHTTPServer):
+    """
+    Многопоточный HTTP-сервер сервиса десериализации на Unix-сокете.
+    """
+    address_family = getattr(socket, "AF_UNIX", socket.AF_INET)
+
+    def server_bind(self):
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+        TCPServer.server_bind(self)
+        self.server_name = "localhost"
+        self.server_port = 0
+
+    def server_close(self):
+        super().server_close()
+        if os.path.exists(self.server_address):
+            os.remove(self.server_address)
+
+
+def create_server(service: DeserializerService, host: str = SERVICE_HOST,
+                  port: int = SERVICE_PORT, unix_socket: str = "") -> ServiceHTTPServer:
+    """
+    Создание HTTP-сервера сервиса десериализации.
+    :param service: Сервис десериализации.
+    :param host: Адрес для TCP-подключений.
+    :param port: Порт для TCP-подключений (0 - любой свободный).
+    :param unix_socket: Путь к Unix-сокету. Если задан, используется вместо TCP.
+    :return: HTTP-сервер (не запущен).
+    """
+    if unix_socket != "":
+        if not hasattr(socket, "AF_UNIX"):
+            raise OSError(t("service_funcs.unix_socket_unsupported"))
+        return UnixServiceHTTPServer(os.path.abspath(unix_socket), service)
+    return ServiceHTTPServer((host, port), service)
+
+
+def get_server_location(server: ServiceHTTPServer) -> str:
+    """
+    Получение адреса сервера для вывода.
+    :param server: HTTP-сервер.
+    :return: URL сервера или путь к Unix-сокету.
+    """
+    if isinstance(server, UnixServiceHTTPServer):
+        return "unix:" + server.server_address
+    return f"http://{server.server_address[0]}:{server.server_address[1]}"
+
+
+def serve(service: DeserializerService, host: str = SERVICE_HOST, port: int = SERVICE_PORT,
+          unix_socket: str = ""):
+    """
+    Запуск HTTP-сервера сервиса десериализации до прерывания (Ctrl+C).
+    :param service: Сервис десериализации.
+    :param host: Адрес для TCP-подключений.
+    :param port: Порт для TCP-подключений.
+    :param unix_socket: Путь к Unix-сокету. Если задан, используется вместо TCP.
+    """
+    with create_server(service, host, port, unix_socket) as server:
+        info(get_message("service_funcs.listening"), get_server_location(server),
+             ", ".join(service.get_schema_names()))
+        try:
+            server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+    info(get_message("service_funcs.stopped"), service.metrics.counters["done"],
+         service.metrics.counters["failed"], service.metrics.counters["rejected"])
+
+
+def execute_serve(flatc_path: str, schemas_path: str, options: ServiceOptions | None = None,
+                  limits: FlatcLimits | None = None) -> (int | str):
+    """
+    Запуск локального HTTP-сервиса десериализации бинарных файлов Flatbuffers по всем схемам в
+    директории до прерывания.
+    :param flatc_path: Путь к файлу компилятора схемы.
+    :param schemas_path: Путь к директории с файлами схем.
+    :param options: Параметры сервиса.
+    :param limits: Ограничения процесса компилятора схемы.
+    :return: Код ошибки или строка об ошибке.
+    """
+    if options is None:
+        options = ServiceOptions()
+    schemas_path = get_directory_path(schemas_path, "main.tkinter_fbs_directory_select")
+    schema_paths = get_schema_paths(schemas_path)
+    if len(schema_paths) < 1:
+        info(get_message("main.no_schema_files_found"), schemas_path)
+        return os.EX_OK
+    session = DeserializerSession(flatc_path, schema_paths, ["--strict-json"], limits=limits,
+                                  max_workers=options.max_workers)
+    with DeserializerService(session, options.max_batch, options.batch_delay,
+                             options.client_limit) as service:
+        serve(service, options.host, options.port, options.unix_socket)
+    return os.EX_OK
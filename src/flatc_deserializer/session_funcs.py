@@ -0,0 +1,186 @@
+"""
+    Модуль, включающий в себя сессию десериализации, которая один раз проверяет компилятор схемы и
+    файлы схем и переиспользует пул потоков между вызовами.
+"""
+# pylint: disable=too-many-arguments
+import errno
+import os
+import threading
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, Future, wait, FIRST_COMPLETED
+from shutil import which
+
+from i18n import t
+
+from buffer_funcs import deserialize_to_json
+from encoding_funcs import OUTPUT_FORMAT_JSON
+from flatc_funcs import run_deserialize, FlatcLimits, STATUS_DONE, STATUS_ERROR
+from schema_funcs import parse_schema
+
+PENDING_PER_WORKER = 4
+
+
+def check_flatc_path(flatc_path: str) -> str:
+    """
+    Проверка наличия и исполняемости компилятора схемы.
+    :param flatc_path: Путь к файлу компилятора схемы.
+    :return: Абсолютный путь к файлу компилятора схемы.
+    """
+    if not os.path.isfile(flatc_path):
+        raise FileNotFoundError(errno.ENOENT, t("main.file_not_found") % flatc_path)
+    if which(os.path.split(flatc_path)[1], path=os.path.split(flatc_path)[0]) is None:
+        raise FileNotFoundError(errno.ENOENT, t("main.file_not_executable") % flatc_path)
+    return os.path.abspath(flatc_path)
+
+
+class DeserializerSession:
+    """
+    Сессия десериализации бинарных файлов Flatbuffers. Компилятор схемы и файлы схем проверяются
+    один раз при создании, индекс схем (по расширению бинарных файлов) строится один раз, а пул
+    потоков создаётся при первом обращении (конвейер пакетной десериализации использует свои
+    потоки стадий и пул не создаёт) и переиспользуется между вызовами deserialize_many.
+    """
+
+    def __init__(self, flatc_path: str, schema_paths: list[str], additional_params=None,
+                 field_paths: list[str] | None = None, limits: FlatcLimits | None = None,
+                 max_workers: int | None = None, output_format: str = OUTPUT_FORMAT_JSON):
+        """
+        Создание сессии.
+        :param flatc_path: Путь к файлу компилятора схемы.
+        :param schema_paths: Список путей к файлам схем.
+        :param additional_params: Дополнительный список параметров для компилятора схемы.
+        :param field_paths: Список путей к выбранным полям. Если задан, файлы десериализуются без
+        компилятора схемы и в JSON-файлы записываются только выбранные поля.
+        :param limits: Ограничения процесса компилятора схемы.
+        :param max_workers: Число потоков пула (по умолчанию - как у ThreadPoolExecutor).
+        :param output_format: Формат файлов вывода (json, msgpack или cbor).
+        """
+        self.flatc_path = check_flatc_path(flatc_path)
+        self.schema_index = {}
+        for schema_path in schema_paths:
+            if not os.path.isfile(schema_path):
+                raise FileNotFoundError(errno.ENOENT, t("main.file_not_found") % schema_path)
+            schema_name = os.path.splitext(os.path.basename(schema_path))[0].casefold()
+            self.schema_index.setdefault(schema_name, os.path.abspath(schema_path))
+        self.additional_params = [] if additional_params is None else list(additional_params)
+        self.field_paths = [] if field_paths is None else list(field_paths)
+        self.limits = limits
+        self.output_format = output_format
+        if len(self.field_paths) > 0:
+            for schema_path in self.schema_index.values():
+                parse_schema(schema_path)
+        if max_workers is None:
+            max_workers = min(32, (os.cpu_count() or 1) + 4)
+        self.max_workers = max_workers
+        self.max_pending = max_workers * PENDING_PER_WORKER
+        self.executor_lock = threading.Lock()
+        self.lazy_executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """
+        Пул потоков сессии (создаётся при первом обращении).
+        :return: Пул потоков.
+        """
+        with self.executor_lock:
+            if self.lazy_executor is None:
+                self.lazy_executor = ThreadPoolExecutor(self.max_workers)
+            return self.lazy_executor
+
+    def close(self):
+        """
+        Завершение сессии: отмена ожидающих задач и остановка пула потоков, если он был создан.
+        """
+        with self.executor_lock:
+            executor = self.lazy_executor
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+
+    def get_schema_path(self, binary_path: str) -> str:
+        """
+        Получение пути к файлу схемы для бинарного файла по его расширению. Если в сессии одна
+        схема, она используется для всех файлов.
+        :param binary_path: Путь к бинарному файлу.
+        :return: Путь к файлу схемы или пустая строка, если схема не найдена.
+        """
+        schema_path = self.schema_index.get(os.path.splitext(binary_path)[1][1:].casefold(), "")
+        if schema_path == "" and len(self.schema_index) == 1:
+            return next(iter(self.schema_index.values()))
+        return schema_path
+
+    def deserialize_one(self, binary_path: str, output_path: str = "", schema_path: str = "") \
+            -> tuple[str, str]:
+        """
+        Десериализация одного бинарного файла.
+        :param binary_path: Путь к бинарному файлу.
+        :param output_path: Путь к директории или JSON-файлу вывода. Если пустой, JSON-файл
+        записывается рядом с бинарным файлом.
+        :param schema_path: Путь к файлу схемы. Если пустой, схема выбирается по расширению.
+        :return: Кортеж из двух элементов: (статус, путь к JSON-файлу или пустая строка при ошибке).
+        """
+        binary_path = os.path.abspath(binary_path)
+        schema_path = self.get_schema_path(binary_path) if schema_path == "" else \
+            os.path.abspath(schema_path)
+        if schema_path == "":
+            return STATUS_ERROR, ""
+        output_path = os.path.dirname(binary_path) if output_path == "" else \
+            os.path.abspath(output_path)
+        if len(self.field_paths) > 0:
+            json_path = deserialize_to_json(schema_path, binary_path, output_path,
+                                            self.field_paths, self.output_format)
+            return STATUS_DONE if json_path != "" else STATUS_ERROR, json_path
+        if os.path.splitext(output_path)[1].lower() == ".json":
+            json_path = output_path
+            output_path = os.path.dirname(output_path)
+        else:
+            json_path = os.path.join(output_path, os.path.splitext(os.path.basename(
+                binary_path))[0] + ".json")
+        return run_deserialize(self.flatc_path, schema_path, binary_path, output_path, json_path,
+                               self.additional_params, self.limits, self.output_format)
+
+    def deserialize_many(self, binary_paths: Iterable[str], output_path: str = "",
+                         binaries_path: str = "") -> Iterator[tuple[str, str, str, str]]:
+        """
+        Десериализация бинарных файлов в пуле потоков сессии. Число одновременно ожидающих задач
+        ограничено, поэтому binary_paths может быть ленивым итератором любой длины.
+        :param binary_paths: Пути к бинарным файлам.
+        :param output_path: Путь к директории вывода. Если пустой, JSON-файлы записываются рядом
+        с бинарными файлами.
+        :param binaries_path: Путь к корневой директории бинарных файлов. Если задан, в директории
+        вывода воспроизводится структура поддиректорий относительно неё.
+        :return: Итератор кортежей (путь к бинарному файлу, путь к файлу схемы, статус, путь к
+        JSON-файлу) в порядке завершения.
+        """
+        pending = {}
+        for binary_path in binary_paths:
+            if len(pending) >= self.max_pending:
+                yield from self.pop_done(pending)
+            schema_path = self.get_schema_path(binary_path)
+            binary_output_path = output_path
+            if output_path != "" and binaries_path != "":
+                binary_output_path = os.path.join(output_path, os.path.dirname(
+                    os.path.relpath(binary_path, binaries_path)))
+            future = self.executor.submit(self.deserialize_one, binary_path, binary_output_path,
+                                          schema_path)
+            pending[future] = (binary_path, schema_path)
+        while len(pending) > 0:
+            yield from self.pop_done(pending)
+
+    @staticmethod
+    def pop_done(pending: dict[Future, tuple[str, str]]) -> Iterator[tuple[str, str, str, str]]:
+        """
+        Ожидание завершения хотя бы одной задачи и извлечение завершённых задач.
+        :param pending: Словарь {задача: (путь к бинарному файлу, путь к файлу схемы)}.
+        :return: Итератор кортежей (путь к бинарному файлу, путь к файлу схемы, статус, путь к
+        JSON-файлу).
+        """
+        done, _ = wait(pending, return_when=FIRST_COMPLETED)
+        for future in done:
+            binary_path, schema_path = pending.pop(future)
+            yield (binary_path, schema_path) + future.result()
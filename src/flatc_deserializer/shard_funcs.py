@@ -0,0 +1,219 @@
+"""
+    Модуль, включающий в себя функции для распределения бинарных файлов по шардам (частям,
+    обрабатываемым независимо, например, на разных машинах) с балансировкой по байтам и для записи
+    и объединения манифестов шардов.
+"""
+import errno
+import json
+import os
+from hashlib import blake2b
+from logging import info
+from typing import NamedTuple
+
+from i18n import t
+
+from archive_funcs import is_archive_path
+from log_funcs import get_message
+
+SHARD_LOAD_FACTOR = 1.05
+
+
+class ShardPlan(NamedTuple):
+    """
+    Шард: номер, количество шардов и суммарные размеры файлов всех шардов по распределению
+    (заполняются при распределении, см. shard_items).
+    """
+    index: int
+    count: int
+    sizes: list[int]
+
+
+def parse_shard(shard: str) -> ShardPlan:
+    """
+    Разбор строки шарда в формате K/N.
+    :param shard: Строка шарда (номер шарда от 1 до N и общее количество шардов через "/").
+    :return: Шард с пустым списком размеров.
+    """
+    parts = shard.split("/")
+    if len(parts) != 2 or not parts[0].strip().isdigit() or not parts[1].strip().isdigit():
+        raise ValueError(t("main.invalid_shard") % shard)
+    shard_index, shard_count = int(parts[0]), int(parts[1])
+    if shard_count < 1 or not 1 <= shard_index <= shard_count:
+        raise ValueError(t("main.invalid_shard") % shard)
+    return ShardPlan(shard_index, shard_count, [])
+
+
+def get_stable_hash(key: str) -> int:
+    """
+    Получение хэша строки, не зависящего от процесса и машины (в отличие от hash()).
+    :param key: Строка.
+    :return: Хэш строки.
+    """
+    return int.from_bytes(blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def shard_binary_tuples(binary_tuples: list[tuple[str, str]], root_path: str, shard: ShardPlan) \
+        -> list[tuple[str, str]]:
+    """
+    Получение подмножества кортежей (путь к бинарному файлу, путь к файлу схемы), относящегося к
+    заданному шарду (см. assign_shards).
+    :param binary_tuples: Список кортежей (путь к бинарному файлу, путь к файлу схемы).
+    :param root_path: Путь к корневой директории бинарных файлов.
+    :param shard: Шард.
+    :return: Список кортежей, относящихся к шарду.
+    """
+    return shard_items([(os.path.relpath(binary_tuple[0], root_path),
+                         os.path.getsize(binary_tuple[0]), binary_tuple)
+                        for binary_tuple in binary_tuples], shard)
+
+
+def get_shard_preferences(path_hash: int, shard_count: int) -> list[int]:
+    """
+    Получение порядка предпочтения шардов для файла (рандеву-хэширование): оценка каждого шарда
+    получается перемешиванием (splitmix64) стабильного хэша пути файла с номером шарда, поэтому
+    путь хэшируется один раз, а при изменении числа шардов меняется только часть порядков.
+    :param path_hash: Стабильный хэш относительного пути к файлу.
+    :param shard_count: Количество шардов.
+    :return: Номера шардов (от 1 до shard_count) по убыванию оценки.
+    """
+    scores = []
+    for i in range(1, shard_count + 1):
+        score = (path_hash + i * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF
+        score = ((score ^ (score >> 30)) * 0xBF58476D1CE4E5B9) & 0xFFFFFFFFFFFFFFFF
+        score = ((score ^ (score >> 27)) * 0x94D049BB133111EB) & 0xFFFFFFFFFFFFFFFF
+        scores.append((score ^ (score >> 31), i))
+    return [i for _, i in sorted(scores, reverse=True)]
+
+
+def assign_shards(sizes: dict[str, int], shard_count: int) -> tuple[dict[str, int], list[int]]:
+    """
+    Распределение файлов по шардам с балансировкой по байтам, не зависящее от порядка списка
+    файлов: файлы перебираются по убыванию размера (одинаковые по размеру - по стабильному хэшу
+    пути), и каждый попадает в первый по своему порядку предпочтения (см. get_shard_preferences)
+    шард, суммарный размер файлов которого не превысит SHARD_LOAD_FACTOR от среднего, а если
+    такого нет - в наименее загруженный.
+    :param sizes: Словарь {относительный путь к файлу: размер}.
+    :param shard_count: Количество шардов.
+    :return: Кортеж из двух элементов: (словарь {относительный путь к файлу: номер шарда}, список
+    суммарных размеров файлов шардов).
+    """
+    path_hashes = {rel_path: get_stable_hash(rel_path.replace(os.sep, "/")) for rel_path in sizes}
+    capacity = SHARD_LOAD_FACTOR * sum(sizes.values()) / shard_count
+    shard_sizes = [0] * shard_count
+    shards = {}
+    for rel_path in sorted(sizes, key=lambda path: (-sizes[path], path_hashes[path], path)):
+        preferences = get_shard_preferences(path_hashes[rel_path], shard_count)
+        shard = next((i for i in preferences if shard_sizes[i - 1] + sizes[rel_path] <= capacity),
+                     min(preferences, key=lambda i: shard_sizes[i - 1]))
+        shard_sizes[shard - 1] += sizes[rel_path]
+        shards[rel_path] = shard
+    return shards, shard_sizes
+
+
+def shard_items(items: list[tuple[str, int, object]], shard: ShardPlan) -> list:
+    """
+    Получение подмножества элементов, относящегося к заданному шарду (см. assign_shards).
+    Суммарные размеры файлов всех шардов записываются в шард.
+    :param items: Список кортежей (относительный путь, размер файла, элемент).
+    :param shard: Шард.
+    :return: Список элементов, относящихся к шарду, в порядке относительных путей.
+    """
+    shards, shard_sizes = assign_shards({rel_path: size for rel_path, size, _ in items},
+                                        shard.count)
+    shard.sizes[:] = shard_sizes
+    selected_items = [item for rel_path, _, item in sorted(items, key=lambda item: item[0])
+                      if shards[rel_path] == shard.index]
+    info(get_message("main.shard_files"), shard.index, shard.count, len(selected_items),
+         shard_sizes[shard.index - 1])
+    return selected_items
+
+
+def get_manifest_path(output_path: str, shard_index: int, shard_count: int) -> str:
+    """
+    Получение пути к файлу манифеста шарда.
+    :param output_path: Путь к директории вывода.
+    :param shard_index: Номер шарда.
+    :param shard_count: Количество шардов.
+    :return: Путь к файлу манифеста.
+    """
+    return os.path.join(output_path, f"shard-{shard_index}-of-{shard_count}.manifest.json")
+
+
+def write_shard_manifest(shard: ShardPlan, binaries_path: str, output_path: str,
+                         results: list[tuple[str, str, str, str]],
+                         binary_sizes: dict[str, int] | None = None):
+    """
+    Запись манифеста с результатами десериализации шарда в директорию вывода (или в директорию
+    архива вывода).
+    :param shard: Шард.
+    :param binaries_path: Путь к директории с бинарными файлами.
+    :param output_path: Путь к директории или архиву вывода.
+    :param results: Список кортежей (путь к бинарному файлу, путь к файлу схемы, путь к JSON-файлу
+    или пустая строка при ошибке, статус).
+    :param binary_sizes: Словарь {путь к бинарному файлу: размер} для файлов, которых нет на диске
+    (например, файлов из архива).
+    """
+    if binary_sizes is None:
+        binary_sizes = {}
+    files = []
+    for binary_path, schema_path, json_path, status in sorted(results):
+        files.append({"binary": os.path.relpath(binary_path, binaries_path).replace(os.sep, "/"),
+                      "schema": os.path.basename(schema_path),
+                      "output": os.path.relpath(json_path, output_path).replace(os.sep, "/")
+                      if json_path != "" else "",
+                      "size": os.path.getsize(binary_path) if os.path.isfile(binary_path) else
+                      binary_sizes.get(binary_path, 0),
+                      "status": status})
+    manifest = {"shard": shard.index, "shard_count": shard.count,
+                "files_total": len(files),
+                "files_failed": sum(1 for file in files if file["status"] != "done"),
+                "bytes_total": sum(file["size"] for file in files),
+                "shard_bytes": shard.sizes,
+                "files": files}
+    manifest_path = get_manifest_path(os.path.dirname(os.path.abspath(output_path)) if
+                                      is_archive_path(output_path) else output_path,
+                                      shard.index, shard.count)
+    with open(manifest_path, "w", encoding="utf-8") as file:
+        json.dump(manifest, file, indent=1)
+    info(get_message("main.manifest_written"), manifest_path)
+
+
+def execute_merge_manifests(output_path: str) -> (int | str):
+    """
+    Объединение манифестов всех шардов в директории вывода в один общий отчёт.
+    :param output_path: Путь к директории вывода, общей для всех шардов.
+    :return: Код ошибки или строка об ошибке.
+    """
+    if not os.path.isdir(output_path):
+        raise FileNotFoundError(errno.ENOENT, t("main.directory_not_found") % output_path)
+    manifests = []
+    for file in sorted(os.listdir(output_path)):
+        if file.startswith("shard-") and file.endswith(".manifest.json"):
+            with open(os.path.join(output_path, file), "r", encoding="utf-8") as manifest_file:
+                manifests.append(json.load(manifest_file))
+    if len(manifests) < 1:
+        raise FileNotFoundError(errno.ENOENT, t("main.no_manifests_found") % output_path)
+    shard_count = max(manifest["shard_count"] for manifest in manifests)
+    shard_indices = {manifest["shard"] for manifest in manifests
+                     if manifest["shard_count"] == shard_count}
+    missing_shards = [i for i in range(1, shard_count + 1) if i not in shard_indices]
+    files = sorted((file for manifest in manifests if manifest["shard_count"] == shard_count
+                    for file in manifest["files"]), key=lambda file: file["binary"])
+    shard_bytes = [0] * shard_count
+    for manifest in manifests:
+        if manifest["shard_count"] == shard_count:
+            shard_bytes[manifest["shard"] - 1] = manifest["bytes_total"]
+    report = {"shard_count": shard_count, "missing_shards": missing_shards,
+              "files_total": len(files),
+              "files_failed": sum(1 for file in files if file["status"] != "done"),
+              "bytes_total": sum(file["size"] for file in files),
+              "shard_bytes": shard_bytes,
+              "files": files}
+    report_path = os.path.join(output_path, "merged.manifest.json")
+    with open(report_path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=1)
+    info(get_message("main.merged_summary"), report["files_total"], report["files_failed"],
+         report["bytes_total"], report_path)
+    if len(missing_shards) > 0:
+        return t("main.missing_shards") % ", ".join(str(i) for i in missing_shards)
+    return os.EX_OK if report["files_failed"] == 0 else errno.EIO
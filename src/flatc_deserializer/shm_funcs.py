@@ -0,0 +1,427 @@
+"""
+    Модуль, включающий в себя передачу входных буферов и результатов между процессами пула через
+    разделяемую память (multiprocessing.shared_memory) вместо сериализации pickle: родительский
+    процесс выделяет ячейку кольцевого буфера, читает в неё бинарный файл, процесс пула
+    декодирует и кодирует его и записывает результат в ту же ячейку, а обратно возвращается
+    только дескриптор.
+"""
+# pylint: disable=too-many-arguments
+import os
+import threading
+import time
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from logging import info
+from multiprocessing.shared_memory import SharedMemory
+from typing import NamedTuple
+
+from buffer_funcs import decode_buffer
+from encoding_funcs import encode_value, get_schema_layout
+from log_funcs import get_message
+
+SLOT_SIZE = 1024 * 1024
+SLOTS_PER_WORKER = 4
+# Результаты меньше этого размера дешевле вернуть через pickle (см. benchmark_transport).
+INLINE_SIZE = 64 * 1024
+BENCHMARK_SIZES = (1024, 16 * 1024, 64 * 1024, 256 * 1024, 1024 * 1024, 4 * 1024 * 1024,
+                   16 * 1024 * 1024)
+# Кольцевые буферы, подключённые в процессе пула: {имя: кольцевой буфер}.
+WORKER_RINGS = {}
+
+
+class ShmHandle(NamedTuple):
+    """
+    Дескриптор данных в разделяемой памяти, передаваемый между процессами вместо самих данных:
+    ячейка кольцевого буфера (name пустой) или отдельный сегмент для данных больше ячейки.
+    """
+    slot: int
+    size: int
+    name: str = ""
+
+
+class SharedRing:
+    """
+    Кольцевой буфер в одном сегменте разделяемой памяти, разделённом на ячейки одинакового
+    размера. Ячейки выделяются и освобождаются в родительском процессе по кругу (освобождённая
+    ячейка выдаётся последней), процессы пула только подключаются к сегменту по имени. Сегмент
+    удаляется создавшим его процессом при закрытии.
+    """
+
+    def __init__(self, slot_count: int, slot_size: int = SLOT_SIZE, name: str = ""):
+        """
+        Создание кольцевого буфера или подключение к существующему.
+        :param slot_count: Число ячеек.
+        :param slot_size: Размер ячейки в байтах.
+        :param name: Имя существующего сегмента. Если пустое, создаётся новый сегмент.
+        """
+        self.owner = name == ""
+        self.memory = SharedMemory(name=None if self.owner else name, create=self.owner,
+                                   size=slot_count * slot_size if self.owner else 0)
+        self.slot_count = slot_count
+        self.slot_size = slot_size
+        self.free_slots = deque(range(slot_count))
+        self.condition = threading.Condition()
+
+    @property
+    def name(self) -> str:
+        """
+        Получение имени сегмента разделяемой памяти.
+        :return: Имя сегмента.
+        """
+        return self.memory.name
+
+    def allocate(self, timeout: float | None = None) -> int | None:
+        """
+        Выделение свободной ячейки.
+        :param timeout: Максимальное время ожидания свободной ячейки в секундах (None - без
+        ограничения).
+        :return: Номер ячейки или None, если свободной ячейки не появилось.
+        """
+        with self.condition:
+            if not self.condition.wait_for(lambda: len(self.free_slots) > 0, timeout):
+                return None
+            return self.free_slots.popleft()
+
+    def release(self, slot: int):
+        """
+        Освобождение ячейки.
+        :param slot: Номер ячейки.
+        """
+        with self.condition:
+            self.free_slots.append(slot)
+            self.condition.notify()
+
+    def get_view(self, slot: int, size: int | None = None) -> memoryview:
+        """
+        Получение представления ячейки без копирования. Представление должно быть освобождено
+        (release) до закрытия буфера.
+        :param slot: Номер ячейки.
+        :param size: Размер данных в байтах (по умолчанию - вся ячейка).
+        :return: Представление ячейки.
+        """
+        start = slot * self.slot_size
+        return self.memory.buf[start:start + (self.slot_size if size is None else size)]
+
+    def close(self):
+        """
+        Отключение от сегмента и его удаление, если он создан этим объектом.
+        """
+        self.memory.close()
+        if self.owner:
+            self.memory.unlink()
+
+
+def get_worker_ring(name: str, slot_count: int, slot_size: int) -> SharedRing:
+    """
+    Получение кольцевого буфера в процессе пула (подключение выполняется один раз на процесс).
+    :param name: Имя сегмента.
+    :param slot_count: Число ячеек.
+    :param slot_size: Размер ячейки в байтах.
+    :return: Кольцевой буфер.
+    """
+    ring = WORKER_RINGS.get(name)
+    if ring is None:
+        ring = WORKER_RINGS[name] = SharedRing(slot_count, slot_size, name)
+    return ring
+
+
+def write_payload(ring: SharedRing, slot: int, data: bytes, inline_size: int = INLINE_SIZE) \
+        -> ShmHandle | bytes:
+    """
+    Передача данных из процесса пула: в ячейку, если она есть и данные в неё помещаются, в
+    отдельный сегмент, если не помещаются, или самими данными, если они меньше inline_size.
+    Отдельный сегмент удаляется процессом, прочитавшим его (см. open_payload).
+    :param ring: Кольцевой буфер.
+    :param slot: Номер ячейки или -1.
+    :param data: Данные.
+    :param inline_size: Размер, до которого данные возвращаются без разделяемой памяти.
+    :return: Дескриптор данных или сами данные.
+    """
+    if len(data) < inline_size:
+        return data
+    if 0 <= slot and len(data) <= ring.slot_size:
+        view = ring.get_view(slot, len(data))
+        view[:] = data
+        view.release()
+        return ShmHandle(slot, len(data))
+    memory = SharedMemory(create=True, size=len(data))
+    memory.buf[:len(data)] = data
+    memory.close()
+    return ShmHandle(slot, len(data), memory.name)
+
+
+@contextmanager
+def open_payload(ring: SharedRing, payload: ShmHandle | bytes, unlink: bool = True) \
+        -> Iterator[memoryview | bytes]:
+    """
+    Открытие данных, переданных другим процессом, без копирования. Ячейка кольцевого буфера не
+    освобождается.
+    :param ring: Кольцевой буфер.
+    :param payload: Дескриптор данных или сами данные.
+    :param unlink: Удалять ли отдельный сегмент после закрытия (его удаляет процесс-получатель).
+    :return: Менеджер контекста с представлением данных.
+    """
+    if not isinstance(payload, ShmHandle):
+        yield payload
+        return
+    memory = ring.memory if payload.name == "" else SharedMemory(name=payload.name)
+    start = payload.slot * ring.slot_size if payload.name == "" else 0
+    view = memory.buf[start:start + payload.size]
+    try:
+        yield view
+    finally:
+        view.release()
+        if payload.name != "":
+            memory.close()
+            if unlink:
+                memory.unlink()
+
+
+def decode_payload(ring_name: str, slot_count: int, slot_size: int, source: ShmHandle | bytes,
+                   schema_path: str, field_paths: list[str], output_format: str,
+                   inline_size: int = INLINE_SIZE) -> ShmHandle | bytes:
+    """
+    Декодирование и кодирование бинарного файла в процессе пула (см. buffer_funcs.decode_buffer и
+    encoding_funcs.encode_value). Результат записывается в ячейку входного буфера, а отдельный
+    сегмент входного буфера удаляет родительский процесс.
+    :param ring_name: Имя сегмента кольцевого буфера.
+    :param slot_count: Число ячеек.
+    :param slot_size: Размер ячейки в байтах.
+    :param source: Дескриптор ячейки или сегмента с содержимым бинарного файла или само
+    содержимое.
+    :param schema_path: Путь к файлу схемы.
+    :param field_paths: Список путей к выбранным полям.
+    :param output_format: Формат вывода (json, msgpack или cbor).
+    :param inline_size: Размер, до которого результат возвращается без разделяемой памяти.
+    :return: Дескриптор результата или сам результат.
+    """
+    ring = get_worker_ring(ring_name, slot_count, slot_size)
+    with open_payload(ring, source, False) as buffer:
+        value = decode_buffer(schema_path, buffer, False, field_paths)
+    return write_payload(ring, source.slot if isinstance(source, ShmHandle) else -1,
+                         encode_value(value, output_format, get_schema_layout(schema_path)),
+                         inline_size)
+
+
+class SharedMemoryTransport:
+    """
+    Пул процессов для декодирования бинарных файлов с передачей входных буферов и результатов
+    через кольцевой буфер в разделяемой памяти. Если свободной ячейки нет или файл больше ячейки,
+    файл передаётся через отдельный сегмент, который удаляется сразу после декодирования.
+    """
+
+    def __init__(self, max_workers: int, slot_count: int = 0, slot_size: int = SLOT_SIZE,
+                 inline_size: int = INLINE_SIZE):
+        """
+        Создание кольцевого буфера и пула процессов.
+        :param max_workers: Число процессов пула.
+        :param slot_count: Число ячеек (по умолчанию - SLOTS_PER_WORKER на процесс). Должно
+        покрывать число файлов в работе, иначе часть файлов передаётся через отдельные сегменты.
+        :param slot_size: Размер ячейки в байтах.
+        :param inline_size: Размер, до которого результаты возвращаются через pickle.
+        """
+        self.max_workers = max_workers
+        self.inline_size = inline_size
+        self.ring = SharedRing(slot_count if slot_count > 0 else max_workers * SLOTS_PER_WORKER,
+                               slot_size)
+        self.executor = ProcessPoolExecutor(max_workers)
+        self.segments = {}
+        self.results = set()
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def close(self):
+        """
+        Остановка пула процессов и удаление кольцевого буфера и оставшихся отдельных сегментов
+        (в том числе непрочитанных сегментов результатов).
+        """
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        for name in list(self.segments):
+            self.release_segment(name)
+        for name in list(self.results):
+            try:
+                memory = SharedMemory(name=name)
+            except FileNotFoundError:
+                continue
+            memory.close()
+            memory.unlink()
+        self.results.clear()
+        self.ring.close()
+
+    def read_input(self, binary_path: str) -> ShmHandle | bytes:
+        """
+        Чтение бинарного файла в свободную ячейку без ожидания (или в отдельный сегмент, если
+        свободной ячейки нет или файл больше ячейки).
+        :param binary_path: Путь к бинарному файлу.
+        :return: Дескриптор ячейки или сегмента (пустой файл возвращается как b"").
+        """
+        with open(binary_path, "rb") as file:
+            size = os.fstat(file.fileno()).st_size
+            if size == 0:
+                return b""
+            slot = self.ring.allocate(0) if size <= self.ring.slot_size else None
+            if slot is not None:
+                handle = ShmHandle(slot, size)
+                view = self.ring.get_view(slot, size)
+            else:
+                memory = SharedMemory(create=True, size=size)
+                with self.lock:
+                    self.segments[memory.name] = memory
+                handle = ShmHandle(-1, size, memory.name)
+                view = memory.buf[:size]
+            try:
+                file.readinto(view)
+            except OSError:
+                view.release()
+                self.release_input(handle)
+                raise
+            view.release()
+        return handle
+
+    def decode(self, source: ShmHandle | bytes, schema_path: str, field_paths: list[str],
+               output_format: str) -> ShmHandle | bytes:
+        """
+        Декодирование и кодирование бинарного файла в пуле процессов (с ожиданием результата).
+        :param source: Дескриптор ячейки с содержимым бинарного файла или само содержимое.
+        :param schema_path: Путь к файлу схемы.
+        :param field_paths: Список путей к выбранным полям.
+        :param output_format: Формат вывода (json, msgpack или cbor).
+        :return: Дескриптор результата или сам результат. Отдельный сегмент входного буфера
+        удаляется, ячейка - нет (см. release). Отдельный сегмент результата удаляется при его
+        открытии (см. open_result) или при закрытии пула.
+        """
+        try:
+            payload = self.executor.submit(decode_payload, self.ring.name, self.ring.slot_count,
+                                           self.ring.slot_size, source, schema_path, field_paths,
+                                           output_format, self.inline_size).result()
+        finally:
+            if isinstance(source, ShmHandle) and source.name != "":
+                self.release_segment(source.name)
+        if isinstance(payload, ShmHandle) and payload.name != "":
+            with self.lock:
+                self.results.add(payload.name)
+        return payload
+
+    @contextmanager
+    def open_result(self, payload: ShmHandle | bytes) -> Iterator[memoryview | bytes]:
+        """
+        Открытие результата без копирования (см. open_payload). Отдельный сегмент результата
+        удаляется после закрытия.
+        :param payload: Дескриптор результата или сам результат.
+        :return: Менеджер контекста с представлением результата.
+        """
+        try:
+            with open_payload(self.ring, payload) as data:
+                yield data
+        finally:
+            if isinstance(payload, ShmHandle) and payload.name != "":
+                with self.lock:
+                    self.results.discard(payload.name)
+
+    def release(self, slot: int):
+        """
+        Освобождение ячейки входного буфера (если файл был передан через ячейку).
+        :param slot: Номер ячейки или -1.
+        """
+        if slot >= 0:
+            self.ring.release(slot)
+
+    def release_segment(self, name: str):
+        """
+        Удаление отдельного сегмента входного буфера.
+        :param name: Имя сегмента.
+        """
+        with self.lock:
+            memory = self.segments.pop(name, None)
+        if memory is not None:
+            memory.close()
+            memory.unlink()
+
+    def release_input(self, source: ShmHandle | bytes):
+        """
+        Освобождение входного буфера, который не был передан на декодирование.
+        :param source: Дескриптор ячейки или сегмента или содержимое файла.
+        """
+        if isinstance(source, ShmHandle):
+            if source.name != "":
+                self.release_segment(source.name)
+            else:
+                self.release(source.slot)
+
+
+def make_payload(ring_name: str, slot_count: int, slot_size: int, slot: int, size: int) \
+        -> ShmHandle | bytes:
+    """
+    Создание результата заданного размера в процессе пула для сравнения способов передачи.
+    :param ring_name: Имя сегмента кольцевого буфера. Если пустое, результат возвращается через
+    pickle.
+    :param slot_count: Число ячеек.
+    :param slot_size: Размер ячейки в байтах.
+    :param slot: Номер ячейки.
+    :param size: Размер результата в байтах.
+    :return: Дескриптор результата или сам результат.
+    """
+    data = bytes(size)
+    if ring_name == "":
+        return data
+    return write_payload(get_worker_ring(ring_name, slot_count, slot_size), slot, data, 0)
+
+
+def benchmark_transport(sizes: tuple[int, ...] = BENCHMARK_SIZES, repeats: int = 20,
+                        max_workers: int = 2) -> list[tuple[int, float, float]]:
+    """
+    Сравнение передачи результатов из пула процессов через pickle и через разделяемую память:
+    процесс пула создаёт результат заданного размера, родительский процесс записывает его в
+    os.devnull.
+    :param sizes: Размеры результата в байтах.
+    :param repeats: Число передач каждого размера.
+    :param max_workers: Число процессов пула.
+    :return: Список кортежей (размер, медианное время передачи через pickle, медианное время
+    передачи через разделяемую память) в секундах.
+    """
+    results = []
+    with SharedMemoryTransport(max_workers, max_workers, max(sizes)) as transport, \
+            open(os.devnull, "wb") as output_file:
+        ring = transport.ring
+        for size in sizes:
+            times = {"": [], ring.name: []}
+            for _ in range(repeats):
+                for ring_name, run_times in times.items():
+                    slot = ring.allocate(None)
+                    start_time = time.perf_counter()
+                    payload = transport.executor.submit(make_payload, ring_name, ring.slot_count,
+                                                        ring.slot_size, slot, size).result()
+                    with transport.open_result(payload) as data:
+                        output_file.write(data)
+                    run_times.append(time.perf_counter() - start_time)
+                    ring.release(slot)
+            results.append((size,) + tuple(sorted(run_times)[len(run_times) // 2]
+                                           for run_times in times.values()))
+    return results
+
+
+def execute_benchmark_transport(process_workers: int = 2) -> (int | str):
+    """
+    Сравнение передачи результатов из пула процессов через pickle и через разделяемую память
+    (см. benchmark_transport) с выводом времени для каждого размера и размера, начиная с
+    которого разделяемая память быстрее.
+    :param process_workers: Число процессов пула.
+    :return: Код ошибки или строка об ошибке.
+    """
+    crossover_size = 0
+    for size, pickle_time, shared_time in benchmark_transport(max_workers=process_workers):
+        info(get_message("main.transport_benchmark"), size, f"{pickle_time * 1000:.3f}",
+             f"{shared_time * 1000:.3f}", f"{pickle_time / shared_time:.2f}x")
+        if shared_time < pickle_time and crossover_size == 0:
+            crossover_size = size
+        elif shared_time >= pickle_time:
+            crossover_size = 0
+    info(get_message("main.transport_crossover"), crossover_size if crossover_size > 0 else "-")
+    return os.EX_OK
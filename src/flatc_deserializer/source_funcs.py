@@ -0,0 +1,532 @@
+"""
+    Модуль, включающий в себя источники бинарных файлов: локальную директорию, zip/tar-архив и
+    HTTP/S3-совместимое хранилище объектов (с пулом keep-alive соединений, параллельной загрузкой
+    диапазонов и ограниченным буфером в памяти).
+"""
+# pylint: disable=too-many-arguments, too-many-instance-attributes
+import errno
+import hashlib
+import hmac
+import http.client
+import os
+import threading
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from queue import LifoQueue, Empty
+from shutil import rmtree
+from typing import NamedTuple
+from urllib.parse import urlsplit, quote, unquote
+from xml.etree.ElementTree import fromstring, ParseError
+
+from i18n import t
+
+from archive_funcs import is_archive_path, make_scratch_path, get_member_path, \
+    list_archive_members, extract_archive_members, ArchiveReader
+
+REMOTE_SCHEMES = ("http://", "https://", "s3://")
+MAX_CONNECTIONS = 8
+BUFFER_SIZE = 67108864
+RANGE_SIZE = 8388608
+TIMEOUT = 60.0
+UNSIGNED_PAYLOAD = "UNSIGNED-PAYLOAD"
+DEFAULT_REGION = "us-east-1"
+
+
+class S3Credentials(NamedTuple):
+    """
+    Учётные данные для подписи запросов к S3-совместимому хранилищу (AWS Signature Version 4).
+    """
+    access_key: str
+    secret_key: str
+    region: str = DEFAULT_REGION
+    session_token: str = ""
+
+
+def get_env_credentials() -> S3Credentials | None:
+    """
+    Получение учётных данных S3 из переменных окружения AWS_ACCESS_KEY_ID, AWS_SECRET_ACCESS_KEY,
+    AWS_SESSION_TOKEN и AWS_REGION (AWS_DEFAULT_REGION).
+    :return: Учётные данные или None, если ключи не заданы.
+    """
+    access_key = os.environ.get("AWS_ACCESS_KEY_ID", "")
+    secret_key = os.environ.get("AWS_SECRET_ACCESS_KEY", "")
+    if access_key == "" or secret_key == "":
+        return None
+    region = os.environ.get("AWS_REGION", os.environ.get("AWS_DEFAULT_REGION", DEFAULT_REGION))
+    return S3Credentials(access_key, secret_key, region, os.environ.get("AWS_SESSION_TOKEN", ""))
+
+
+def get_signed_headers(method: str, host: str, path: str, query: dict[str, str],
+                       credentials: S3Credentials) -> dict[str, str]:
+    """
+    Получение заголовков запроса, подписанного по AWS Signature Version 4 (тело запроса не
+    подписывается).
+    :param method: HTTP-метод.
+    :param host: Значение заголовка Host.
+    :param path: Путь запроса (уже закодированный).
+    :param query: Параметры запроса.
+    :param credentials: Учётные данные.
+    :return: Словарь заголовков для запроса.
+    """
+    now = datetime.now(timezone.utc)
+    amz_date = now.strftime("%Y%m%dT%H%M%SZ")
+    scope = f"{now.strftime('%Y%m%d')}/{credentials.region}/s3/aws4_request"
+    headers = {"host": host, "x-amz-content-sha256": UNSIGNED_PAYLOAD, "x-amz-date": amz_date}
+    if credentials.session_token != "":
+        headers["x-amz-security-token"] = credentials.session_token
+    signed_names = ";".join(sorted(headers))
+    canonical_query = "&".join(f"{quote(key, safe='-_.~')}={quote(value, safe='-_.~')}"
+                               for key, value in sorted(query.items()))
+    canonical_request = "\n".join([method, path, canonical_query] +
+                                  [f"{name}:{headers[name]}" for name in sorted(headers)] +
+                                  ["", signed_names, UNSIGNED_PAYLOAD])
+    string_to_sign = "\n".join(["AWS4-HMAC-SHA256", amz_date, scope, hashlib.sha256(
+        canonical_request.encode("utf-8")).hexdigest()])
+    key = ("AWS4" + credentials.secret_key).encode("utf-8")
+    for part in scope.split("/"):
+        key = hmac.new(key, part.encode("utf-8"), hashlib.sha256).digest()
+    signature = hmac.new(key, string_to_sign.encode("utf-8"), hashlib.sha256).hexdigest()
+    headers["authorization"] = (f"AWS4-HMAC-SHA256 Credential={credentials.access_key}/{scope}, "
+                                f"SignedHeaders={signed_names}, Signature={signature}")
+    del headers["host"]
+    return headers
+
+
+class ConnectionPool:
+    """
+    Пул keep-alive HTTP-соединений с одним хостом. Одновременно открыто не больше max_connections
+    соединений; соединение возвращается в пул после полного чтения ответа.
+    """
+
+    def __init__(self, scheme: str, netloc: str, max_connections: int = MAX_CONNECTIONS,
+                 timeout: float = TIMEOUT):
+        """
+        Создание пула.
+        :param scheme: Схема (http или https).
+        :param netloc: Хост и порт.
+        :param max_connections: Максимальное число соединений.
+        :param timeout: Таймаут операций с сокетом в секундах.
+        """
+        self.connection_class = http.client.HTTPSConnection if scheme == "https" else \
+            http.client.HTTPConnection
+        self.netloc = netloc
+        self.timeout = timeout
+        self.idle = LifoQueue()
+        self.slots = threading.BoundedSemaphore(max_connections)
+
+    def request(self, method: str, path: str, headers: dict[str, str] | None = None) \
+            -> tuple[int, dict[str, str], bytes]:
+        """
+        Выполнение запроса через свободное соединение пула. Если соединение из пула было закрыто
+        сервером, запрос повторяется через новое соединение.
+        :param method: HTTP-метод.
+        :param path: Путь запроса с параметрами.
+        :param headers: Заголовки запроса.
+        :return: Кортеж из трёх элементов: (код ответа, заголовки ответа в нижнем регистре, тело
+        ответа).
+        """
+        with self.slots:
+            while True:
+                try:
+                    connection = self.idle.get_nowait()
+                    reused = True
+                except Empty:
+                    connection = self.connection_class(self.netloc, timeout=self.timeout)
+                    reused = False
+                try:
+                    status, response_headers, body, will_close = self.send(
+                        connection, method, path, headers)
+                except (OSError, http.client.HTTPException) as exc:
+                    connection.close()
+                    if reused and isinstance(exc, (ConnectionResetError, BrokenPipeError,
+                                                   http.client.RemoteDisconnected)):
+                        continue
+                    raise
+                if will_close:
+                    connection.close()
+                else:
+                    self.idle.put(connection)
+                return status, response_headers, body
+
+    @staticmethod
+    def send(connection: http.client.HTTPConnection, method: str, path: str,
+             headers: dict[str, str] | None) -> tuple[int, dict[str, str], bytes, bool]:
+        """
+        Отправка запроса и полное чтение ответа.
+        :param connection: Соединение.
+        :param method: HTTP-метод.
+        :param path: Путь запроса с параметрами.
+        :param headers: Заголовки запроса.
+        :return: Кортеж (код ответа, заголовки ответа, тело ответа, нужно ли закрыть соединение).
+        """
+        connection.request(method, path, headers=headers or {})
+        response = connection.getresponse()
+        body = response.read()
+        return (response.status, {name.lower(): value for name, value in response.getheaders()},
+                body, response.will_close)
+
+    def close(self):
+        """
+        Закрытие всех свободных соединений пула.
+        """
+        while True:
+            try:
+                self.idle.get_nowait().close()
+            except Empty:
+                return
+
+
+class InputSource:
+    """
+    Источник бинарных файлов. Файлы адресуются относительными путями внутри источника.
+    """
+    location = ""
+    # True, если extract_members возвращает временные копии файлов, которые нужно удалять после
+    # обработки.
+    temporary = True
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
+
+    def get_location(self, member_path: str) -> str:
+        """
+        Получение пути или URL файла источника для вывода в лог и манифест.
+        :param member_path: Относительный путь файла.
+        :return: Путь или URL файла.
+        """
+        return os.path.join(self.location, member_path)
+
+    def list_members(self) -> list[tuple[str, int]]:
+        """
+        Получение списка файлов источника.
+        :return: Список кортежей (относительный путь файла, размер файла).
+        """
+        raise NotImplementedError
+
+    def read_member(self, member_path: str) -> bytes:
+        """
+        Чтение файла источника целиком.
+        :param member_path: Относительный путь файла.
+        :return: Содержимое файла.
+        """
+        raise NotImplementedError
+
+    def extract_members(self, scratch_path: str, accept: Callable[[str], bool],
+                        on_error: Callable[[str, Exception], None] | None = None) \
+            -> Iterator[str]:
+        """
+        Последовательная запись выбранных файлов источника во временную директорию по одному.
+        :param scratch_path: Путь к временной директории.
+        :param accept: Функция, получающая относительный путь файла и возвращающая True, если файл
+        нужно записать.
+        :param on_error: Функция, получающая относительный путь файла и исключение, если файл не
+        удалось прочитать (файл пропускается). Если None, исключение передаётся вызывающему коду.
+        :return: Итератор путей к записанным файлам.
+        """
+        for member_path, _ in self.list_members():
+            if not accept(member_path):
+                continue
+            try:
+                data = self.read_member(member_path)
+            except (OSError, http.client.HTTPException) as exc:
+                if on_error is None:
+                    raise
+                on_error(member_path, exc)
+                continue
+            yield write_scratch_file(scratch_path, member_path, data)
+
+    def close(self):
+        """
+        Освобождение ресурсов источника.
+        """
+
+
+def write_scratch_file(scratch_path: str, member_path: str, data: bytes) -> str:
+    """
+    Запись файла источника во временную директорию.
+    :param scratch_path: Путь к временной директории.
+    :param member_path: Относительный путь файла.
+    :param data: Содержимое файла.
+    :return: Путь к записанному файлу.
+    """
+    scratch_file_path = os.path.join(scratch_path, member_path)
+    os.makedirs(os.path.dirname(scratch_file_path), exist_ok=True)
+    with open(scratch_file_path, "wb") as scratch_file:
+        scratch_file.write(data)
+    return scratch_file_path
+
+
+class LocalSource(InputSource):
+    """
+    Директория локальной файловой системы. Файлы не копируются во временную директорию.
+    """
+    temporary = False
+
+    def __init__(self, root_path: str):
+        """
+        Создание источника.
+        :param root_path: Путь к директории.
+        """
+        if not os.path.isdir(root_path):
+            raise FileNotFoundError(errno.ENOENT, t("main.directory_not_found") % root_path)
+        self.location = os.path.abspath(root_path)
+
+    def list_members(self) -> list[tuple[str, int]]:
+        return [(os.path.relpath(os.path.join(subdir, file), self.location),
+                 os.path.getsize(os.path.join(subdir, file)))
+                for subdir, _, files in os.walk(self.location) for file in files]
+
+    def read_member(self, member_path: str) -> bytes:
+        with open(self.get_location(member_path), "rb") as file:
+            return file.read()
+
+    def extract_members(self, scratch_path: str, accept: Callable[[str], bool],
+                        on_error: Callable[[str, Exception], None] | None = None) \
+            -> Iterator[str]:
+        for member_path, _ in self.list_members():
+            if accept(member_path):
+                yield self.get_location(member_path)
+
+
+class ArchiveSource(InputSource):
+    """
+    Zip- или tar-архив (файлы распаковываются потоково, см. archive_funcs).
+    """
+
+    def __init__(self, archive_path: str):
+        """
+        Создание источника.
+        :param archive_path: Путь к архиву.
+        """
+        if not os.path.isfile(archive_path):
+            raise FileNotFoundError(errno.ENOENT, t("main.file_not_found") % archive_path)
+        self.location = archive_path
+        self.reader = None
+        self.reader_lock = threading.Lock()
+
+    def list_members(self) -> list[tuple[str, int]]:
+        return list_archive_members(self.location)
+
+    def read_member(self, member_path: str) -> bytes:
+        with self.reader_lock:
+            if self.reader is None:
+                self.reader = ArchiveReader(self.location)
+        data = self.reader.read(member_path)
+        if data is None:
+            raise FileNotFoundError(errno.ENOENT, t("main.file_not_found") %
+                                    self.get_location(member_path))
+        return data
+
+    def extract_members(self, scratch_path: str, accept: Callable[[str], bool],
+                        on_error: Callable[[str, Exception], None] | None = None) \
+            -> Iterator[str]:
+        return extract_archive_members(self.location, scratch_path, accept)
+
+    def close(self):
+        with self.reader_lock:
+            if self.reader is not None:
+                self.reader.close()
+                self.reader = None
+
+
+class HttpSource(InputSource):
+    """
+    Префикс в HTTP/S3-совместимом хранилище объектов (адресация bucket в пути:
+    http(s)://хост/bucket/префикс). Список объектов получается запросом ListObjectsV2, объекты
+    читаются диапазонами через пул keep-alive соединений. При записи файлов во временную
+    директорию следующие объекты загружаются заранее и параллельно, пока их суммарный размер не
+    превышает buffer_size.
+    """
+
+    def __init__(self, url: str, credentials: S3Credentials | None = None,
+                 max_connections: int = MAX_CONNECTIONS, buffer_size: int = BUFFER_SIZE,
+                 range_size: int = RANGE_SIZE, timeout: float = TIMEOUT):
+        """
+        Создание источника.
+        :param url: URL префикса (http(s)://хост/bucket/префикс).
+        :param credentials: Учётные данные для подписи запросов. Если None, запросы не
+        подписываются.
+        :param max_connections: Максимальное число одновременных соединений.
+        :param buffer_size: Максимальный суммарный размер заранее загруженных объектов в байтах.
+        :param range_size: Размер диапазона, загружаемого одним запросом, в байтах.
+        :param timeout: Таймаут операций с сокетом в секундах.
+        """
+        url_parts = urlsplit(url)
+        bucket, _, prefix = unquote(url_parts.path).strip("/").partition("/")
+        if url_parts.scheme not in ("http", "https") or url_parts.netloc == "" or bucket == "":
+            raise ValueError(t("source_funcs.invalid_url") % url)
+        self.location = url.rstrip("/")
+        self.host = url_parts.netloc
+        self.bucket = bucket
+        self.prefix = prefix + "/" if prefix != "" else ""
+        self.credentials = credentials
+        self.buffer_size = buffer_size
+        self.range_size = range_size
+        self.pool = ConnectionPool(url_parts.scheme, url_parts.netloc, max_connections, timeout)
+        self.executor = ThreadPoolExecutor(max_connections)
+        self.range_executor = ThreadPoolExecutor(max_connections)
+
+    def get_location(self, member_path: str) -> str:
+        return self.location + "/" + member_path.replace(os.sep, "/")
+
+    def request(self, path: str, query: dict[str, str] | None = None,
+                headers: dict[str, str] | None = None) -> tuple[int, dict[str, str], bytes]:
+        """
+        Выполнение GET-запроса (подписанного, если заданы учётные данные).
+        :param path: Путь запроса без параметров (незакодированный).
+        :param query: Параметры запроса.
+        :param headers: Дополнительные заголовки.
+        :return: Кортеж (код ответа, заголовки ответа, тело ответа).
+        """
+        query = {} if query is None else query
+        path = quote(path, safe="/-_.~")
+        request_headers = {} if headers is None else dict(headers)
+        if self.credentials is not None:
+            request_headers.update(get_signed_headers("GET", self.host, path, query,
+                                                      self.credentials))
+        request_path = path
+        if len(query) > 0:
+            request_path += "?" + "&".join(f"{quote(key, safe='-_.~')}={quote(value, safe='-_.~')}"
+                                           for key, value in sorted(query.items()))
+        status, response_headers, body = self.pool.request("GET", request_path, request_headers)
+        if status >= 400:
+            raise IOError(errno.EIO, t("source_funcs.http_error") % (status, self.host + path))
+        return status, response_headers, body
+
+    def list_members(self) -> list[tuple[str, int]]:
+        members = []
+        query = {"list-type": "2", "prefix": self.prefix}
+        while True:
+            _, _, body = self.request("/" + self.bucket, query)
+            try:
+                root = fromstring(body)
+            except ParseError as exc:
+                raise IOError(errno.EIO, t("source_funcs.invalid_listing") % self.location) from exc
+            continuation_token = ""
+            for element in root:
+                tag = element.tag.rsplit("}", 1)[-1]
+                if tag == "Contents":
+                    fields = {child.tag.rsplit("}", 1)[-1]: child.text or "" for child in element}
+                    member_path = get_member_path(fields.get("Key", "")[len(self.prefix):])
+                    if member_path != "" and not fields.get("Key", "").endswith("/"):
+                        members.append((member_path, int(fields.get("Size", "0"))))
+                elif tag == "NextContinuationToken":
+                    continuation_token = element.text or ""
+            if continuation_token == "":
+                return members
+            query["continuation-token"] = continuation_token
+
+    def read_range(self, object_path: str, start: int, end: int) -> bytes:
+        """
+        Чтение диапазона байт объекта.
+        :param object_path: Путь объекта (/bucket/ключ).
+        :param start: Начало диапазона.
+        :param end: Конец диапазона (включительно).
+        :return: Содержимое диапазона.
+        """
+        return self.request(object_path, headers={"Range": f"bytes={start}-{end}"})[2]
+
+    def read_member(self, member_path: str) -> bytes:
+        object_path = "/" + self.bucket + "/" + self.prefix + member_path.replace(os.sep, "/")
+        status, headers, body = self.request(object_path, headers={
+            "Range": f"bytes=0-{self.range_size - 1}"})
+        content_range = headers.get("content-range", "")
+        if status != 206 or "/" not in content_range:
+            return body
+        total_size = int(content_range.rsplit("/", 1)[1])
+        if total_size <= len(body):
+            return body
+        futures = [self.range_executor.submit(self.read_range, object_path, start,
+                                              min(start + self.range_size, total_size) - 1)
+                   for start in range(len(body), total_size, self.range_size)]
+        return b"".join([body] + [future.result() for future in futures])
+
+    def extract_members(self, scratch_path: str, accept: Callable[[str], bool],
+                        on_error: Callable[[str, Exception], None] | None = None) \
+            -> Iterator[str]:
+        members = deque(member for member in self.list_members() if accept(member[0]))
+        pending = deque()
+        buffered_size = 0
+        try:
+            while len(members) > 0 or len(pending) > 0:
+                while len(members) > 0 and (len(pending) == 0 or
+                                            buffered_size + members[0][1] <= self.buffer_size):
+                    member_path, size = members.popleft()
+                    pending.append((member_path, size, self.executor.submit(self.read_member,
+                                                                            member_path)))
+                    buffered_size += size
+                member_path, size, future = pending.popleft()
+                buffered_size -= size
+                try:
+                    data = future.result()
+                except (OSError, http.client.HTTPException) as exc:
+                    if on_error is None:
+                        raise
+                    on_error(member_path, exc)
+                    continue
+                yield write_scratch_file(scratch_path, member_path, data)
+        finally:
+            for _, _, future in pending:
+                future.cancel()
+
+    def close(self):
+        self.executor.shutdown(wait=True, cancel_futures=True)
+        self.range_executor.shutdown(wait=True, cancel_futures=True)
+        self.pool.close()
+
+
+def is_remote_path(path: str) -> bool:
+    """
+    Проверка, является ли путь URL хранилища объектов.
+    :param path: Путь или URL.
+    :return: True, если путь начинается с http://, https:// или s3://.
+    """
+    return path.lower().startswith(REMOTE_SCHEMES)
+
+
+def get_input_source(path: str, **kwargs) -> InputSource:
+    """
+    Получение источника бинарных файлов по пути. Для s3://bucket/префикс используется адрес
+    хранилища из переменной окружения AWS_ENDPOINT_URL (по умолчанию - AWS S3 в регионе из
+    AWS_REGION); для HTTP- и S3-источников учётные данные берутся из переменных окружения, если
+    они заданы.
+    :param path: Путь к директории, архиву или URL префикса в хранилище объектов.
+    :param kwargs: Дополнительные параметры HttpSource.
+    :return: Источник бинарных файлов.
+    """
+    if path.lower().startswith("s3://"):
+        credentials = get_env_credentials()
+        region = DEFAULT_REGION if credentials is None else credentials.region
+        endpoint_url = os.environ.get("AWS_ENDPOINT_URL", f"https://s3.{region}.amazonaws.com")
+        path = endpoint_url.rstrip("/") + "/" + path[len("s3://"):]
+    if is_remote_path(path):
+        kwargs.setdefault("credentials", get_env_credentials())
+        return HttpSource(path, **kwargs)
+    if is_archive_path(path):
+        return ArchiveSource(path)
+    return LocalSource(path)
+
+
+@contextmanager
+def fetch_remote_file(url: str) -> Iterator[str]:
+    """
+    Загрузка одного объекта хранилища во временную директорию (в tmpfs, если доступна) на время
+    работы с ним.
+    :param url: URL объекта.
+    :return: Контекстный менеджер, возвращающий путь к загруженному файлу. Файл удаляется при
+    выходе из контекста.
+    """
+    parent_url, _, member_name = url.rstrip("/").rpartition("/")
+    scratch_path = make_scratch_path()
+    try:
+        with get_input_source(parent_url) as source:
+            yield write_scratch_file(scratch_path, unquote(member_name),
+                                     source.read_member(unquote(member_name)))
+    finally:
+        rmtree(scratch_path, ignore_errors=True)
@@ -0,0 +1,191 @@
+"""
+    Модуль, включающий в себя функции для потокового чтения больших JSON-файлов, созданных
+    компилятором схемы Flatbuffers, с ограниченным потреблением памяти.
+"""
+# pylint: disable=too-many-branches
+import re
+from collections.abc import Iterator
+from json import JSONDecodeError
+from json.decoder import scanstring
+
+TOKEN_PATTERN = re.compile(r"[\s,:]*(?:([{}\[\]])|(\"(?:[^\"\\]|\\.)*\")|([^\s,:\[\]{}\"]+))")
+ATOM_VALUES = {"true": True, "false": False, "null": None}
+
+
+def parse_atom(atom: str):
+    """
+    Разбор значения без кавычек: числа, true, false, null, nan, inf или имени поля (flatc без
+    --strict-json не заключает имена полей в кавычки).
+    :param atom: Строка значения.
+    :return: Значение.
+    """
+    if atom in ATOM_VALUES:
+        return ATOM_VALUES[atom]
+    try:
+        if "." in atom or "e" in atom or "E" in atom:
+            return float(atom)
+        return int(atom)
+    except ValueError:
+        pass
+    try:
+        return float(atom)
+    except ValueError:
+        return atom
+
+
+def iter_json_tokens(file, chunk_size: int = 65536) -> Iterator[tuple[str, object]]:
+    """
+    Потоковое разбиение JSON-текста на лексемы. Допускаются имена полей без кавычек и запятые в
+    конце таблиц/векторов, как в выводе компилятора схемы без --strict-json.
+    :param file: Текстовый файл, открытый для чтения.
+    :param chunk_size: Размер читаемой за раз части файла в символах.
+    :return: Итератор кортежей (вид лексемы, значение): ("{", None), ("}", None), ("[", None),
+    ("]", None), ("string", строка), ("atom", значение без кавычек).
+    """
+    buffer = ""
+    position = 0
+    is_eof = False
+    match_token = TOKEN_PATTERN.match
+    while True:
+        match = match_token(buffer, position)
+        if match is None or (not is_eof and match.end() == len(buffer)):
+            if is_eof:
+                if buffer[position:].strip(" \t\r\n,:") != "":
+                    raise JSONDecodeError("Unexpected character", buffer, position)
+                return
+            chunk = file.read(chunk_size)
+            is_eof = chunk == ""
+            buffer = buffer[position:] + chunk
+            position = 0
+            continue
+        position = match.end()
+        bracket, string, atom = match.groups()
+        if bracket is not None:
+            yield bracket, None
+        elif string is not None:
+            yield "string", string[1:-1] if "\\" not in string else scanstring(string, 1)[0]
+        else:
+            yield "atom", parse_atom(atom)
+
+
+def iter_json_events(file, chunk_size: int = 65536) -> Iterator[tuple[str, object]]:
+    """
+    Потоковый разбор JSON-текста на события.
+    :param file: Текстовый файл, открытый для чтения.
+    :param chunk_size: Размер читаемой за раз части файла в символах.
+    :return: Итератор кортежей (событие, значение), где событие - start_map, map_key, end_map,
+    start_array, end_array или value.
+    """
+    containers = []
+    is_key_expected = False
+    for token, value in iter_json_tokens(file, chunk_size):
+        if token in ("}", "]"):
+            containers.pop()
+            yield ("end_map" if token == "}" else "end_array"), None
+            is_key_expected = len(containers) > 0 and containers[-1] == "{"
+        elif is_key_expected:
+            yield "map_key", value
+            is_key_expected = False
+        elif token in ("{", "["):
+            containers.append(token)
+            yield ("start_map" if token == "{" else "start_array"), None
+            is_key_expected = token == "{"
+        else:
+            yield "value", value
+            is_key_expected = len(containers) > 0 and containers[-1] == "{"
+
+
+def get_next_event(events: Iterator[tuple[str, object]]) -> tuple[str, object]:
+    """
+    Получение следующего события с проверкой конца JSON-текста.
+    :param events: Итератор событий.
+    :return: Кортеж (событие, значение).
+    """
+    item = next(events, None)
+    if item is None:
+        raise JSONDecodeError("Unexpected end of JSON", "", 0)
+    return item
+
+
+def build_json_value(event: str, value, events: Iterator[tuple[str, object]]):
+    """
+    Построение значения (словаря, списка или скаляра), начинающегося с заданного события.
+    :param event: Первое событие значения.
+    :param value: Значение первого события.
+    :param events: Итератор остальных событий.
+    :return: Значение.
+    """
+    if event == "value":
+        return value
+    if event == "start_array":
+        result = []
+        while True:
+            item_event, item_value = get_next_event(events)
+            if item_event == "end_array":
+                return result
+            result.append(build_json_value(item_event, item_value, events))
+    result = {}
+    while True:
+        key_event, key = get_next_event(events)
+        if key_event == "end_map":
+            return result
+        result[key] = build_json_value(*get_next_event(events), events)
+
+
+def iter_json_items(json_path: str, prefix: str = "", chunk_size: int = 65536) -> Iterator:
+    """
+    Потоковое чтение JSON-файла с построением только значений по заданному пути. Если путь пустой,
+    возвращаются пары (имя поля, значение) корневой таблицы. Элементы векторов обозначаются
+    сегментом "*" (например, "monsters.*" - каждый элемент корневого вектора monsters), так что
+    в памяти одновременно находится только один элемент. Если JSON-текст обрывается, вызывается
+    JSONDecodeError.
+    :param json_path: Путь к JSON-файлу.
+    :param prefix: Путь к значениям через точку.
+    :param chunk_size: Размер читаемой за раз части файла в символах.
+    :return: Итератор значений по заданному пути.
+    """
+    target_path = [part for part in prefix.split(".") if part != ""]
+    with open(json_path, "r", encoding="utf-8") as file:
+        events = iter_json_events(file, chunk_size)
+        containers = []
+        path = []
+        key = None
+        for event, value in events:
+            if event == "map_key":
+                key = value
+                continue
+            if event in ("end_map", "end_array"):
+                containers.pop()
+                if 0 < len(containers) <= len(path):
+                    path.pop()
+                continue
+            if len(containers) == 0:
+                if len(target_path) == 0:
+                    if event == "start_map":
+                        yield from iter_root_fields(events)
+                    else:
+                        yield build_json_value(event, value, events)
+                    return
+                containers.append(event)
+                continue
+            segment = key if containers[-1] == "start_map" else "*"
+            if len(path) + 1 == len(target_path) and path + [segment] == target_path:
+                yield build_json_value(event, value, events)
+            elif event in ("start_map", "start_array"):
+                containers.append(event)
+                path.append(segment)
+        if len(containers) > 0:
+            raise JSONDecodeError("Unexpected end of JSON", "", 0)
+
+
+def iter_root_fields(events: Iterator[tuple[str, object]]) -> Iterator[tuple[str, object]]:
+    """
+    Построение полей корневой таблицы по одному.
+    :param events: Итератор событий после начала корневой таблицы.
+    :return: Итератор пар (имя поля, значение).
+    """
+    while True:
+        event, key = get_next_event(events)
+        if event == "end_map":
+            return
+        yield key, build_json_value(*get_next_event(events), events)
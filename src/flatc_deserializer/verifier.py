@@ -0,0 +1,39 @@
+"""
+    Быстрая структурная проверка бинарных файлов Flatbuffers в выбранной директории по всем схемам
+    в другой выбранной директории без вызова компилятора схемы.
+"""
+# pylint: disable=import-error, wrong-import-position
+import os
+import sys
+import argparse
+from i18n import t
+
+sys.path.append(os.path.join(os.path.dirname(__file__), "."))
+
+from log_funcs import LOG_MODE_TEXT, LOG_MODES
+from general_funcs import init_app, init_logging, add_verify_arguments, execute_verify
+
+
+def main() -> int | str:
+    """
+    Запуск скрипта.
+    :return: Код ошибки или строка об ошибке.
+    """
+    init_app(os.path.join("images", "flatbuffers-batch-logo-clean.png"))
+    parser = argparse.ArgumentParser(prog=t("main.flatc_verifier_name"),
+                                     description=t("main.flatc_verifier_desc"))
+    parser.add_argument("-s", "--schemas_path", type=str, default="",
+                        help=t("main.schemas_directory_arg"))
+    parser.add_argument("-b", "--binaries_path", type=str, default="",
+                        help=t("main.binaries_directory_arg"))
+    add_verify_arguments(parser)
+    parser.add_argument("--log_mode", type=str, default=LOG_MODE_TEXT, choices=LOG_MODES,
+                        help=t("main.log_mode_arg"))
+    args = parser.parse_args()
+    init_logging(args.log_mode)
+    return execute_verify(args.schemas_path, args.binaries_path, args.check_identifier,
+                          args.quarantine_path)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
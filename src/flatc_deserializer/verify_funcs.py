@@ -0,0 +1,101 @@
+"""
+    Модуль, включающий в себя функции для быстрой структурной проверки бинарных файлов Flatbuffers
+    без вызова компилятора схемы.
+"""
+# pylint: disable=too-many-return-statements
+import os
+import shutil
+import struct
+from concurrent.futures import ThreadPoolExecutor
+
+from schema_funcs import get_schema_file_identifier
+
+UOFFSET_SIZE = 4
+FILE_IDENTIFIER_SIZE = 4
+VTABLE_HEADER_SIZE = 4
+
+
+def verify_binary(binary_path: str, file_identifier: str = "") -> str:
+    """
+    Проверка заголовка бинарного файла Flatbuffers: границ смещения корневой таблицы,
+    корректности её таблицы виртуальных полей (vtable) и, опционально, идентификатора файла.
+    Читаются только заголовок, начало корневой таблицы и её vtable.
+    :param binary_path: Путь к бинарному файлу.
+    :param file_identifier: Ожидаемый идентификатор файла. Если пустой, не проверяется.
+    :return: Пустая строка, если файл корректен. Иначе - ключ локализации причины ошибки.
+    """
+    try:
+        with open(binary_path, "rb") as file:
+            file_size = os.fstat(file.fileno()).st_size
+            if file_size < UOFFSET_SIZE + UOFFSET_SIZE:
+                return "verify_funcs.too_small"
+            header = file.read(UOFFSET_SIZE + FILE_IDENTIFIER_SIZE)
+            if file_identifier != "" and header[UOFFSET_SIZE:] != file_identifier.encode("utf-8"):
+                return "verify_funcs.identifier_mismatch"
+            root_offset = struct.unpack_from("<I", header)[0]
+            if root_offset % UOFFSET_SIZE != 0 or root_offset < UOFFSET_SIZE or \
+                    root_offset + UOFFSET_SIZE > file_size:
+                return "verify_funcs.root_offset_out_of_bounds"
+            file.seek(root_offset)
+            vtable_offset = root_offset - struct.unpack("<i", file.read(UOFFSET_SIZE))[0]
+            if vtable_offset % 2 != 0 or vtable_offset < 0 or \
+                    vtable_offset + VTABLE_HEADER_SIZE > file_size:
+                return "verify_funcs.vtable_out_of_bounds"
+            file.seek(vtable_offset)
+            vtable_size, table_size = struct.unpack("<HH", file.read(VTABLE_HEADER_SIZE))
+            if vtable_size < VTABLE_HEADER_SIZE or vtable_size % 2 != 0 or \
+                    vtable_offset + vtable_size > file_size:
+                return "verify_funcs.vtable_invalid_size"
+            if table_size < UOFFSET_SIZE or root_offset + table_size > file_size:
+                return "verify_funcs.table_out_of_bounds"
+            field_offsets = struct.unpack(f"<{(vtable_size - VTABLE_HEADER_SIZE) // 2}H",
+                                          file.read(vtable_size - VTABLE_HEADER_SIZE))
+    except OSError:
+        return "main.file_failed_to_open"
+    for field_offset in field_offsets:
+        if field_offset != 0 and (field_offset < UOFFSET_SIZE or field_offset >= table_size):
+            return "verify_funcs.field_out_of_bounds"
+    return ""
+
+
+def verify_binary_tuples(binary_tuples: list[tuple[str, str]], check_identifier: bool = False) \
+        -> tuple[list[tuple[str, str]], list[tuple[str, str, str]]]:
+    """
+    Проверка списка бинарных файлов с соответствующими им файлами схем.
+    :param binary_tuples: Список кортежей (путь к бинарному файлу, путь к файлу схемы).
+    :param check_identifier: Проверять ли идентификатор файла, если он объявлен в схеме.
+    :return: Кортеж из двух списков: корректные кортежи (путь к бинарному файлу, путь к файлу
+    схемы) и некорректные кортежи (путь к бинарному файлу, путь к файлу схемы, ключ причины).
+    """
+    identifiers = {}
+    if check_identifier:
+        identifiers = {schema_path: get_schema_file_identifier(schema_path)
+                       for schema_path in {binary_tuple[1] for binary_tuple in binary_tuples}}
+    with ThreadPoolExecutor() as executor:
+        reasons = executor.map(lambda binary_tuple: verify_binary(
+            binary_tuple[0], identifiers.get(binary_tuple[1], "")), binary_tuples)
+        valid_tuples = []
+        invalid_tuples = []
+        for binary_tuple, reason in zip(binary_tuples, reasons):
+            if reason == "":
+                valid_tuples.append(binary_tuple)
+            else:
+                invalid_tuples.append((binary_tuple[0], binary_tuple[1], reason))
+    return valid_tuples, invalid_tuples
+
+
+def quarantine_binaries(binary_paths: list[str], binaries_path: str, quarantine_path: str) \
+        -> list[str]:
+    """
+    Перемещение бинарных файлов в директорию карантина с сохранением структуры поддиректорий.
+    :param binary_paths: Список путей к бинарным файлам.
+    :param binaries_path: Путь к корневой директории бинарных файлов.
+    :param quarantine_path: Путь к директории карантина.
+    :return: Список новых путей к перемещённым файлам.
+    """
+    quarantined_paths = []
+    for binary_path in binary_paths:
+        new_path = os.path.join(quarantine_path, os.path.relpath(binary_path, binaries_path))
+        os.makedirs(os.path.dirname(new_path), exist_ok=True)
+        quarantined_paths.append(shutil.move(binary_path, new_path))
+    return quarantined_paths